@@ -0,0 +1,4 @@
+"""Performance benchmarks for the chatbot POC.
+
+Each module is runnable on its own, e.g. ``python -m src.benchmarks.parallel_tools``.
+"""
@@ -0,0 +1,100 @@
+import json
+import os
+import sqlite3
+import statistics
+import tempfile
+
+from src.db.data_generators import SyntheticDataConfig, populate_synthetic_data
+from src.db.db_schema import init_database
+
+
+def build_synthetic_database(customers: int, months: int, directory: str | None = None) -> str:
+    """Create a synthetic database in a temporary directory and return its path."""
+    directory = directory or tempfile.mkdtemp(prefix="chatbot-bench-")
+    path = os.path.join(directory, f"bench_{customers}x{months}.db")
+    if not os.path.exists(path):
+        conn = init_database(db_path=path)
+        try:
+            populate_synthetic_data(conn, SyntheticDataConfig(customers=customers, months=months))
+        finally:
+            conn.close()
+    return path
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Return the ``pct`` percentile (0-100) of ``values`` using linear interpolation."""
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[max(0, min(98, round(pct) - 1))]
+
+
+def summarize(values: list[float]) -> dict[str, float]:
+    """Return the usual latency summary of a list of durations in seconds."""
+    return {
+        "count": len(values),
+        "mean": statistics.fmean(values) if values else 0.0,
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values, default=0.0),
+    }
+
+
+def table_sizes(path: str) -> dict[str, int]:
+    """Return the row count of every application table in the database."""
+    conn = sqlite3.connect(path)
+    try:
+        return {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("customers", "spending_events", "electricity_plans")
+        }
+    finally:
+        conn.close()
+
+
+def flatten_metrics(results: dict, prefix: str = "") -> dict[str, float]:
+    """Return the numeric metrics of nested results as ``{"a.b.c": value}``, without the config."""
+    flat = {}
+    for key, value in results.items():
+        if key == "config":
+            continue
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten_metrics(value, f"{name}."))
+        elif isinstance(value, int | float) and not name.endswith(("count", ".threads")):
+            flat[name] = float(value)
+    return flat
+
+
+def compare(results: dict, baseline: dict, tolerance: float, higher_is_better: tuple[str, ...] = ()) -> list[dict]:
+    """Compare the metrics present in both results; a change worse than ``tolerance`` is a regression.
+
+    Metrics are lower-is-better, except those whose name ends with one of ``higher_is_better``.
+    """
+    current, previous = flatten_metrics(results), flatten_metrics(baseline)
+    rows = []
+    for name in sorted(current.keys() & previous.keys()):
+        if previous[name] == 0:
+            continue
+        ratio = current[name] / previous[name]
+        worse = ratio < 1 - tolerance if name.endswith(higher_is_better) else ratio > 1 + tolerance
+        rows.append(
+            {"metric": name, "baseline": previous[name], "current": current[name], "ratio": ratio, "regression": worse}
+        )
+    return rows
+
+
+def report_comparison(
+    results: dict, baseline_path: str, tolerance: float, higher_is_better: tuple[str, ...] = ()
+) -> int:
+    """Print the comparison with the results saved at ``baseline_path``; return the number of regressions."""
+    with open(baseline_path) as f:
+        rows = compare(results, json.load(f), tolerance, higher_is_better)
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(f"{row['metric']:<55} {row['baseline']:>12.3f} {row['current']:>12.3f} {row['ratio']:>7.2f}x {flag}")
+    regressions = sum(row["regression"] for row in rows)
+    print(f"{regressions} regression(s) beyond {tolerance:.0%} against {baseline_path}")
+    return regressions
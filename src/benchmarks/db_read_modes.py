@@ -0,0 +1,138 @@
+"""Tool query throughput under the different connection modes.
+
+Compares, on a synthetic database of realistic size:
+
+* ``connect_per_call``: a new default connection per query, as the tools did before pooling
+* ``pooled``: the default read-write pool (WAL, tuned PRAGMAs)
+* ``read_only_mmap``: ``mode=ro`` connections with memory-mapped I/O and ``query_only``
+* ``immutable_mmap``: as above with ``immutable=1`` (no locking or change detection)
+
+    python -m src.benchmarks.db_read_modes --customers 100000 --months 24 --threads 4
+"""
+
+import argparse
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+
+from src.benchmarks.common import build_synthetic_database, summarize, table_sizes
+from src.db.connection import ConnectionPool, PoolConfig
+from src.db.queries import SIMULATION_HISTORY_QUERY, build_spending_events_query
+
+MMAP_SIZE = 1 << 30
+
+
+def make_workload(customers: int, queries: int, seed: int = 7) -> list[tuple[str, list]]:
+    """Return a mix of paginated spending event lookups and simulator history loads."""
+    rng = random.Random(seed)
+    spending_query, spending_params = build_spending_events_query(limit=25)
+    workload = []
+    for i in range(queries):
+        customer_id = rng.randint(1, customers)
+        if i % 4 == 3:
+            workload.append((SIMULATION_HISTORY_QUERY, [customer_id, 12]))
+        else:
+            workload.append((spending_query, [customer_id, *spending_params]))
+    return workload
+
+
+def connect_per_call(path: str) -> Callable[[str, list], list]:
+    def run(query: str, params: list) -> list:
+        conn = sqlite3.connect(path)
+        try:
+            return conn.execute(query, params).fetchall()
+        finally:
+            conn.close()
+
+    return run
+
+
+def pooled(config: PoolConfig) -> Callable[[str, list], list]:
+    pool = ConnectionPool(config)
+
+    def run(query: str, params: list) -> list:
+        with pool.connection() as conn:
+            return conn.execute(query, params).fetchall()
+
+    return run
+
+
+def measure(run: Callable[[str, list], list], workload: list[tuple[str, list]], threads: int) -> dict:
+    """Run the workload split across ``threads`` threads and return throughput and latency."""
+    latencies: list[float] = []
+    lock = threading.Lock()
+
+    def worker(items: list[tuple[str, list]]) -> None:
+        local = []
+        for query, params in items:
+            start = time.perf_counter()
+            run(query, params)
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=worker, args=(workload[i::threads],)) for i in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    summary = summarize(latencies)
+    return {
+        "queries_per_s": len(workload) / elapsed,
+        "p50_us": summary["p50"] * 1e6,
+        "p95_us": summary["p95"] * 1e6,
+        "p99_us": summary["p99"] * 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=None, help="Existing database to use instead of a synthetic one")
+    parser.add_argument("--customers", type=int, default=100000)
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    path = args.db or build_synthetic_database(args.customers, args.months)
+    # Switch the file to WAL once, as the read-write pool does, so every mode reads the same layout
+    # (the read-only and immutable modes cannot change the journal mode themselves)
+    conn = sqlite3.connect(path)
+    try:
+        journal_mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+    finally:
+        conn.close()
+    if journal_mode != "wal":
+        raise RuntimeError(f"Could not switch {path} to WAL (journal_mode={journal_mode})")
+
+    modes = {
+        "connect_per_call": connect_per_call(path),
+        "pooled": pooled(PoolConfig(path=path, max_size=args.threads)),
+        "read_only_mmap": pooled(
+            PoolConfig(path=path, max_size=args.threads, read_only=True, query_only=True, mmap_size=MMAP_SIZE)
+        ),
+        "immutable_mmap": pooled(
+            PoolConfig(path=path, max_size=args.threads, immutable=True, query_only=True, mmap_size=MMAP_SIZE)
+        ),
+    }
+    workload = make_workload(args.customers, args.queries)
+
+    results = {"tables": table_sizes(path), "threads": args.threads, "queries": args.queries, "modes": {}}
+    for name, run in modes.items():
+        # Warm-up pass so every mode starts with a hot OS page cache
+        measure(run, workload[: len(workload) // 10], args.threads)
+        results["modes"][name] = measure(run, workload, args.threads)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+"""End-to-end benchmark of the compiled chatbot graph on the offline fake model.
+
+Drives ``ChatBot.build_graph()`` through scripted conversations (billing questions with
+customer validation, plan recommendations, and a billing conversation that goes back
+to the primary assistant through ``leave_skill``). Every conversation gets its own
+thread. Reports the per-turn latency, the time spent in each node, in checkpoint writes
+and in each tool (i.e. the database), the bytes serialized per checkpoint and the memory
+retained per thread. Results are written as JSON and compared with a saved baseline:
+
+    python -m src.benchmarks.graph --conversations 200 --output results.json
+    python -m src.benchmarks.graph --baseline results.json --tolerance 0.1
+
+The fake model latency is set with the ``FAKE_MODEL_*`` variables (zero by default, so
+the numbers measure the graph itself). ``--rounds`` repeats the turns of each conversation,
+to see how the checkpoint cost grows with the length of a conversation.
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import random
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import defaultdict
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, ParamSpec, TypeVar
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.graph.state import CompiledStateGraph
+
+from src.benchmarks.common import build_synthetic_database, report_comparison, summarize
+from src.core.chatbot import ChatBot
+from src.db.connection import PoolConfig, configure_pool
+
+# Conversations as lists of user turns; ``{id}`` is replaced by a random customer id
+SCENARIOS = {
+    "billing": [
+        "How much did I spend on my electricity bills recently?",
+        "My customer id is {id}",
+        "Thanks, can you show my bills again?",
+    ],
+    "recommendation": [
+        "Can you recommend a cheaper plan for me? My customer id is {id}",
+        "What about the Eco Plan?",
+        "Which plans are available?",
+    ],
+    "handoff_back": [
+        "I want to check my bills",
+        "customer id {id}",
+        "Actually, which plans would you recommend?",
+    ],
+}
+
+# Metrics compared with the baseline: lower is better, except for throughput
+HIGHER_IS_BETTER = ("turns_per_s",)
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+class TimingHandler(BaseCallbackHandler):
+    """Records the duration of every graph node run and tool run."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._started: dict[UUID, tuple[str, float]] = {}
+        self.nodes: dict[str, list[float]] = defaultdict(list)
+        self.tools: dict[str, list[float]] = defaultdict(list)
+
+    def on_chain_start(
+        self, serialized: dict, inputs: object, *, run_id: UUID, metadata: dict | None = None, **kwargs: object
+    ) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        # Only the node run itself carries the node name; its inner runnables have their own names
+        if node is not None and kwargs.get("name") == node:
+            with self._lock:
+                self._started[run_id] = (f"node:{node}", time.perf_counter())
+
+    def on_tool_start(self, serialized: dict, input_str: str, *, run_id: UUID, **kwargs: object) -> None:
+        name = kwargs.get("name") or (serialized or {}).get("name", "tool")
+        with self._lock:
+            self._started[run_id] = (f"tool:{name}", time.perf_counter())
+
+    def _end(self, run_id: UUID) -> None:
+        with self._lock:
+            started = self._started.pop(run_id, None)
+            if started is None:
+                return
+            key, start = started
+            kind, name = key.split(":", 1)
+            (self.nodes if kind == "node" else self.tools)[name].append(time.perf_counter() - start)
+
+    def on_chain_end(self, outputs: object, *, run_id: UUID, **kwargs: object) -> None:
+        self._end(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: object) -> None:
+        self._end(run_id)
+
+    def on_tool_end(self, output: object, *, run_id: UUID, **kwargs: object) -> None:
+        self._end(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: object) -> None:
+        self._end(run_id)
+
+
+class MeteredSerializer(SerializerProtocol):
+    """Serializer that counts the bytes written by another serializer and the time it takes.
+
+    The counts go to the checkpoint operation running in the current thread (``operation``).
+    """
+
+    def __init__(self, serde: SerializerProtocol) -> None:
+        self.serde = serde
+        self.current = threading.local()
+        self._lock = threading.Lock()
+        self.bytes: dict[str, int] = defaultdict(int)
+        self.seconds: dict[str, float] = defaultdict(float)
+
+    def dumps(self, obj: object) -> bytes:
+        return self.serde.dumps(obj)
+
+    def loads(self, data: bytes) -> object:
+        return self.serde.loads(data)
+
+    def dumps_typed(self, obj: object) -> tuple[str, bytes]:
+        start = time.perf_counter()
+        type_, data = self.serde.dumps_typed(obj)
+        elapsed = time.perf_counter() - start
+        operation = getattr(self.current, "operation", "other")
+        with self._lock:
+            self.bytes[operation] += len(data or b"")
+            self.seconds[operation] += elapsed
+        return type_, data
+
+    def loads_typed(self, data: tuple[str, bytes]) -> object:
+        return self.serde.loads_typed(data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.bytes.clear()
+            self.seconds.clear()
+
+
+class TimedCheckpointSaver(BaseCheckpointSaver):
+    """Checkpoint saver that times the reads and writes of another saver, and their serialization."""
+
+    def __init__(self, saver: BaseCheckpointSaver) -> None:
+        self.metered = MeteredSerializer(saver.serde)
+        saver.serde = self.metered
+        super().__init__(serde=self.metered)
+        self.saver = saver
+        self._lock = threading.Lock()
+        self.timings: dict[str, list[float]] = defaultdict(list)
+
+    def _timed(self, operation: str, fn: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        self.metered.current.operation = operation
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.metered.current.operation = "other"
+            with self._lock:
+                self.timings[operation].append(elapsed)
+
+    def serialization(self) -> dict[str, dict[str, float]]:
+        """Bytes written and serialization time per call of each write operation."""
+        with self._lock:
+            calls = {operation: len(self.timings[operation]) for operation in ("put", "put_writes")}
+        return {
+            operation: {
+                "bytes_per_call": self.metered.bytes[operation] / count,
+                "serialize_ms_per_call": self.metered.seconds[operation] * 1000 / count,
+            }
+            for operation, count in calls.items()
+            if count
+        }
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return self._timed("get_tuple", self.saver.get_tuple, config)
+
+    def list(self, config: RunnableConfig | None, **kwargs: object) -> Iterator[CheckpointTuple]:
+        return self.saver.list(config, **kwargs)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return self._timed("put", self.saver.put, config, checkpoint, metadata, new_versions)
+
+    def put_writes(
+        self, config: RunnableConfig, writes: Sequence[tuple[str, Any]], task_id: str, task_path: str = ""
+    ) -> None:
+        self._timed("put_writes", self.saver.put_writes, config, writes, task_id, task_path)
+
+    def delete_thread(self, thread_id: str) -> None:
+        self.saver.delete_thread(thread_id)
+
+    def get_next_version(self, current: T | None, channel: object) -> T:
+        return self.saver.get_next_version(current, channel)
+
+
+def run_conversation(
+    graph: CompiledStateGraph, scenario: str, customer_id: int, callbacks: list, rounds: int = 1
+) -> list[float]:
+    """Run one conversation in a new thread and return the duration of each turn."""
+    config = {"configurable": {"thread_id": str(uuid.uuid4())}, "callbacks": callbacks}
+    durations = []
+    for text in SCENARIOS[scenario] * rounds:
+        start = time.perf_counter()
+        graph.invoke({"messages": [HumanMessage(content=text.format(id=customer_id))]}, config)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def _ms(summary: dict[str, float]) -> dict[str, float]:
+    return {key: value if key == "count" else value * 1000 for key, value in summary.items()}
+
+
+def run_benchmark(
+    conversations: int, concurrency: int, memory_conversations: int, customers: int, seed: int, rounds: int = 1
+) -> dict:
+    """Run the benchmark with the current environment and return its results."""
+    chatbot = ChatBot()
+    saver = TimedCheckpointSaver(chatbot.checkpoint_saver)
+    chatbot.checkpoint_saver = saver
+    chatbot.build_graph()
+    graph = chatbot.graph
+
+    rng = random.Random(seed)
+    plan = [(name, rng.randint(1, customers)) for name in SCENARIOS for _ in range(max(1, conversations // 3))]
+    rng.shuffle(plan)
+
+    # Warm up the models, the connection pool and the tool caches
+    for name in SCENARIOS:
+        run_conversation(graph, name, 1, [])
+
+    handler = TimingHandler()
+    saver.timings.clear()
+    saver.metered.clear()
+    turns: dict[str, list[float]] = defaultdict(list)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [(name, executor.submit(run_conversation, graph, name, cid, [handler], rounds)) for name, cid in plan]
+        for name, future in futures:
+            turns[name].extend(future.result())
+    elapsed = time.perf_counter() - start
+    all_turns = [d for durations in turns.values() for d in durations]
+
+    # Memory retained per thread, measured separately since tracemalloc slows everything down
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for i in range(memory_conversations):
+        name = list(SCENARIOS)[i % len(SCENARIOS)]
+        run_conversation(graph, name, rng.randint(1, customers), [], rounds)
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    retained = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+    return {
+        "config": {
+            "conversations": len(plan),
+            "concurrency": concurrency,
+            "rounds": rounds,
+            "customers": customers,
+            "seed": seed,
+            "models": {assistant: selection.label for assistant, selection in chatbot.model_selections.items()},
+            "intent_router": chatbot.intent_router is not None,
+        },
+        "turns_per_s": len(all_turns) / elapsed if elapsed else 0.0,
+        "turn_ms": _ms(summarize(all_turns)),
+        "scenario_turn_ms": {name: _ms(summarize(durations)) for name, durations in turns.items()},
+        "node_ms": {name: _ms(summarize(durations)) for name, durations in sorted(handler.nodes.items())},
+        "checkpoint_ms": {name: _ms(summarize(durations)) for name, durations in sorted(saver.timings.items())},
+        "checkpoint_serialization": saver.serialization(),
+        "tool_ms": {name: _ms(summarize(durations)) for name, durations in sorted(handler.tools.items())},
+        "memory": {
+            "threads": memory_conversations,
+            "bytes_per_thread": retained / memory_conversations if memory_conversations else 0.0,
+            "peak_bytes": peak,
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=None, help="Existing database to use instead of a synthetic one")
+    parser.add_argument("--customers", type=int, default=2000)
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--conversations", type=int, default=60)
+    parser.add_argument("--concurrency", type=int, default=1, help="Conversations run at the same time")
+    parser.add_argument("--rounds", type=int, default=1, help="Times the turns of each conversation are repeated")
+    parser.add_argument("--memory-conversations", type=int, default=30, help="Threads used to measure memory")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--model", default="fake", help="Model chain of every assistant (default: offline fake)")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", default=None, help="Results of an earlier run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Relative change reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    os.environ["MODEL_CHAIN"] = args.model
+    os.environ.setdefault("FAKE_MODEL_TTFT", "0")
+    os.environ.setdefault("FAKE_MODEL_TIME_PER_TOKEN", "0")
+    os.environ.setdefault("FAKE_MODEL_SEED", str(args.seed))
+    for assistant in ("PRIMARY_ASSISTANT", "SPENDING_ASSISTANT", "RECOMMENDATION_ASSISTANT", "SUMMARIZER"):
+        os.environ.pop(f"MODEL_{assistant}", None)
+
+    path = args.db or build_synthetic_database(args.customers, args.months)
+    configure_pool(PoolConfig(path=path))
+
+    results = run_benchmark(
+        args.conversations, args.concurrency, args.memory_conversations, args.customers, args.seed, args.rounds
+    )
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    summary = ("turns_per_s", "turn_ms", "checkpoint_ms", "checkpoint_serialization", "memory")
+    print(json.dumps({key: results[key] for key in summary}, indent=2))
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        regressions = report_comparison(results, args.baseline, args.tolerance, HIGHER_IS_BETTER)
+        if regressions and args.fail_on_regression:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Wall-clock time of a model turn that issues several database tool calls.
+
+Runs the same multi-call AI message through the tool node twice: with ``ToolNode.invoke``,
+which runs the blocking tools of the message on LangChain's default thread pool (what a
+sync graph gets), and with ``ToolNode.ainvoke``, which runs the async tool variants
+concurrently on the bounded tool executor (what ``graph.astream`` gets).
+
+    python -m src.benchmarks.parallel_tools --customers 20000 --months 36 --calls 8
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+
+from langchain_core.messages import AIMessage
+from langgraph.prebuilt import ToolNode
+
+from src.benchmarks.common import build_synthetic_database
+from src.db.connection import PoolConfig, configure_pool
+from src.tools import fetch_spending_events, list_supported_plans, simulate_plan_costs, validate_customer
+
+TOOLS = [fetch_spending_events, list_supported_plans, simulate_plan_costs, validate_customer]
+
+
+def build_turn(calls: int, customers: int) -> AIMessage:
+    """Build an AI message with ``calls`` tool calls spread over different customers."""
+    tool_calls = []
+    for i in range(calls):
+        customer_id = 1 + (i * 7919) % customers
+        if i % 4 == 3:
+            name, args = "validate_customer", {"customer_id": customer_id}
+        elif i % 2:
+            name, args = "simulate_plan_costs", {"customer_id": customer_id, "months": 36}
+        else:
+            name, args = "fetch_spending_events", {"customer_id": customer_id, "max_rows": 100}
+        tool_calls.append({"name": name, "args": args, "id": f"call_{i}", "type": "tool_call"})
+    return AIMessage(content="", tool_calls=tool_calls)
+
+
+def run_sync(node: ToolNode, message: AIMessage) -> float:
+    start = time.perf_counter()
+    node.invoke({"messages": [message]})
+    return time.perf_counter() - start
+
+
+async def run_async(node: ToolNode, message: AIMessage) -> float:
+    start = time.perf_counter()
+    await node.ainvoke({"messages": [message]})
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=None, help="Existing database to use instead of a synthetic one")
+    parser.add_argument("--customers", type=int, default=20000)
+    parser.add_argument("--months", type=int, default=36)
+    parser.add_argument("--calls", type=int, default=8, help="Tool calls in the simulated model turn")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    path = args.db or build_synthetic_database(args.customers, args.months)
+    configure_pool(PoolConfig(path=path))
+
+    node = ToolNode(TOOLS)
+    message = build_turn(args.calls, args.customers)
+
+    # Warm up the connection pool, the plan catalog and the page cache
+    run_sync(node, message)
+    asyncio.run(run_async(node, message))
+
+    invoke_times = [run_sync(node, message) for _ in range(args.repeat)]
+    ainvoke_times = [asyncio.run(run_async(node, message)) for _ in range(args.repeat)]
+
+    results = {
+        "calls_per_turn": args.calls,
+        "invoke_ms": statistics.median(invoke_times) * 1000,
+        "ainvoke_ms": statistics.median(ainvoke_times) * 1000,
+    }
+    results["speedup"] = results["invoke_ms"] / results["ainvoke_ms"]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
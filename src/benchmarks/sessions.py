@@ -0,0 +1,76 @@
+"""Cost of starting a conversation: a full ChatBot per session versus a ChatSession handle.
+
+A ``ChatBot`` rebuilds the assistants, binds their tools and compiles the graph; a
+``ChatSession`` reuses the process-wide compiled graph and only creates a thread config.
+Reports the creation time and the memory held per session, for both:
+
+    python -m src.benchmarks.sessions --sessions 50
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from src.core.chatbot import ChatBot, ChatSession, get_chatbot
+
+
+def new_chatbot() -> ChatBot:
+    chatbot = ChatBot()
+    chatbot.build_graph()
+    return chatbot
+
+
+def measure(create: Callable[[], Any], sessions: int) -> dict[str, float]:
+    """Return the median creation time and the memory retained per live session."""
+    durations = []
+    for _ in range(sessions):
+        start = time.perf_counter()
+        create()
+        durations.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    live = [create() for _ in range(sessions)]
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del live
+    return {
+        "create_ms_p50": statistics.median(durations) * 1000,
+        "create_ms_max": max(durations) * 1000,
+        "bytes_per_session": retained / sessions,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--model", default="fake", help="Model chain of every assistant (default: offline fake)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    os.environ["MODEL_CHAIN"] = args.model
+
+    # Build the shared graph first, so the session numbers only include the per-session cost
+    get_chatbot()
+    results = {
+        "sessions": args.sessions,
+        "chatbot_per_session": measure(new_chatbot, args.sessions),
+        "shared_graph_session": measure(ChatSession, args.sessions),
+    }
+    before, after = results["chatbot_per_session"], results["shared_graph_session"]
+    results["create_speedup"] = before["create_ms_p50"] / after["create_ms_p50"] if after["create_ms_p50"] else 0.0
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
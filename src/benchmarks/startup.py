@@ -0,0 +1,159 @@
+"""Startup cost of the chatbot modules: import time breakdown and resident memory.
+
+Every measurement runs in a fresh interpreter with ``-X importtime``. For each module it
+reports the wall time of the process, the time spent importing the module, the peak RSS
+and the slowest imports (cumulative, i.e. including what they import themselves). The
+first ``get_model`` of each provider is measured the same way, since provider packages
+are only imported when a model of that provider is created:
+
+    python -m src.benchmarks.startup --output startup.json
+    python -m src.benchmarks.startup --baseline startup.json --tolerance 0.2
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+from src.benchmarks.common import report_comparison
+
+MODULES = ("src.models.model_factory", "src.core.chatbot", "src.main")
+PROVIDERS = ("fake", "openai", "anthropic", "deepseek", "ollama", "google-genai")
+
+# Runs in the child: ``setup`` is timed separately from the interpreter startup, then
+# ``target`` is timed on its own (nothing when only the import is measured)
+_CHILD = """
+import json, resource, time
+start = time.perf_counter()
+{setup}
+imported = time.perf_counter()
+{target}
+done = time.perf_counter()
+print(json.dumps({{
+    "import_s": imported - start,
+    "target_s": done - imported,
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+}}))
+"""
+
+# The provider clients check that a key is set when they are created, not when they are used
+_DUMMY_KEYS = ("OPENAI_API_KEY", "ANTHROPIC_API_KEY", "DEEPSEEK_API_KEY", "GOOGLE_API_KEY")
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def parse_importtime(stderr: str) -> dict[str, dict[str, float]]:
+    """Return ``{module: {"self_ms", "cumulative_ms", "depth"}}`` from ``-X importtime`` output."""
+    modules = {}
+    for match in _IMPORTTIME_LINE.finditer(stderr):
+        self_us, cumulative_us, indent, name = match.groups()
+        modules[name] = {
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+            "depth": len(indent) // 2,
+        }
+    return modules
+
+
+def run_child(setup: str, target: str = "pass") -> tuple[dict, dict[str, dict[str, float]]]:
+    """Run the snippets in a fresh interpreter; return its measurements and import breakdown."""
+    env = {**os.environ, **{key: os.environ.get(key, "benchmark") for key in _DUMMY_KEYS}}
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD.format(setup=setup, target=target)],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=False,
+    )
+    wall = time.perf_counter() - start
+    if process.returncode != 0:
+        raise RuntimeError(f"Benchmark child failed:\n{process.stderr[-2000:]}")
+    measured = json.loads(process.stdout.strip().splitlines()[-1])
+    measured["wall_s"] = wall
+    return measured, parse_importtime(process.stderr)
+
+
+def measure(setup: str, target: str = "pass", module: str = "", repeats: int = 5, top: int = 15) -> dict:
+    """Median of ``repeats`` fresh runs, with the slowest imports of the median run.
+
+    ``module`` and its parent packages are left out of the slowest imports, since their
+    cumulative time is the whole import.
+    """
+    runs = [run_child(setup, target) for _ in range(repeats)]
+    median = sorted(runs, key=lambda run: run[0]["import_s"])[len(runs) // 2]
+    measured = {name for name in median[1] if module == name or module.startswith(f"{name}.")}
+    timings = [(name, timing) for name, timing in median[1].items() if name not in measured]
+    slowest = sorted(timings, key=lambda item: item[1]["cumulative_ms"], reverse=True)[:top]
+    result = {
+        "wall_ms": statistics.median(run[0]["wall_s"] for run in runs) * 1000,
+        "max_rss_kb": statistics.median(run[0]["max_rss_kb"] for run in runs),
+        "modules_imported": len(median[1]),
+        "slowest_imports": [{"module": name, **timing} for name, timing in slowest],
+    }
+    if setup:
+        result["import_ms"] = statistics.median(run[0]["import_s"] for run in runs) * 1000
+    if target != "pass":
+        result["target_ms"] = statistics.median(run[0]["target_s"] for run in runs) * 1000
+    return result
+
+
+def run_benchmark(modules: tuple[str, ...], providers: tuple[str, ...], repeats: int, top: int) -> dict:
+    results = {
+        "config": {"modules": modules, "providers": providers, "repeats": repeats, "python": sys.version.split()[0]},
+        "interpreter": measure("", repeats=repeats, top=top),
+        "imports": {module: measure(f"import {module}", module=module, repeats=repeats, top=top) for module in modules},
+        "first_model": {},
+    }
+    for provider in providers:
+        results["first_model"][provider] = measure(
+            "from src.models.model_factory import ModelFactory\n"
+            "from src.models.model_names import ModelProvider\n"
+            "factory = ModelFactory()",
+            target=f"factory.get_model(ModelProvider({provider!r}), None)",
+            module="src.models.model_factory",
+            repeats=repeats,
+            top=top,
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modules", nargs="*", default=list(MODULES), help="Modules whose import is measured")
+    parser.add_argument("--providers", nargs="*", default=list(PROVIDERS), help="Providers of the first get_model")
+    parser.add_argument("--repeats", type=int, default=5, help="Fresh interpreters per measurement")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports listed per measurement")
+    parser.add_argument("--output", default="startup_results.json")
+    parser.add_argument("--baseline", default=None, help="Results of an earlier run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Relative change reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    results = run_benchmark(tuple(args.modules), tuple(args.providers), args.repeats, args.top)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    rows = [("python", results["interpreter"], "wall_ms")]
+    rows += [(module, result, "import_ms") for module, result in results["imports"].items()]
+    rows += [(f"get_model({provider})", result, "target_ms") for provider, result in results["first_model"].items()]
+    for name, result, key in rows:
+        rss = result["max_rss_kb"] / 1024
+        print(f"{name:<32} {result[key]:>8.1f} ms  wall {result['wall_ms']:>8.1f} ms  rss {rss:>6.1f} MiB")
+        for entry in result["slowest_imports"][:3] if key != "target_ms" else []:
+            print(f"    {entry['module']:<40} {entry['cumulative_ms']:>8.1f} ms cumulative")
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        # Only the numbers are compared; the lists of slowest imports are for reading
+        regressions = report_comparison(results, args.baseline, args.tolerance)
+        if regressions and args.fail_on_regression:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ from langgraph.graph import END
 from langgraph.prebuilt import tools_condition
 
 from src.bot.bot_instance import Assistant
+from src.core.graph import ENTRY_HANDOFFS, first_handoff
 from src.core.prompts import primary_prompt, recommendation_prompt, spending_prompt
 from src.core.state import State
 from src.tools import (
@@ -12,6 +13,7 @@ from src.tools import (
     fetch_plan_information,
     fetch_spending_events,
     list_supported_plans,
+    simulate_plan_costs,
     validate_customer,
 )
 
@@ -19,10 +21,10 @@ from src.tools import (
 class SpendingAssistant(Assistant):
     """Spending/billing assistant class."""
 
-    def __init__(self, llm: Runnable, name: str = "spending_assistant") -> None:
+    def __init__(self, llm: Runnable, name: str = "spending_assistant", model: str | None = None) -> None:
         tools = [fetch_spending_events, validate_customer, CompleteOrEscalate]
         runnable = spending_prompt | llm.bind_tools(tools)
-        super().__init__(runnable=runnable, name=name, tools=tools)
+        super().__init__(runnable=runnable, name=name, tools=tools, model=model)
 
     def __call__(self, state: State, config: RunnableConfig = None) -> dict:
         """Process the state and manage customer validation."""
@@ -54,19 +56,25 @@ class SpendingAssistant(Assistant):
 class RecommendationAssistant(Assistant):
     """Plan recommendation assistant class."""
 
-    def __init__(self, llm: Runnable, name: str = "recommendation_assistant") -> None:
-        tools = [list_supported_plans, fetch_plan_information, CompleteOrEscalate]
+    def __init__(self, llm: Runnable, name: str = "recommendation_assistant", model: str | None = None) -> None:
+        tools = [
+            list_supported_plans,
+            fetch_plan_information,
+            validate_customer,
+            simulate_plan_costs,
+            CompleteOrEscalate,
+        ]
         runnable = recommendation_prompt | llm.bind_tools(tools)
-        super().__init__(runnable=runnable, name=name, tools=tools)
+        super().__init__(runnable=runnable, name=name, tools=tools, model=model)
 
 
 class PrimaryAssistant(Assistant):
     """Primary assistant class."""
 
-    def __init__(self, llm: Runnable, name: str = "primary_assistant") -> None:
+    def __init__(self, llm: Runnable, name: str = "primary_assistant", model: str | None = None) -> None:
         tools = [ToSpendingAssistant, ToRecommendationAssistant]
         runnable = primary_prompt | llm.bind_tools(tools)
-        super().__init__(runnable=runnable, name=name, tools=tools)
+        super().__init__(runnable=runnable, name=name, tools=tools, model=model)
 
     def route_primary_assistant(self, state: State) -> str:
         route = tools_condition(state)
@@ -74,9 +82,9 @@ class PrimaryAssistant(Assistant):
             return END
         tool_calls = state["messages"][-1].tool_calls
         if tool_calls:
-            if tool_calls[0]["name"] == ToSpendingAssistant.__name__:
-                return "enter_spending"
-            elif tool_calls[0]["name"] == ToRecommendationAssistant.__name__:
-                return "enter_recommendation"
+            # The entry node answers every other call of the message, so route on the first handoff
+            handoff = first_handoff(tool_calls, ENTRY_HANDOFFS)
+            if handoff is not None:
+                return ENTRY_HANDOFFS[handoff["name"]]
             return "primary_assistant_tools"
         raise ValueError("Invalid route")
@@ -1,20 +1,34 @@
+import logging
+import time
+
 from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_core.runnables.config import merge_configs
 from langgraph.graph import END
 from langgraph.prebuilt import tools_condition
 
+from src.core.context import get_context_manager
 from src.core.state import State
 from src.tools import CompleteOrEscalate
 
+logger = logging.getLogger(__name__)
+
 
 class Assistant:
     """Base assistant class which will be inherited by other assistants."""
 
-    def __init__(self, runnable: Runnable, name: str, tools: list) -> None:
+    def __init__(self, runnable: Runnable, name: str, tools: list, model: str | None = None) -> None:
         self.runnable = runnable
         self.name = name
         self.tools = tools
+        self.model = model
 
     def __call__(self, state: State, config: RunnableConfig) -> dict:
+        # Send the rolling summary and the most recent turns that fit the token budget
+        messages, tokens_before, tokens_after = get_context_manager().prompt_messages(state)
+        state = {**state, "messages": messages}
+        # Tag the model run with the assistant and its model so traces show who used what
+        config = merge_configs(config, {"metadata": {"assistant": self.name, "model": self.model}})
+        start = time.perf_counter()
         while True:
             result = self.runnable.invoke(state, config=config)
 
@@ -25,6 +39,14 @@ class Assistant:
                 state = {**state, "messages": messages}
             else:
                 break
+        latency = time.perf_counter() - start
+        logger.debug(f"{self.name} ({self.model}) answered in {latency:.2f}s")
+        result.response_metadata["prompt_history_tokens"] = {"before": tokens_before, "after": tokens_after}
+        result.response_metadata["assistant_model"] = {
+            "assistant": self.name,
+            "model": self.model,
+            "latency_s": latency,
+        }
         return {"messages": result}
 
     def route_non_primary_assistants(self, state: State) -> str:
@@ -7,9 +7,13 @@ from datetime import datetime
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
 import streamlit as st
-from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.messages import HumanMessage
 
-from src.core.chatbot import ChatBot
+from src.core.chatbot import ChatSession
+from src.core.checkpointer import SqliteCheckpointSaver
+from src.core.streaming import ReplyStream
+from src.core.transcripts import get_transcript_writer
+from src.models import get_model_registry
 
 # Set page configuration
 st.set_page_config(
@@ -70,8 +74,8 @@ st.markdown(
 def initialize_session_state() -> None:
     """Initialize session state variables if they don't exist"""
     if "chatbot" not in st.session_state:
-        st.session_state.chatbot = ChatBot()
-        st.session_state.chatbot.build_graph()
+        # Sessions share the graph compiled once per process; each only holds its thread config
+        st.session_state.chatbot = ChatSession()
 
     if "messages" not in st.session_state:
         st.session_state.messages = []
@@ -110,74 +114,40 @@ def display_conversation_history() -> None:
 
 
 def process_user_input() -> None:
-    """Process the user input and get the chatbot response"""
+    """Queue the user input; the reply is streamed by ``stream_response`` on the next run"""
     user_input = st.session_state.user_input
 
     if user_input:
         # Add the user message to the conversation
         st.session_state.messages.append({"role": "user", "content": user_input})
+        st.session_state.pending_input = user_input
 
+        # Clear the input box
+        st.session_state.user_input = ""
+
+
+def stream_response() -> None:
+    """Stream the chatbot response to the pending user input"""
+    user_input = st.session_state.pop("pending_input", None)
+
+    if user_input:
         # Get chatbot response
         try:
-            # Process internal graph stream (we don't display this to the user)
-            for s in st.session_state.chatbot.graph.stream(
-                {"messages": [HumanMessage(content=user_input, name="user")]},
-                config=st.session_state.chatbot.config,
-            ):
-                if "__end__" not in s:
-                    # We could log this for debugging but we don't display it
-                    pass
-
-            # Get checkpoint data for saving
-            checkpoint = st.session_state.chatbot.checkpoint_saver.get(st.session_state.chatbot.config)
-            timestamp = checkpoint["ts"].split(".")[0]
-            timestamp = timestamp.replace(":", "-")  # windows does not allow colons in file names
-
-            # Create readable checkpoint format
-            readable_checkpoint = {
-                "thread_id": st.session_state.chatbot.thread_id,
-                "timestamp": timestamp,
-                "conversation": [],
-            }
-
-            # Get customer_id if available in state
-            state = st.session_state.chatbot.graph.get_state(config=st.session_state.chatbot.config)
-            if "customer_id" in state.values:
-                readable_checkpoint["customer_id"] = state.values["customer_id"]
-
-            # Extract messages in a clean format
-            if "messages" in checkpoint["channel_values"]:
-                messages = checkpoint["channel_values"]["messages"]
-                for msg in messages:
-                    if isinstance(msg, HumanMessage):
-                        role = "user"
-                        content = msg.content
-                    elif isinstance(msg, AIMessage):
-                        role = "assistant"
-                        content = msg.content
-                    elif isinstance(msg, dict):
-                        msg_type = msg.get("type", "")
-                        role = "user" if msg_type == "HumanMessage" else "assistant"
-                        content = msg.get("content", "")
-                    else:
-                        role = "unknown"
-                        content = str(msg)
-
-                    readable_checkpoint["conversation"].append({"role": role, "content": content})
-
-            # Save checkpoint to file
-            if not os.path.exists("checkpoints"):
-                os.makedirs("checkpoints")
-
-            st.session_state.chatbot.checkpoint_file = os.path.join("checkpoints", f"{timestamp}.json")
-            with open(st.session_state.chatbot.checkpoint_file, "w", encoding="utf-8") as f:
-                json.dump(readable_checkpoint, f, ensure_ascii=False, indent=2)
-
-            # Get the bot's reply
-            bot_reply = (
-                st.session_state.chatbot.graph.get_state(config=st.session_state.chatbot.config)
-                .values["messages"][-1]
-                .content
+            # Render the reply token by token while the graph runs
+            with st.container():
+                reply_stream = ReplyStream(
+                    st.session_state.chatbot.graph,
+                    {"messages": [HumanMessage(content=user_input, name="user")]},
+                    config=st.session_state.chatbot.config,
+                )
+                bot_reply = st.write_stream(reply_stream)
+
+            # Append only this turn's messages to the transcript, written in the background
+            get_transcript_writer().append(
+                st.session_state.chatbot.thread_id,
+                [HumanMessage(content=user_input, name="user"), *reply_stream.messages],
+                customer_id=reply_stream.values.get("customer_id"),
+                summary=reply_stream.values.get("summary"),
             )
 
             # Add the bot's reply to the conversation
@@ -186,15 +156,13 @@ def process_user_input() -> None:
         except Exception as e:
             error_message = f"Error getting bot reply: {str(e)}"
             st.session_state.messages.append({"role": "assistant", "content": error_message})
-
-        # Clear the input box
-        st.session_state.user_input = ""
+            display_message(error_message)
 
 
 def restart_conversation() -> None:
     """Restart the conversation with a new thread ID"""
-    st.session_state.chatbot = ChatBot()
-    st.session_state.chatbot.build_graph()
+    st.session_state.chatbot.end()
+    st.session_state.chatbot = ChatSession()
     st.session_state.messages = []
     st.session_state.conversation_history = []
     st.rerun()
@@ -248,6 +216,18 @@ def main() -> None:
         # Display thread ID for reference
         st.divider()
         st.caption(f"Thread ID: {st.session_state.chatbot.thread_id}")
+        registry_stats = get_model_registry().stats()
+        st.caption(
+            f"Model clients: {registry_stats.models} | "
+            f"HTTP connections: {registry_stats.connections} ({registry_stats.idle_connections} idle)"
+        )
+        saver = st.session_state.chatbot.checkpoint_saver
+        if isinstance(saver, SqliteCheckpointSaver):
+            store_stats = saver.stats()
+            st.caption(
+                f"Checkpoints: {store_stats.checkpoints} in {store_stats.threads} threads | "
+                f"{(store_stats.db_bytes + store_stats.wal_bytes) / 1e6:.1f} MB on disk"
+            )
 
     # Chat interface
     chat_container = st.container()
@@ -255,6 +235,7 @@ def main() -> None:
     # Display chat messages
     with chat_container:
         display_conversation_history()
+        stream_response()
 
     # User input section
     st.text_input(
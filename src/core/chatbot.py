@@ -1,5 +1,6 @@
+import functools
 import logging
-import os
+import threading
 import uuid
 
 import dotenv
@@ -7,10 +8,13 @@ from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import END, START, StateGraph
 
 from src.bot import PrimaryAssistant, RecommendationAssistant, SpendingAssistant
+from src.core.checkpointer import create_checkpoint_saver
+from src.core.context import ConversationSummarizer
 from src.core.error_manager import create_tool_node_with_fallback
-from src.core.graph import create_entry_node, pop_dialog_state, route_to_workflow
+from src.core.graph import create_entry_node, create_leave_node, route_to_workflow
+from src.core.intent_router import create_intent_router
 from src.core.state import State
-from src.models import ModelFactory, ModelName, ModelProvider
+from src.models import ModelFactory, load_model_selections
 
 logger = logging.getLogger(__name__)
 
@@ -19,14 +23,21 @@ dotenv.load_dotenv()
 
 class ChatBot:
     def __init__(self) -> None:
-        self.llm = ModelFactory().get_model(ModelProvider.OPENAI, ModelName.GPT_4O_MINI)
-        self.checkpoint_saver = MemorySaver()
+        # Each assistant gets its own model (or fallback chain), see src/models/model_config.py
+        self.model_selections = load_model_selections()
+        model_factory = ModelFactory()
+        self.llms = {
+            assistant: model_factory.get_selected_model(selection)
+            for assistant, selection in self.model_selections.items()
+        }
+        self.llm = self.llms["primary_assistant"]
+        # In memory by default; CHECKPOINT_BACKEND=sqlite keeps the conversations on disk
+        self.checkpoint_saver = create_checkpoint_saver()
+        # Off by default, and only used with a model whose held-out accuracy is high enough
+        self.intent_router = create_intent_router()
         self.thread_id = self.create_thread_id()
         self.config = {"configurable": {"thread_id": self.thread_id}}
 
-        if not os.path.exists("checkpoints"):
-            os.makedirs("checkpoints")
-
     def create_thread_id(self) -> str:
         """Create a new thread ID for conversation persistence."""
         thread_id = str(uuid.uuid4())
@@ -35,9 +46,15 @@ class ChatBot:
 
     def build_graph(self) -> None:
         # ---- Define the various assistants of the chatbot ----
-        primary_assistant = PrimaryAssistant(self.llm)
-        spending_assistant = SpendingAssistant(self.llm)
-        recommendation_assistant = RecommendationAssistant(self.llm)
+        primary_assistant = PrimaryAssistant(
+            self.llms["primary_assistant"], model=self.model_selections["primary_assistant"].label
+        )
+        spending_assistant = SpendingAssistant(
+            self.llms["spending_assistant"], model=self.model_selections["spending_assistant"].label
+        )
+        recommendation_assistant = RecommendationAssistant(
+            self.llms["recommendation_assistant"], model=self.model_selections["recommendation_assistant"].label
+        )
 
         # ---- Specify the state of the LangGraph graph. ----
         builder = StateGraph(State)
@@ -52,10 +69,8 @@ class ChatBot:
         builder.add_node("primary_assistant", primary_assistant)
 
         # Tools are placed within tool nodes.
-        builder.add_node(
-            "primary_assistant_tools",
-            create_tool_node_with_fallback(primary_assistant.tools),
-        )
+        primary_tool_node = create_tool_node_with_fallback(primary_assistant.tools)
+        builder.add_node("primary_assistant_tools", primary_tool_node)
 
         # Add conditional edges to enable routing to either i) spending assistant, ii) recommendation assistant, iii) tool node (for tool calling), or iv) END node (directly respond to the user).
         builder.add_conditional_edges(
@@ -76,22 +91,21 @@ class ChatBot:
         # Spending assistant nodes and edges
         # =====================================================================
 
+        # Add node for the tools of the spending assistant.
+        spending_tool_node = create_tool_node_with_fallback(spending_assistant.tools)
+        builder.add_node("spending_assistant_tools", spending_tool_node)
+
         # Add the 'enter' node (this sets the scope for second level assistants).
+        # It also runs the other tool calls the primary assistant made in the same message with the spending tools.
         builder.add_node(
             "enter_spending",
-            create_entry_node("spending_assistant", "spending_assistant"),
+            create_entry_node("spending_assistant", "spending_assistant", spending_tool_node),
         )
         # Add the spending assistant node.
         builder.add_node("spending_assistant", spending_assistant)
         # Connect the enter node to the spending assistant node.
         builder.add_edge("enter_spending", "spending_assistant")
 
-        # Add node for the tools of the spending assistant.
-        builder.add_node(
-            "spending_assistant_tools",
-            create_tool_node_with_fallback(spending_assistant.tools),
-        )
-
         # Edge from tools to assistant.
         builder.add_edge("spending_assistant_tools", "spending_assistant")
 
@@ -111,18 +125,16 @@ class ChatBot:
         # =====================================================================
 
         # Similar to spending assistant.
+        recommendation_tool_node = create_tool_node_with_fallback(recommendation_assistant.tools)
+        builder.add_node("recommendation_assistant_tools", recommendation_tool_node)
+
         builder.add_node(
             "enter_recommendation",
-            create_entry_node("recommendation_assistant", "recommendation_assistant"),
+            create_entry_node("recommendation_assistant", "recommendation_assistant", recommendation_tool_node),
         )
         builder.add_node("recommendation_assistant", recommendation_assistant)
         builder.add_edge("enter_recommendation", "recommendation_assistant")
 
-        builder.add_node(
-            "recommendation_assistant_tools",
-            create_tool_node_with_fallback(recommendation_assistant.tools),
-        )
-
         builder.add_edge("recommendation_assistant_tools", "recommendation_assistant")
 
         builder.add_conditional_edges(
@@ -136,19 +148,83 @@ class ChatBot:
         )
 
         # ---- From secondary assistant to 'leave_skill' then to primary. ----
-        # Update state since we leave a secondary assistant.
-        builder.add_node("leave_skill", pop_dialog_state)
+        # Update state since we leave a secondary assistant. Tool calls made next to CompleteOrEscalate
+        # still run with the tools of the assistant being left.
+        builder.add_node(
+            "leave_skill",
+            create_leave_node(
+                {
+                    "spending_assistant": spending_tool_node,
+                    "recommendation_assistant": recommendation_tool_node,
+                }
+            ),
+        )
         builder.add_edge("leave_skill", "primary_assistant")
 
+        # ---- Fold old turns into the rolling summary before each turn. ----
+        builder.add_node("summarize_conversation", ConversationSummarizer(self.llms["summarizer"]))
+        builder.add_edge(START, "summarize_conversation")
+
         # ---- Allow persistence in specialized assistants. ----
-        builder.add_conditional_edges(
-            START,
-            route_to_workflow,
-            ["primary_assistant", "spending_assistant", "recommendation_assistant"],
-        )
+        if self.intent_router is None:
+            builder.add_conditional_edges(
+                "summarize_conversation",
+                route_to_workflow,
+                ["primary_assistant", "spending_assistant", "recommendation_assistant"],
+            )
+        else:
+            # New turns at the primary level go through the local intent classifier first, which
+            # hands over to a specialist or answers out-of-scope messages without an LLM call.
+            builder.add_node("intent_router", self.intent_router)
+            builder.add_conditional_edges(
+                "summarize_conversation",
+                functools.partial(route_to_workflow, primary="intent_router"),
+                ["intent_router", "spending_assistant", "recommendation_assistant"],
+            )
+            builder.add_conditional_edges(
+                "intent_router",
+                self.intent_router.route,
+                ["enter_spending", "enter_recommendation", "primary_assistant", END],
+            )
 
         # ---- Compile the graph. ----
 
         self.graph = builder.compile(checkpointer=self.checkpoint_saver)
         # FIXME: This line was blocking the execution
         # self.graph.get_graph().draw_mermaid_png(output_file_path="chatbot_graph.png")
+
+
+_chatbot: ChatBot | None = None
+_chatbot_lock = threading.Lock()
+
+
+def get_chatbot() -> ChatBot:
+    """Return the process-wide ChatBot, whose graph is built and compiled only once."""
+    global _chatbot
+    if _chatbot is None:
+        with _chatbot_lock:
+            if _chatbot is None:
+                chatbot = ChatBot()
+                chatbot.build_graph()
+                _chatbot = chatbot
+    return _chatbot
+
+
+class ChatSession:
+    """One conversation: the shared compiled graph and the config of this conversation's thread.
+
+    The compiled graph is stateless; every conversation's state lives in the checkpointer
+    under its ``thread_id``, so creating a session only creates a thread ID.
+    """
+
+    def __init__(self, thread_id: str | None = None, chatbot: ChatBot | None = None) -> None:
+        self.chatbot = chatbot or get_chatbot()
+        self.graph = self.chatbot.graph
+        self.checkpoint_saver = self.chatbot.checkpoint_saver
+        self.thread_id = thread_id or self.chatbot.create_thread_id()
+        self.config = {"configurable": {"thread_id": self.thread_id}}
+
+    def end(self) -> None:
+        """Release the conversation's checkpoints when nothing else would (in-memory checkpointer)."""
+        if isinstance(self.checkpoint_saver, MemorySaver):
+            self.checkpoint_saver.delete_thread(self.thread_id)
@@ -0,0 +1,917 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+import weakref
+import zlib
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterator, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.base import SerializerProtocol
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_PATH = "checkpoints.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT NOT NULL,
+    checkpoint BLOB NOT NULL,
+    metadata_type TEXT NOT NULL,
+    metadata BLOB NOT NULL,
+    channel_versions TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS checkpoint_blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS checkpoint_writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT NOT NULL,
+    value BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+CREATE TABLE IF NOT EXISTS checkpoint_messages (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    key TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, key)
+);
+CREATE TABLE IF NOT EXISTS checkpoint_threads (
+    thread_id TEXT PRIMARY KEY,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_checkpoint_threads_updated_at ON checkpoint_threads (updated_at);
+"""
+
+_INSERT_CHECKPOINT = "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+_INSERT_BLOB = "INSERT OR IGNORE INTO checkpoint_blobs VALUES (?, ?, ?, ?, ?, ?)"
+_INSERT_MESSAGE = "INSERT OR IGNORE INTO checkpoint_messages VALUES (?, ?, ?, ?, ?)"
+_INSERT_WRITE = "INSERT OR IGNORE INTO checkpoint_writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+_REPLACE_WRITE = "INSERT OR REPLACE INTO checkpoint_writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+_TOUCH_THREAD = (
+    "INSERT INTO checkpoint_threads VALUES (?, ?) "
+    "ON CONFLICT (thread_id) DO UPDATE SET updated_at = excluded.updated_at"
+)
+_CHECKPOINT_COLUMNS = "checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata"
+_THREAD_TABLES = ("checkpoints", "checkpoint_blobs", "checkpoint_writes", "checkpoint_messages", "checkpoint_threads")
+
+# Channel values stored as a delta of message keys have this type prefix
+_MESSAGES_TYPE = "messages:"
+# A full list of message keys is stored at least every this many deltas, to bound the reads
+_MAX_DELTA_CHAIN = 32
+# Backoff of the writer thread while the database refuses writes (locked, disk full, ...)
+_MIN_RETRY_DELAY = 0.1
+_MAX_RETRY_DELAY = 5.0
+_CHANNEL_CACHE_SIZE = 1024
+_ZLIB_SUFFIX = "+zlib"
+
+
+class CompressedSerializer(SerializerProtocol):
+    """Serializer that zlib-compresses what another serializer produces.
+
+    Values of at least ``min_size`` bytes are compressed with ``level`` (0 disables it),
+    and kept compressed only when that makes them smaller. Compressed values are always
+    read, whatever the level.
+    """
+
+    def __init__(self, serde: SerializerProtocol, level: int = 0, min_size: int = 256) -> None:
+        self.serde = serde
+        self.level = level
+        self.min_size = min_size
+
+    def dumps(self, obj: object) -> bytes:
+        return self.serde.dumps(obj)
+
+    def loads(self, data: bytes) -> object:
+        return self.serde.loads(data)
+
+    def dumps_typed(self, obj: object) -> tuple[str, bytes]:
+        type_, data = self.serde.dumps_typed(obj)
+        if self.level > 0 and len(data) >= self.min_size:
+            compressed = zlib.compress(data, self.level)
+            if len(compressed) < len(data):
+                return f"{type_}{_ZLIB_SUFFIX}", compressed
+        return type_, data
+
+    def loads_typed(self, data: tuple[str, bytes]) -> object:
+        type_, blob = data
+        if type_.endswith(_ZLIB_SUFFIX):
+            return self.serde.loads_typed((type_.removesuffix(_ZLIB_SUFFIX), zlib.decompress(blob)))
+        return self.serde.loads_typed(data)
+
+
+def _is_message_list(value: object) -> bool:
+    return isinstance(value, list) and bool(value) and all(isinstance(m, BaseMessage) and m.id for m in value)
+
+
+@dataclass(frozen=True)
+class CheckpointStoreStats:
+    """Point-in-time footprint and activity of the SQLite checkpoint store."""
+
+    threads: int
+    checkpoints: int
+    writes: int
+    blobs: int
+    messages: int  # distinct messages, stored once for all the checkpoints of their thread
+    db_bytes: int
+    wal_bytes: int
+    free_bytes: int
+    pending_rows: int  # rows waiting in memory for the next batched write
+    pending_bytes: int
+    flushes: int
+    flushed_rows: int
+    pruned_checkpoints: int
+    expired_threads: int
+    serialized_bytes: int  # bytes serialized by put() since the saver was created
+    serialize_seconds: float
+
+
+class SqliteCheckpointSaver(BaseCheckpointSaver):
+    """LangGraph checkpoint saver stored in a local SQLite file.
+
+    Writes are queued in memory and committed by a background thread in one transaction
+    every ``flush_interval`` seconds (or as soon as ``batch_size`` rows are queued); reads
+    flush the queue first, so they always see every earlier write. A crash loses at most
+    the last ``flush_interval`` of checkpoints. Channel values are stored once per version,
+    so a checkpoint only writes the channels that changed.
+
+    Lists of messages (the ``messages`` channel) are not stored whole at every version:
+    each message is stored once per thread, under its id and a digest of its content, and
+    a version only records how its list of message keys differs from the previous one
+    (``delta_messages``). Values are encoded with msgpack and compressed with zlib at
+    ``compression_level`` (0 leaves them uncompressed).
+
+    A second background thread prunes the store every ``prune_interval`` seconds: it keeps
+    the last ``keep_last`` checkpoints of each thread (0 keeps them all), deletes the
+    threads idle for more than ``thread_ttl`` seconds (0 never expires them) and returns
+    the freed pages to the file system.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CHECKPOINT_PATH,
+        keep_last: int = 20,
+        thread_ttl: float = 7 * 86400.0,
+        flush_interval: float = 0.05,
+        batch_size: int = 500,
+        prune_interval: float = 300.0,
+        delta_messages: bool = True,
+        compression_level: int = 0,
+    ) -> None:
+        super().__init__()
+        self.serde = CompressedSerializer(self.serde, compression_level)
+        self.path = path
+        self.keep_last = keep_last
+        self.thread_ttl = thread_ttl
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.prune_interval = prune_interval
+        self.delta_messages = delta_messages
+
+        self._lock = threading.RLock()  # guards the connection and the flush
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # Must be set before the tables are created so deleted pages can be released incrementally
+        self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        self._pending_lock = threading.Lock()
+        self._pending: dict[str, list[tuple]] = {}
+        self._pending_rows = 0
+        self._pending_bytes = 0
+        self._dirty_threads: set[str] = set()
+        self._flushes = 0
+        self._flushed_rows = 0
+        self._pruned_checkpoints = 0
+        self._expired_threads = 0
+        self._serialized_bytes = 0
+        self._serialize_seconds = 0.0
+
+        # Keys of the message objects already stored: id(message) -> (weakref, key, (thread_id, checkpoint_ns))
+        self._cache_lock = threading.Lock()
+        self._delta_lock = threading.Lock()
+        self._message_keys: dict[int, tuple[weakref.ref, str, tuple[str, str]]] = {}
+        self._purge_at = 10_000
+        # Last known list of message keys of each channel, the base of its next delta:
+        # (thread_id, checkpoint_ns, channel) -> (version, keys, deltas since the last full list)
+        self._channel_keys: OrderedDict[tuple[str, str, str], tuple[str, list[str], int]] = OrderedDict()
+
+        self._closed = threading.Event()
+        self._wakeup = threading.Event()
+        self._writer = threading.Thread(target=self._write_loop, name="checkpoint-writer", daemon=True)
+        self._writer.start()
+        self._pruner = threading.Thread(target=self._prune_loop, name="checkpoint-pruner", daemon=True)
+        if prune_interval > 0:
+            self._pruner.start()
+
+    @classmethod
+    def from_env(cls) -> "SqliteCheckpointSaver":
+        """Build the saver from the ``CHECKPOINT_*`` environment variables."""
+        return cls(
+            path=os.getenv("CHECKPOINT_PATH", DEFAULT_CHECKPOINT_PATH),
+            keep_last=int(os.getenv("CHECKPOINT_KEEP_LAST", "20")),
+            thread_ttl=float(os.getenv("CHECKPOINT_THREAD_TTL", str(7 * 86400))),
+            flush_interval=float(os.getenv("CHECKPOINT_FLUSH_INTERVAL", "0.05")),
+            batch_size=int(os.getenv("CHECKPOINT_BATCH_SIZE", "500")),
+            prune_interval=float(os.getenv("CHECKPOINT_PRUNE_INTERVAL", "300")),
+            delta_messages=os.getenv("CHECKPOINT_DELTA_MESSAGES", "true").lower() == "true",
+            compression_level=int(os.getenv("CHECKPOINT_COMPRESSION_LEVEL", "0")),
+        )
+
+    # ---- Batched writes ----
+
+    def _enqueue(self, rows: dict[str, list[tuple]], thread_id: str) -> None:
+        count = sum(len(statement_rows) for statement_rows in rows.values())
+        nbytes = sum(
+            len(value)
+            for statement_rows in rows.values()
+            for row in statement_rows
+            for value in row
+            if isinstance(value, bytes)
+        )
+        with self._pending_lock:
+            for statement, statement_rows in rows.items():
+                self._pending.setdefault(statement, []).extend(statement_rows)
+            self._pending_rows += count
+            self._pending_bytes += nbytes
+            if self.keep_last > 0:
+                self._dirty_threads.add(thread_id)
+            full = self._pending_rows >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def flush(self) -> None:
+        """Commit every queued write; the rows stay queued if the transaction fails."""
+        with self._lock:
+            with self._pending_lock:
+                pending, self._pending = self._pending, {}
+                rows, self._pending_rows = self._pending_rows, 0
+                nbytes, self._pending_bytes = self._pending_bytes, 0
+            if not pending:
+                return
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                for statement, statement_rows in pending.items():
+                    self._conn.executemany(statement, statement_rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                # put() already returned configs pointing at these rows, and later message
+                # deltas build on them: queue them again ahead of the rows added since
+                with self._pending_lock:
+                    for statement, statement_rows in self._pending.items():
+                        pending.setdefault(statement, []).extend(statement_rows)
+                    self._pending = pending
+                    self._pending_rows += rows
+                    self._pending_bytes += nbytes
+                raise
+            self._flushes += 1
+            self._flushed_rows += rows
+
+    def _write_loop(self) -> None:
+        retry_delay = 0.0
+        while not self._closed.is_set():
+            if retry_delay:
+                self._closed.wait(retry_delay)
+            else:
+                self._wakeup.wait(self.flush_interval)
+                self._wakeup.clear()
+            try:
+                self.flush()
+                retry_delay = 0.0
+            except sqlite3.Error as e:
+                retry_delay = min(max(2 * retry_delay, _MIN_RETRY_DELAY), _MAX_RETRY_DELAY)
+                logger.error(f"Failed to write checkpoints to {self.path}, retrying in {retry_delay:.1f}s: {e}")
+
+    # ---- Retention ----
+
+    def _delete_thread_rows(self, thread_id: str) -> None:
+        for table in _THREAD_TABLES:
+            self._conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+
+    def _prune_thread(self, thread_id: str) -> int:
+        """Keep the last ``keep_last`` checkpoints of each namespace of the thread; return how many were deleted."""
+        pruned = 0
+        namespaces = [
+            row[0]
+            for row in self._conn.execute(
+                "SELECT DISTINCT checkpoint_ns FROM checkpoints WHERE thread_id = ?", (thread_id,)
+            )
+        ]
+        for checkpoint_ns in namespaces:
+            pruned += self._conn.execute(
+                """
+                DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id NOT IN (
+                    SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?
+                    ORDER BY checkpoint_id DESC LIMIT ?
+                )
+                """,
+                (thread_id, checkpoint_ns, thread_id, checkpoint_ns, self.keep_last),
+            ).rowcount
+        if not pruned:
+            return 0
+
+        self._conn.execute(
+            """
+            DELETE FROM checkpoint_writes AS w WHERE thread_id = ? AND NOT EXISTS (
+                SELECT 1 FROM checkpoints AS c WHERE c.thread_id = w.thread_id
+                AND c.checkpoint_ns = w.checkpoint_ns AND c.checkpoint_id = w.checkpoint_id
+            )
+            """,
+            (thread_id,),
+        )
+        # Drop the channel values no remaining checkpoint refers to, directly or as the base of a delta
+        referenced = {
+            (checkpoint_ns, channel, version)
+            for checkpoint_ns, versions in self._conn.execute(
+                "SELECT checkpoint_ns, channel_versions FROM checkpoints WHERE thread_id = ?", (thread_id,)
+            )
+            for channel, version in json.loads(versions).items()
+        }
+        deltas = {
+            (checkpoint_ns, channel, version): self.serde.loads_typed((type_.removeprefix(_MESSAGES_TYPE), blob))
+            for checkpoint_ns, channel, version, type_, blob in self._conn.execute(
+                "SELECT checkpoint_ns, channel, version, type, blob FROM checkpoint_blobs "
+                "WHERE thread_id = ? AND type LIKE ?",
+                (thread_id, f"{_MESSAGES_TYPE}%"),
+            )
+        }
+        pending = [key for key in referenced if key in deltas]
+        while pending:
+            checkpoint_ns, channel, _ = key = pending.pop()
+            base = (checkpoint_ns, channel, deltas[key][0])
+            if base[2] is not None and base not in referenced:
+                referenced.add(base)
+                pending.append(base)
+        unreferenced = [
+            (thread_id, *key)
+            for key in self._conn.execute(
+                "SELECT checkpoint_ns, channel, version FROM checkpoint_blobs WHERE thread_id = ?", (thread_id,)
+            )
+            if key not in referenced
+        ]
+        self._conn.executemany(
+            "DELETE FROM checkpoint_blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+            unreferenced,
+        )
+        # And the messages no remaining list refers to
+        kept_messages = {
+            (key[0], message_key) for key, delta in deltas.items() if key in referenced for message_key in delta[3]
+        }
+        self._conn.executemany(
+            "DELETE FROM checkpoint_messages WHERE thread_id = ? AND checkpoint_ns = ? AND key = ?",
+            [
+                (thread_id, *key)
+                for key in self._conn.execute(
+                    "SELECT checkpoint_ns, key FROM checkpoint_messages WHERE thread_id = ?", (thread_id,)
+                )
+                if key not in kept_messages
+            ],
+        )
+        return pruned
+
+    def prune(self) -> None:
+        """Apply the retention policies now and release the freed pages."""
+        with self._lock:
+            # put() waits on the delta lock, so it is only held while rows are deleted
+            with self._delta_lock:
+                self.flush()
+                with self._pending_lock:
+                    dirty, self._dirty_threads = self._dirty_threads, set()
+
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    expired = []
+                    if self.thread_ttl > 0:
+                        expired = [
+                            row[0]
+                            for row in self._conn.execute(
+                                "SELECT thread_id FROM checkpoint_threads WHERE updated_at < ?",
+                                (time.time() - self.thread_ttl,),
+                            )
+                        ]
+                        for thread_id in expired:
+                            self._delete_thread_rows(thread_id)
+                    pruned_threads = {}
+                    if self.keep_last > 0:
+                        pruned_threads = {
+                            thread_id: self._prune_thread(thread_id) for thread_id in dirty - set(expired)
+                        }
+                    pruned = sum(pruned_threads.values())
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                # The cached keys may refer to deleted messages and versions
+                self._forget_threads({*expired, *(thread_id for thread_id, count in pruned_threads.items() if count)})
+
+            # execute() would only step the pragma once, which frees a single page
+            self._conn.executescript("PRAGMA incremental_vacuum;")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._expired_threads += len(expired)
+            self._pruned_checkpoints += pruned
+        if expired or pruned:
+            logger.info(f"Checkpoint store pruned: {pruned} checkpoints, {len(expired)} expired threads")
+
+    def vacuum(self) -> None:
+        """Rebuild the database file to its minimal size (blocks writes while it runs)."""
+        with self._lock:
+            self.flush()
+            self._conn.execute("VACUUM")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def _prune_loop(self) -> None:
+        while not self._closed.wait(self.prune_interval):
+            try:
+                self.prune()
+            except sqlite3.Error as e:
+                logger.error(f"Failed to prune checkpoints in {self.path}: {e}")
+
+    # ---- Message deltas ----
+
+    def _remember_message(self, scope: tuple[str, str], message: BaseMessage, key: str) -> None:
+        with self._cache_lock:
+            self._message_keys[id(message)] = (weakref.ref(message), key, scope)
+            if len(self._message_keys) > self._purge_at:
+                # Forget the messages that no longer exist
+                self._message_keys = {
+                    object_id: entry for object_id, entry in self._message_keys.items() if entry[0]() is not None
+                }
+                self._purge_at = max(10_000, 2 * len(self._message_keys))
+
+    def _message_key(self, scope: tuple[str, str], message: BaseMessage, rows: list[tuple]) -> str:
+        """Return the key of a message, and queue the message if it was not stored yet."""
+        cached = self._message_keys.get(id(message))
+        if cached is not None and cached[0]() is message and cached[2] == scope:
+            return cached[1]
+        type_, blob = self.serde.dumps_typed(message)
+        key = f"{message.id}:{hashlib.blake2b(blob, digest_size=8).hexdigest()}"
+        rows.append((*scope, key, type_, blob))
+        self._remember_message(scope, message, key)
+        return key
+
+    def _remember_keys(self, channel_key: tuple[str, str, str], version: str, keys: list[str], depth: int) -> None:
+        with self._cache_lock:
+            self._channel_keys[channel_key] = (version, keys, depth)
+            self._channel_keys.move_to_end(channel_key)
+            if len(self._channel_keys) > _CHANNEL_CACHE_SIZE:
+                self._channel_keys.popitem(last=False)
+
+    def _dumps_message_list(
+        self, thread_id: str, checkpoint_ns: str, channel: str, version: str, messages: list, rows: list[tuple]
+    ) -> tuple[str, bytes]:
+        """Serialize a list of messages as ``[base version, skip, keep, added keys]``.
+
+        The keys of the list are ``keys(base)[skip:skip + keep] + added``: appended messages
+        and messages removed from the start only cost their own keys.
+        """
+        scope = (thread_id, checkpoint_ns)
+        keys = [self._message_key(scope, message, rows) for message in messages]
+        channel_key = (thread_id, checkpoint_ns, channel)
+        previous = self._channel_keys.get(channel_key)
+        delta: list[Any] = [None, 0, 0, keys]
+        depth = 0
+        if previous is not None and previous[2] < _MAX_DELTA_CHAIN:
+            base_version, base_keys, base_depth = previous
+            skip = base_keys.index(keys[0]) if keys[0] in base_keys else len(base_keys)
+            keep = 0
+            while keep < len(keys) and skip + keep < len(base_keys) and keys[keep] == base_keys[skip + keep]:
+                keep += 1
+            delta, depth = [base_version, skip, keep, keys[keep:]], base_depth + 1
+        self._remember_keys(channel_key, version, keys, depth)
+        type_, blob = self.serde.dumps_typed(delta)
+        return f"{_MESSAGES_TYPE}{type_}", blob
+
+    def _loads_message_list(
+        self, thread_id: str, checkpoint_ns: str, channel: str, version: str, type_: str, blob: bytes
+    ) -> list[BaseMessage]:
+        """Rebuild a list of messages from its delta chain and the stored messages."""
+        channel_key = (thread_id, checkpoint_ns, channel)
+        requested = version
+        deltas = []
+        keys: list[str] = []
+        depth = 0
+        while True:
+            cached = self._channel_keys.get(channel_key)
+            if cached is not None and cached[0] == version:
+                keys, depth = list(cached[1]), cached[2]
+                break
+            base, skip, keep, added = self.serde.loads_typed((type_.removeprefix(_MESSAGES_TYPE), blob))
+            deltas.append((skip, keep, added))
+            if base is None:
+                depth = -1
+                break
+            version = base
+            row = self._conn.execute(
+                "SELECT type, blob FROM checkpoint_blobs "
+                "WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                (thread_id, checkpoint_ns, channel, version),
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Missing base version {version} of channel {channel} in thread {thread_id}")
+            type_, blob = row
+        for skip, keep, added in reversed(deltas):
+            keys = keys[skip : skip + keep] + list(added)
+        self._remember_keys(channel_key, requested, keys, depth + len(deltas))
+
+        stored: dict[str, tuple[str, bytes]] = {}
+        unique = list(dict.fromkeys(keys))
+        for i in range(0, len(unique), 500):
+            chunk = unique[i : i + 500]
+            rows = self._conn.execute(
+                "SELECT key, type, blob FROM checkpoint_messages WHERE thread_id = ? AND checkpoint_ns = ? "
+                f"AND key IN ({', '.join('?' * len(chunk))})",
+                (thread_id, checkpoint_ns, *chunk),
+            )
+            stored.update((key, (message_type, message_blob)) for key, message_type, message_blob in rows)
+        messages = []
+        for key in keys:
+            message = self.serde.loads_typed(stored[key])
+            self._remember_message((thread_id, checkpoint_ns), message, key)
+            messages.append(message)
+        return messages
+
+    def _forget_threads(self, thread_ids: set[str]) -> None:
+        """Drop the cached keys of threads whose rows were deleted, so they are written again."""
+        if not thread_ids:
+            return
+        with self._cache_lock:
+            self._message_keys = {
+                object_id: entry for object_id, entry in self._message_keys.items() if entry[2][0] not in thread_ids
+            }
+            for channel_key in [key for key in self._channel_keys if key[0] in thread_ids]:
+                del self._channel_keys[channel_key]
+
+    # ---- BaseCheckpointSaver ----
+
+    def _load_blobs(self, thread_id: str, checkpoint_ns: str, versions: ChannelVersions) -> dict[str, Any]:
+        if not versions:
+            return {}
+        keys = [(channel, str(version)) for channel, version in versions.items()]
+        rows = self._conn.execute(
+            "SELECT channel, version, type, blob FROM checkpoint_blobs WHERE thread_id = ? AND checkpoint_ns = ? "
+            f"AND (channel, version) IN (VALUES {', '.join(['(?, ?)'] * len(keys))})",
+            (thread_id, checkpoint_ns, *(v for key in keys for v in key)),
+        ).fetchall()
+        return {
+            channel: (
+                self._loads_message_list(thread_id, checkpoint_ns, channel, version, type_, blob)
+                if type_.startswith(_MESSAGES_TYPE)
+                else self.serde.loads_typed((type_, blob))
+            )
+            for channel, version, type_, blob in rows
+            if type_ != "empty"
+        }
+
+    def _checkpoint_tuple(self, thread_id: str, checkpoint_ns: str, row: tuple) -> CheckpointTuple:
+        checkpoint_id, parent_checkpoint_id, type_, checkpoint_blob, metadata_type, metadata_blob = row
+        checkpoint = self.serde.loads_typed((type_, checkpoint_blob))
+        writes = self._conn.execute(
+            "SELECT task_id, channel, type, value FROM checkpoint_writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return CheckpointTuple(
+            config={
+                "configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}
+            },
+            checkpoint={
+                **checkpoint,
+                "channel_values": self._load_blobs(thread_id, checkpoint_ns, checkpoint["channel_versions"]),
+            },
+            metadata=self.serde.loads_typed((metadata_type, metadata_blob)),
+            pending_writes=[(task_id, channel, self.serde.loads_typed((t, v))) for task_id, channel, t, v in writes],
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+        with self._lock:
+            self.flush()
+            if checkpoint_id:
+                row = self._conn.execute(
+                    f"SELECT {_CHECKPOINT_COLUMNS} FROM checkpoints "
+                    "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    f"SELECT {_CHECKPOINT_COLUMNS} FROM checkpoints "
+                    "WHERE thread_id = ? AND checkpoint_ns = ? ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns),
+                ).fetchone()
+            return self._checkpoint_tuple(thread_id, checkpoint_ns, row) if row else None
+
+    def list(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> Iterator[CheckpointTuple]:
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if config["configurable"].get("checkpoint_ns") is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(config["configurable"]["checkpoint_ns"])
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        query = (
+            f"SELECT thread_id, checkpoint_ns, {_CHECKPOINT_COLUMNS} FROM checkpoints {where} "
+            "ORDER BY thread_id, checkpoint_ns, checkpoint_id DESC"
+        )
+        # The metadata filter needs the decoded metadata, so with a filter the rows are
+        # read one by one until the limit instead
+        if limit is not None and not filter:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            self.flush()
+            rows = self._conn.execute(query, params)
+            results = []
+            for thread_id, checkpoint_ns, *row in rows:
+                if limit is not None and len(results) >= limit:
+                    break
+                if filter:
+                    metadata = self.serde.loads_typed((row[-2], row[-1]))
+                    if not all(metadata.get(key) == value for key, value in filter.items()):
+                        continue
+                results.append(self._checkpoint_tuple(thread_id, checkpoint_ns, tuple(row)))
+        yield from results
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        c = checkpoint.copy()
+        values: dict[str, Any] = c.pop("channel_values")
+        now = time.time()
+        # Deltas refer to earlier versions, which prune() must not delete before the delta is queued
+        with self._delta_lock:
+            start = time.perf_counter()
+            messages: list[tuple] = []
+            blobs = []
+            for channel, version in new_versions.items():
+                if channel not in values:
+                    blob: tuple[str, bytes | None] = ("empty", None)
+                elif self.delta_messages and _is_message_list(values[channel]):
+                    blob = self._dumps_message_list(
+                        thread_id, checkpoint_ns, channel, str(version), values[channel], messages
+                    )
+                else:
+                    blob = self.serde.dumps_typed(values[channel])
+                blobs.append((thread_id, checkpoint_ns, channel, str(version), *blob))
+            type_, checkpoint_blob = self.serde.dumps_typed(c)
+            metadata_type, metadata_blob = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+            elapsed = time.perf_counter() - start
+            serialized = len(checkpoint_blob) + len(metadata_blob)
+            serialized += sum(len(row[-1]) for row in messages) + sum(len(row[-1] or b"") for row in blobs)
+            with self._pending_lock:
+                self._serialized_bytes += serialized
+                self._serialize_seconds += elapsed
+            self._enqueue(
+                {
+                    _INSERT_MESSAGE: messages,
+                    _INSERT_BLOB: blobs,
+                    _INSERT_CHECKPOINT: [
+                        (
+                            thread_id,
+                            checkpoint_ns,
+                            checkpoint["id"],
+                            config["configurable"].get("checkpoint_id"),
+                            type_,
+                            checkpoint_blob,
+                            metadata_type,
+                            metadata_blob,
+                            json.dumps({k: str(v) for k, v in checkpoint["channel_versions"].items()}),
+                            now,
+                        )
+                    ],
+                    _TOUCH_THREAD: [(thread_id, now)],
+                },
+                thread_id,
+            )
+        return {
+            "configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        # Special writes (errors, interrupts...) replace the previous one; regular writes are only stored once
+        statement = _REPLACE_WRITE if all(channel in WRITES_IDX_MAP for channel, _ in writes) else _INSERT_WRITE
+        rows = [
+            (
+                thread_id,
+                checkpoint_ns,
+                checkpoint_id,
+                task_id,
+                WRITES_IDX_MAP.get(channel, idx),
+                channel,
+                *self.serde.dumps_typed(value),
+                task_path,
+            )
+            for idx, (channel, value) in enumerate(writes)
+        ]
+        self._enqueue({statement: rows}, thread_id)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock, self._delta_lock:
+            self.flush()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._delete_thread_rows(thread_id)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._forget_threads({thread_id})
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        # put() serializes the new messages and may wait for prune() to release the delta lock
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        # Serializing (and compressing) the writes would otherwise run on the event loop
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def get_next_version(self, current: str | None, channel: None) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    # ---- Footprint ----
+
+    def stats(self) -> CheckpointStoreStats:
+        """Return the size of the store and the write and retention counters."""
+        with self._lock:
+            counts = {
+                table: self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in _THREAD_TABLES
+            }
+            page_size = self._conn.execute("PRAGMA page_size").fetchone()[0]
+            page_count = self._conn.execute("PRAGMA page_count").fetchone()[0]
+            freelist = self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+            wal_path = f"{self.path}-wal"
+            with self._pending_lock:
+                return CheckpointStoreStats(
+                    threads=counts["checkpoint_threads"],
+                    checkpoints=counts["checkpoints"],
+                    writes=counts["checkpoint_writes"],
+                    blobs=counts["checkpoint_blobs"],
+                    messages=counts["checkpoint_messages"],
+                    db_bytes=page_size * page_count,
+                    wal_bytes=os.path.getsize(wal_path) if os.path.exists(wal_path) else 0,
+                    free_bytes=page_size * freelist,
+                    pending_rows=self._pending_rows,
+                    pending_bytes=self._pending_bytes,
+                    flushes=self._flushes,
+                    flushed_rows=self._flushed_rows,
+                    pruned_checkpoints=self._pruned_checkpoints,
+                    expired_threads=self._expired_threads,
+                    serialized_bytes=self._serialized_bytes,
+                    serialize_seconds=self._serialize_seconds,
+                )
+
+    def close(self) -> None:
+        """Stop the background threads, write the queued rows and close the database."""
+        self._closed.set()
+        self._wakeup.set()
+        self._writer.join()
+        if self._pruner.is_alive():
+            self._pruner.join()
+        with self._lock:
+            self.flush()
+            self._conn.close()
+
+
+_saver: SqliteCheckpointSaver | None = None
+_saver_lock = threading.Lock()
+
+
+def get_checkpoint_saver() -> SqliteCheckpointSaver:
+    """Return the process-wide SQLite checkpoint saver."""
+    global _saver
+    if _saver is None:
+        with _saver_lock:
+            if _saver is None:
+                _saver = SqliteCheckpointSaver.from_env()
+    return _saver
+
+
+def create_checkpoint_saver() -> BaseCheckpointSaver:
+    """Return the checkpointer selected by ``CHECKPOINT_BACKEND``: ``memory`` (default) or ``sqlite``."""
+    backend = os.getenv("CHECKPOINT_BACKEND", "memory").lower()
+    if backend == "sqlite":
+        return get_checkpoint_saver()
+    if backend != "memory":
+        raise ValueError(f"Unsupported checkpoint backend: {backend} (expected 'memory' or 'sqlite')")
+    return MemorySaver()
@@ -0,0 +1,209 @@
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+
+from langchain_core.messages import (
+    AnyMessage,
+    HumanMessage,
+    RemoveMessage,
+    SystemMessage,
+    ToolMessage,
+    get_buffer_string,
+)
+from langchain_core.messages.utils import count_tokens_approximately, trim_messages
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from src.core.prompts import summary_prompt
+from src.core.state import State
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ContextConfig:
+    """How much conversation history is sent to the assistants."""
+
+    keep_turns: int = 6  # user turns kept verbatim when older ones are summarized
+    summarize_after_turns: int = 10  # fold older turns into the summary past this many turns
+    max_prompt_tokens: int = 6000  # token budget of the history sent with each model call
+
+    @classmethod
+    def from_env(cls) -> "ContextConfig":
+        """Build the config from the ``CONTEXT_*`` environment variables."""
+        return cls(
+            keep_turns=int(os.getenv("CONTEXT_KEEP_TURNS", "6")),
+            summarize_after_turns=int(os.getenv("CONTEXT_SUMMARIZE_AFTER_TURNS", "10")),
+            max_prompt_tokens=int(os.getenv("CONTEXT_MAX_PROMPT_TOKENS", "6000")),
+        )
+
+
+@dataclass(frozen=True)
+class ContextStats:
+    """Prompt-token counts of the model calls, before and after trimming the history."""
+
+    calls: int
+    tokens_before: int
+    tokens_after: int
+    last_before: int
+    last_after: int
+    summaries: int
+
+
+def count_tokens(messages: list[AnyMessage]) -> int:
+    """Approximate token count of a list of messages (no provider tokenizer needed)."""
+    return count_tokens_approximately(messages)
+
+
+def split_turns(messages: list[AnyMessage], keep_turns: int) -> tuple[list[AnyMessage], list[AnyMessage]]:
+    """Split the history into older messages and the last ``keep_turns`` user turns.
+
+    The split is always made at a user message. A turn contains every AI tool call and
+    the ToolMessages answering it, so no tool call is separated from its result.
+    """
+    turn_starts = [i for i, message in enumerate(messages) if isinstance(message, HumanMessage)]
+    if keep_turns <= 0 or len(turn_starts) <= keep_turns:
+        return [], list(messages)
+    cut = turn_starts[-keep_turns]
+    return list(messages[:cut]), list(messages[cut:])
+
+
+def validated_customer_id(messages: list[AnyMessage]) -> int | None:
+    """Return the customer id from the last successful ``validate_customer`` result, if any."""
+    for message in reversed(messages):
+        if not isinstance(message, ToolMessage) or message.name != "validate_customer":
+            continue
+        try:
+            result = json.loads(message.content)
+        except (TypeError, ValueError):
+            continue
+        if isinstance(result, dict) and result.get("valid") and result.get("customer_id") is not None:
+            return result["customer_id"]
+    return None
+
+
+class ContextManager:
+    """Builds the history sent to the assistants and keeps prompt-token statistics.
+
+    Each model call gets the rolling summary and the validated customer id as a system
+    message, followed by the verbatim messages, trimmed from the oldest user turn to fit
+    ``max_prompt_tokens``.
+    """
+
+    def __init__(self, config: ContextConfig | None = None) -> None:
+        self.config = config or ContextConfig.from_env()
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._tokens_before = 0
+        self._tokens_after = 0
+        self._last_before = 0
+        self._last_after = 0
+        self._summaries = 0
+
+    def prompt_messages(self, state: State) -> tuple[list[AnyMessage], int, int]:
+        """Return the messages to send with the next model call and the token counts before/after trimming."""
+        messages = list(state["messages"])
+        context = []
+        if state.get("summary"):
+            context.append(f"Summary of the earlier conversation:\n{state['summary']}")
+        if state.get("customer_id") is not None:
+            context.append(f"The customer's identity has been validated: customer_id={state['customer_id']}.")
+        context_messages = [SystemMessage(content="\n\n".join(context))] if context else []
+
+        tokens_before = count_tokens(context_messages + messages)
+        budget = self.config.max_prompt_tokens - count_tokens(context_messages)
+        if tokens_before > self.config.max_prompt_tokens:
+            # Drop whole turns from the start: the kept history always begins with a user message
+            trimmed = trim_messages(
+                messages,
+                max_tokens=budget,
+                token_counter=count_tokens,
+                strategy="last",
+                start_on="human",
+                allow_partial=False,
+            )
+            # Never send an empty history: keep at least the current turn
+            messages = trimmed or split_turns(messages, 1)[1]
+        prompt = context_messages + messages
+        tokens_after = count_tokens(prompt)
+
+        with self._lock:
+            self._calls += 1
+            self._tokens_before += tokens_before
+            self._tokens_after += tokens_after
+            self._last_before = tokens_before
+            self._last_after = tokens_after
+        logger.debug(f"Prompt history: {tokens_before} tokens before trimming, {tokens_after} after")
+        return prompt, tokens_before, tokens_after
+
+    def record_summary(self) -> None:
+        with self._lock:
+            self._summaries += 1
+
+    def stats(self) -> ContextStats:
+        """Return the prompt-token counters."""
+        with self._lock:
+            return ContextStats(
+                calls=self._calls,
+                tokens_before=self._tokens_before,
+                tokens_after=self._tokens_after,
+                last_before=self._last_before,
+                last_after=self._last_after,
+                summaries=self._summaries,
+            )
+
+
+_context_manager: ContextManager | None = None
+_context_manager_lock = threading.Lock()
+
+
+def get_context_manager() -> ContextManager:
+    """Return the process-wide context manager."""
+    global _context_manager
+    if _context_manager is None:
+        with _context_manager_lock:
+            if _context_manager is None:
+                _context_manager = ContextManager()
+    return _context_manager
+
+
+class ConversationSummarizer:
+    """Graph node that folds the turns older than the last ``keep_turns`` into a rolling summary.
+
+    It runs at the start of every turn and does nothing until the conversation has more
+    than ``summarize_after_turns`` user turns or exceeds the prompt token budget. The
+    folded messages are removed from the state; the validated customer id found in them
+    is kept in the ``customer_id`` channel.
+    """
+
+    def __init__(self, llm: Runnable, context: ContextManager | None = None) -> None:
+        self.runnable = summary_prompt | llm
+        self.context = context or get_context_manager()
+
+    def __call__(self, state: State, config: RunnableConfig) -> dict:
+        messages = state["messages"]
+        turns = sum(1 for message in messages if isinstance(message, HumanMessage))
+        limits = self.context.config
+        if turns <= limits.summarize_after_turns and count_tokens(messages) <= limits.max_prompt_tokens:
+            return {}
+
+        older, _ = split_turns(messages, limits.keep_turns)
+        if not older:
+            return {}
+
+        # Send the folded turns as plain text, so no tool schemas are needed for their tool calls
+        result = self.runnable.invoke(
+            {"summary": state.get("summary") or "None yet.", "transcript": get_buffer_string(older)}, config
+        )
+        self.context.record_summary()
+        logger.info(f"Folded {len(older)} messages into the conversation summary")
+
+        update = {
+            "summary": result.content if isinstance(result.content, str) else str(result.content),
+            "messages": [RemoveMessage(id=message.id) for message in older],
+        }
+        customer_id = validated_customer_id(older)
+        if customer_id is not None:
+            update["customer_id"] = customer_id
+        return update
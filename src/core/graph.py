@@ -1,46 +1,122 @@
 from collections.abc import Callable
 from typing import Literal, TypedDict
 
-from langchain_core.messages import ToolMessage
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.runnables import Runnable, RunnableConfig
 
+from src.tools import CompleteOrEscalate, ToRecommendationAssistant, ToSpendingAssistant
 
-def pop_dialog_state(state: dict) -> dict:
-    """
-    Pop the dialog stack and return to the main assistant.
-    This lets the full graph explicitly track the dialog flow and delegate control
-    to specific sub-graphs.
+# Tool calls that transfer control to a specialized assistant, mapped to their entry node
+ENTRY_HANDOFFS = {
+    ToSpendingAssistant.__name__: "enter_spending",
+    ToRecommendationAssistant.__name__: "enter_recommendation",
+}
+RESUME_PRIMARY_MESSAGE = (
+    "Resuming dialog with the primary assistant. Please reflect on the past conversation and assist the user as needed."
+)
+
+
+def first_handoff(tool_calls: list[dict], handoff_names: set[str] | dict) -> dict | None:
+    """Return the first tool call that is a handoff, if any."""
+    return next((tc for tc in tool_calls if tc["name"] in handoff_names), None)
+
+
+def answer_tool_calls(
+    message: AIMessage,
+    answers: dict[str, str],
+    tool_node: Runnable | None = None,
+    config: RunnableConfig | None = None,
+) -> list[ToolMessage]:
+    """Answer every tool call of ``message``.
+
+    Calls whose id is in ``answers`` get that content; all the others are executed with
+    ``tool_node`` so that no tool_call_id is left without its ToolMessage.
     """
-    messages = []
-    if state["messages"][-1].tool_calls:
-        # Note: Doesn't currently handle the edge case where the llm performs parallel tool calls
-        messages.append(
-            ToolMessage(
-                content="Resuming dialog with the primary assistant. Please reflect on the past conversation and assist the user as needed.",
-                tool_call_id=state["messages"][-1].tool_calls[0]["id"],
-            )
+    messages = [
+        ToolMessage(content=answers[tc["id"]], tool_call_id=tc["id"])
+        for tc in message.tool_calls
+        if tc["id"] in answers
+    ]
+    remaining = [tc for tc in message.tool_calls if tc["id"] not in answers]
+    if not remaining:
+        return messages
+
+    if tool_node is None:
+        messages.extend(
+            ToolMessage(content=f"Error: {tc['name']} is not available at this point.", tool_call_id=tc["id"])
+            for tc in remaining
         )
-    return {
-        "dialog_state": "pop",
-        "messages": messages,
-    }
+    else:
+        result = tool_node.invoke({"messages": [message.model_copy(update={"tool_calls": remaining})]}, config)
+        messages.extend(result["messages"])
+
+    # Keep the ToolMessages in the order of the calls they answer
+    order = {tc["id"]: i for i, tc in enumerate(message.tool_calls)}
+    return sorted(messages, key=lambda m: order.get(m.tool_call_id, len(order)))
+
+
+def create_leave_node(tool_nodes: dict[str, Runnable] | None = None) -> Callable:
+    """Utility function to create the node that returns from a secondary assistant to the primary one.
+
+    ``tool_nodes`` maps each secondary assistant to the tool node that runs the other tool
+    calls it made in the same message as ``CompleteOrEscalate``.
+    """
+    tool_nodes = tool_nodes or {}
+
+    def pop_dialog_state(state: dict, config: RunnableConfig) -> dict:
+        """
+        Pop the dialog stack and return to the main assistant.
+        This lets the full graph explicitly track the dialog flow and delegate control
+        to specific sub-graphs.
+        """
+        messages = []
+        last_message = state["messages"][-1]
+        if last_message.tool_calls:
+            dialog_state = state.get("dialog_state") or []
+            answers = {
+                tc["id"]: RESUME_PRIMARY_MESSAGE
+                for tc in last_message.tool_calls
+                if tc["name"] == CompleteOrEscalate.__name__
+            }
+            tool_node = tool_nodes.get(dialog_state[-1]) if dialog_state else None
+            messages = answer_tool_calls(last_message, answers, tool_node, config)
+        return {
+            "dialog_state": "pop",
+            "messages": messages,
+        }
+
+    return pop_dialog_state
+
 
+pop_dialog_state = create_leave_node()
 
-def create_entry_node(assistant_name: str, new_dialog_state: str) -> Callable:
-    """Utility function to create an entry node for the secondary assistants."""
 
-    def entry_node(state: TypedDict) -> dict:
-        tool_call_id = state["messages"][-1].tool_calls[0]["id"]
+def create_entry_node(assistant_name: str, new_dialog_state: str, tool_node: Runnable | None = None) -> Callable:
+    """Utility function to create an entry node for the secondary assistants.
+
+    The first handoff call of the message is the one that led here; any other handoff
+    in the same message is declined. ``tool_node`` is the tool node of the assistant being
+    entered: the remaining calls (e.g. a customer validation made next to the handoff) run
+    with it, so they are answered by the tools of the assistant that takes over.
+    """
+
+    def entry_node(state: TypedDict, config: RunnableConfig) -> dict:
+        last_message = state["messages"][-1]
+        handoff = first_handoff(last_message.tool_calls, ENTRY_HANDOFFS)
+        answers = {
+            tc["id"]: f"Not transferred: the conversation was already handed over to the {assistant_name}."
+            for tc in last_message.tool_calls
+            if tc["name"] in ENTRY_HANDOFFS
+        }
+        answers[handoff["id"]] = (
+            f"The assistant is now the {assistant_name}. Reflect on the above conversation between the primary assistant and the user."
+            f" The user's intent is unsatisfied. Use the provided tools to assist the user. Remember, you are {assistant_name},"
+            " and the identification, resolution, or any other action is not complete until after you have successfully invoked the appropriate tool."
+            " If the user changes their mind or needs help for other tasks, call the CompleteOrEscalate function to let the primary assistant take control."
+            " Do not mention who you are - just act as the proxy for the assistant."
+        )
         return {
-            "messages": [
-                ToolMessage(
-                    content=f"The assistant is now the {assistant_name}. Reflect on the above conversation between the primary assistant and the user."
-                    f" The user's intent is unsatisfied. Use the provided tools to assist the user. Remember, you are {assistant_name},"
-                    " and the identification, resolution, or any other action is not complete until after you have successfully invoked the appropriate tool."
-                    " If the user changes their mind or needs help for other tasks, call the CompleteOrEscalate function to let the primary assistant take control."
-                    " Do not mention who you are - just act as the proxy for the assistant.",
-                    tool_call_id=tool_call_id,
-                )
-            ],
+            "messages": answer_tool_calls(last_message, answers, tool_node, config),
             "dialog_state": new_dialog_state,
         }
 
@@ -49,11 +125,12 @@ def create_entry_node(assistant_name: str, new_dialog_state: str) -> Callable:
 
 def route_to_workflow(
     state: TypedDict,
-) -> Literal["primary_assistant", "spending_assistant", "recommendation_assistant"]:
-    """If we are in a delegated state, route directly to the appropriate assistant."""
+    primary: str = "primary_assistant",
+) -> Literal["primary_assistant", "intent_router", "spending_assistant", "recommendation_assistant"]:
+    """If we are in a delegated state, route directly to the appropriate assistant, otherwise to ``primary``."""
     dialog_state = state.get("dialog_state")
     if not dialog_state:
-        return "primary_assistant"
+        return primary
     return dialog_state[-1]
 
 
@@ -0,0 +1,325 @@
+"""Local intent classifier used to route user turns without an LLM call.
+
+Texts are turned into hashed word uni/bigram and character trigram features, and a
+multinomial logistic regression over those features predicts one of ``INTENTS``. A
+prediction is a sparse dot product over a few dozen features, i.e. a few microseconds.
+
+Train a model from labelled examples (``{"text": ..., "intent": ...}`` JSONL files) and
+saved transcripts (the JSONL files written to ``transcripts/``, or their JSON exports):
+
+    python -m src.core.intent_classifier --data transcripts intents.jsonl --output intent_model.npz
+
+A share of the examples (``--holdout``) is kept out of training; the accuracy on them is
+saved with the model, and the intent router is only enabled for a model whose held-out
+accuracy is high enough.
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import re
+import zlib
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INTENTS = ("spending", "recommendation", "out_of_scope")
+DEFAULT_N_FEATURES = 1 << 15
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Built-in examples, so the router works before any transcript has been collected
+SEED_EXAMPLES: tuple[tuple[str, str], ...] = (
+    ("Why is my electricity bill so high this month?", "spending"),
+    ("How much did I pay last month?", "spending"),
+    ("Can you show me my billing history?", "spending"),
+    ("I want to see my last invoices", "spending"),
+    ("What was the amount due on my last bill?", "spending"),
+    ("My bill went up, can you check my charges?", "spending"),
+    ("How much have I spent on electricity this year?", "spending"),
+    ("Show me my spending for the last 6 months", "spending"),
+    ("I think I was overcharged", "spending"),
+    ("When is my next payment due?", "spending"),
+    ("Can I get a breakdown of my bill?", "spending"),
+    ("I need my past electricity bills", "spending"),
+    ("What did I pay in January?", "spending"),
+    ("Check my account balance please", "spending"),
+    ("How much do I owe?", "spending"),
+    ("List my billing events", "spending"),
+    ("I have a question about my invoice", "spending"),
+    ("Compare my bills from last year", "spending"),
+    ("Which plan would be cheaper for me?", "recommendation"),
+    ("What electricity plans do you offer?", "recommendation"),
+    ("I want to switch to a better plan", "recommendation"),
+    ("Can you recommend a tariff for me?", "recommendation"),
+    ("Tell me about the Eco Plan", "recommendation"),
+    ("Is the Night Plan a good option?", "recommendation"),
+    ("What is the best plan for my usage?", "recommendation"),
+    ("Which plans are available?", "recommendation"),
+    ("How much would I save with another plan?", "recommendation"),
+    ("I use most of my electricity at night, which tariff suits me?", "recommendation"),
+    ("What's the difference between the Standard and Eco plans?", "recommendation"),
+    ("I'd like to change my electricity plan", "recommendation"),
+    ("Do you have a green energy plan?", "recommendation"),
+    ("Suggest a cheaper plan", "recommendation"),
+    ("What are the rates of the Standard Plan?", "recommendation"),
+    ("Help me pick a plan", "recommendation"),
+    ("Is there a plan with a lower standing charge?", "recommendation"),
+    ("Recommend me the cheapest option", "recommendation"),
+    ("What's the weather like today?", "out_of_scope"),
+    ("Tell me a joke", "out_of_scope"),
+    ("Who won the football match yesterday?", "out_of_scope"),
+    ("What is the capital of France?", "out_of_scope"),
+    ("Write me a poem about the sea", "out_of_scope"),
+    ("Can you help me with my homework?", "out_of_scope"),
+    ("How do I cook pasta?", "out_of_scope"),
+    ("Write a Python script to sort a list", "out_of_scope"),
+    ("Book me a flight to London", "out_of_scope"),
+    ("What's the meaning of life?", "out_of_scope"),
+    ("Translate this sentence into German", "out_of_scope"),
+    ("Who is the president of the United States?", "out_of_scope"),
+    ("Recommend a good movie to watch tonight", "out_of_scope"),
+    ("What time is it in Tokyo?", "out_of_scope"),
+    ("Can you order a pizza for me?", "out_of_scope"),
+    ("Explain quantum physics", "out_of_scope"),
+    ("What's the best phone to buy?", "out_of_scope"),
+    ("Sing me a song", "out_of_scope"),
+)
+
+
+@dataclass(frozen=True)
+class IntentPrediction:
+    """Most likely intent of a text and its probability."""
+
+    intent: str
+    confidence: float
+    probabilities: dict[str, float]
+
+
+def featurize(text: str, n_features: int = DEFAULT_N_FEATURES) -> tuple[np.ndarray, np.ndarray]:
+    """Return the L2-normalized hashed features of ``text`` as ``(indices, values)``."""
+    tokens = _TOKEN_RE.findall(text.lower())
+    counts: dict[int, float] = {}
+
+    def add(feature: str) -> None:
+        index = zlib.crc32(feature.encode()) % n_features
+        counts[index] = counts.get(index, 0.0) + 1.0
+
+    for i, token in enumerate(tokens):
+        add(f"w:{token}")
+        if i:
+            add(f"b:{tokens[i - 1]} {token}")
+        padded = f" {token} "
+        for j in range(len(padded) - 2):
+            add(f"c:{padded[j : j + 3]}")
+
+    if not counts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+    values = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+    return indices, values / math.sqrt(float(values @ values))
+
+
+class IntentClassifier:
+    """Multinomial logistic regression over hashed n-gram features."""
+
+    def __init__(
+        self,
+        weights: np.ndarray | None = None,
+        bias: np.ndarray | None = None,
+        intents: tuple[str, ...] = INTENTS,
+        n_features: int = DEFAULT_N_FEATURES,
+        holdout_accuracy: float | None = None,
+        holdout_examples: int = 0,
+    ) -> None:
+        self.intents = tuple(intents)
+        self.n_features = n_features
+        self.weights = weights if weights is not None else np.zeros((len(self.intents), n_features))
+        self.bias = bias if bias is not None else np.zeros(len(self.intents))
+        # Accuracy on examples kept out of training (None when the model was never evaluated)
+        self.holdout_accuracy = holdout_accuracy
+        self.holdout_examples = holdout_examples
+
+    def _probabilities(self, indices: np.ndarray, values: np.ndarray) -> np.ndarray:
+        logits = self.weights[:, indices] @ values + self.bias
+        logits -= logits.max()
+        exp = np.exp(logits)
+        return exp / exp.sum()
+
+    def predict(self, text: str) -> IntentPrediction:
+        """Return the most likely intent of ``text``."""
+        probabilities = self._probabilities(*featurize(text, self.n_features))
+        best = int(probabilities.argmax())
+        return IntentPrediction(
+            intent=self.intents[best],
+            confidence=float(probabilities[best]),
+            probabilities={intent: float(p) for intent, p in zip(self.intents, probabilities, strict=True)},
+        )
+
+    def evaluate(self, examples: list[tuple[str, str]]) -> float:
+        """Return the share of ``examples`` whose intent is predicted correctly."""
+        if not examples:
+            raise ValueError("No examples to evaluate on")
+        return sum(self.predict(text).intent == intent for text, intent in examples) / len(examples)
+
+    @classmethod
+    def train(
+        cls,
+        examples: Iterable[tuple[str, str]],
+        intents: tuple[str, ...] = INTENTS,
+        n_features: int = DEFAULT_N_FEATURES,
+        epochs: int = 30,
+        learning_rate: float = 0.5,
+        l2: float = 1e-4,
+        seed: int = 0,
+    ) -> "IntentClassifier":
+        """Fit the model with stochastic gradient descent on the cross-entropy loss."""
+        model = cls(intents=intents, n_features=n_features)
+        labels = {intent: i for i, intent in enumerate(intents)}
+        data = [(featurize(text, n_features), labels[intent]) for text, intent in examples if intent in labels]
+        if not data:
+            raise ValueError("No training examples with a known intent")
+
+        rng = random.Random(seed)
+        for epoch in range(epochs):
+            rng.shuffle(data)
+            rate = learning_rate / (1 + epoch * 0.1)
+            for (indices, values), label in data:
+                gradient = model._probabilities(indices, values)
+                gradient[label] -= 1.0
+                # Weight decay is applied lazily, to the features of the example only
+                model.weights[:, indices] *= 1 - rate * l2
+                model.weights[:, indices] -= rate * np.outer(gradient, values)
+                model.bias -= rate * gradient
+        return model
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(
+            path,
+            weights=self.weights,
+            bias=self.bias,
+            intents=np.array(self.intents),
+            holdout_accuracy=np.nan if self.holdout_accuracy is None else self.holdout_accuracy,
+            holdout_examples=self.holdout_examples,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "IntentClassifier":
+        with np.load(path) as data:
+            weights = data["weights"]
+            # Models saved before the held-out evaluation have no accuracy
+            accuracy = float(data["holdout_accuracy"]) if "holdout_accuracy" in data.files else math.nan
+            return cls(
+                weights=weights,
+                bias=data["bias"],
+                intents=tuple(str(intent) for intent in data["intents"]),
+                n_features=weights.shape[1],
+                holdout_accuracy=None if math.isnan(accuracy) else accuracy,
+                holdout_examples=int(data["holdout_examples"]) if "holdout_examples" in data.files else 0,
+            )
+
+
+def split_examples(
+    examples: list[tuple[str, str]], holdout: float, seed: int = 0
+) -> tuple[list[tuple[str, str]], list[tuple[str, str]]]:
+    """Split ``examples`` into training and held-out examples, keeping the share of each intent."""
+    rng = random.Random(seed)
+    train, held_out = [], []
+    for intent in sorted({intent for _, intent in examples}):
+        group = [example for example in examples if example[1] == intent]
+        rng.shuffle(group)
+        count = round(len(group) * holdout)
+        held_out.extend(group[:count])
+        train.extend(group[count:])
+    return train, held_out
+
+
+def _transcript_examples(conversation: list[dict]) -> list[tuple[str, str]]:
+    """Label each user turn of a saved transcript with the assistant it was handed over to."""
+    examples = []
+    pending: str | None = None
+    for message in conversation:
+        role, content = message.get("role"), str(message.get("content", ""))
+        if role == "user":
+            pending = content
+        elif pending is not None:
+            for intent in ("spending", "recommendation"):
+                if f"The assistant is now the {intent}_assistant" in content:
+                    examples.append((pending, intent))
+                    pending = None
+                    break
+    return examples
+
+
+def load_examples(paths: Iterable[str]) -> list[tuple[str, str]]:
+    """Read labelled examples from JSONL files and saved transcripts (files or directories)."""
+    examples = []
+    files = []
+    for path in map(Path, paths):
+        files.extend(sorted(path.glob("*.json*")) if path.is_dir() else [path])
+    for file in files:
+        with open(file, encoding="utf-8") as f:
+            if file.suffix == ".jsonl":
+                # Labelled examples, or the lines of a conversation transcript
+                conversation = []
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        if "intent" in record:
+                            examples.append((record["text"], record["intent"]))
+                        else:
+                            conversation.append(record)
+                examples.extend(_transcript_examples(conversation))
+            else:
+                examples.extend(_transcript_examples(json.load(f).get("conversation", [])))
+    return examples
+
+
+def load_intent_classifier() -> IntentClassifier:
+    """Load the model at ``INTENT_MODEL_PATH``, or train one on the seed examples.
+
+    The model trained on the seed examples has no held-out accuracy.
+    """
+    path = os.getenv("INTENT_MODEL_PATH", "intent_model.npz")
+    if os.path.exists(path):
+        return IntentClassifier.load(path)
+    logger.info(f"No intent model at {path}, training one on the built-in examples")
+    return IntentClassifier.train(SEED_EXAMPLES)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train the local intent classifier.")
+    parser.add_argument("--data", nargs="*", default=[], help="Labelled JSONL files and transcript files/directories")
+    parser.add_argument("--output", default="intent_model.npz")
+    parser.add_argument("--epochs", type=int, default=30)
+    parser.add_argument("--no-seed", action="store_true", help="Do not add the built-in examples")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Share of the examples kept out for evaluation")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    examples = load_examples(args.data)
+    if not args.no_seed:
+        examples.extend(SEED_EXAMPLES)
+    train, held_out = split_examples(examples, args.holdout)
+    model = IntentClassifier.train(train, epochs=args.epochs)
+    if held_out:
+        model.holdout_accuracy = model.evaluate(held_out)
+        model.holdout_examples = len(held_out)
+    model.save(args.output)
+
+    logger.info(f"Trained on {len(train)} examples, training accuracy {model.evaluate(train):.1%}")
+    if model.holdout_accuracy is None:
+        logger.warning("No held-out examples: the intent router will not use this model")
+    else:
+        logger.info(f"Held-out accuracy {model.holdout_accuracy:.1%} on {len(held_out)} examples")
+
+
+if __name__ == "__main__":
+    main()
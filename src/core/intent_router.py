@@ -0,0 +1,158 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END
+
+from src.core.graph import ENTRY_HANDOFFS
+from src.core.intent_classifier import IntentClassifier, load_intent_classifier
+from src.core.state import State
+from src.tools import ToRecommendationAssistant, ToSpendingAssistant
+
+logger = logging.getLogger(__name__)
+
+OUT_OF_SCOPE_REPLY = (
+    "Sorry, I can't help with that. I can help you with your electricity bills and with finding the best "
+    "electricity plan for you."
+)
+
+# Held-out examples a model must have been evaluated on before it may route turns
+MIN_HOLDOUT_EXAMPLES = 50
+
+# Intent -> handoff tool the primary assistant would have called
+INTENT_HANDOFFS = {
+    "spending": ToSpendingAssistant.__name__,
+    "recommendation": ToRecommendationAssistant.__name__,
+}
+
+
+@dataclass(frozen=True)
+class RouteStats:
+    """Point-in-time snapshot of how user turns were routed."""
+
+    classifier: int  # handed over to a specialist by the classifier
+    canned: int  # answered with the out-of-scope reply
+    llm: int  # left to the primary assistant
+    classify_time_s: float
+
+    @property
+    def total(self) -> int:
+        return self.classifier + self.canned + self.llm
+
+
+class IntentRouter:
+    """Graph node that routes a new user turn without calling the primary assistant's LLM.
+
+    When the local classifier is confident, it emits the handoff tool call the primary
+    assistant would have made (so the entry node and the transcript look the same) or the
+    canned out-of-scope reply. Otherwise the turn goes to the primary assistant.
+    """
+
+    def __init__(
+        self,
+        classifier: IntentClassifier,
+        threshold: float = 0.85,
+        out_of_scope_threshold: float | None = None,
+    ) -> None:
+        self.classifier = classifier
+        self.threshold = threshold
+        self.out_of_scope_threshold = threshold if out_of_scope_threshold is None else out_of_scope_threshold
+        self._lock = threading.Lock()
+        self._counts = {"classifier": 0, "canned": 0, "llm": 0}
+        self._classify_time_s = 0.0
+
+    @classmethod
+    def from_env(cls) -> "IntentRouter":
+        """Build the router from the ``INTENT_*`` environment variables."""
+        threshold = float(os.getenv("INTENT_CONFIDENCE_THRESHOLD", "0.85"))
+        out_of_scope_threshold = os.getenv("INTENT_OUT_OF_SCOPE_THRESHOLD")
+        return cls(
+            load_intent_classifier(),
+            threshold=threshold,
+            out_of_scope_threshold=float(out_of_scope_threshold) if out_of_scope_threshold else None,
+        )
+
+    def _record(self, source: str, elapsed: float) -> None:
+        with self._lock:
+            self._counts[source] += 1
+            self._classify_time_s += elapsed
+
+    def __call__(self, state: State) -> dict:
+        last_message = state["messages"][-1]
+        if not isinstance(last_message, HumanMessage) or not isinstance(last_message.content, str):
+            self._record("llm", 0.0)
+            return {}
+
+        start = time.perf_counter()
+        prediction = self.classifier.predict(last_message.content)
+        elapsed = time.perf_counter() - start
+        metadata = {
+            "route_source": "intent_classifier",
+            "intent": prediction.intent,
+            "confidence": round(prediction.confidence, 4),
+        }
+
+        if prediction.intent in INTENT_HANDOFFS and prediction.confidence >= self.threshold:
+            self._record("classifier", elapsed)
+            logger.info(f"Intent router: {prediction.intent} ({prediction.confidence:.2f}), skipping the primary LLM")
+            tool_call = {
+                "name": INTENT_HANDOFFS[prediction.intent],
+                "args": {"request": last_message.content},
+                "id": f"intent_{uuid.uuid4().hex}",
+                "type": "tool_call",
+            }
+            return {"messages": AIMessage(content="", tool_calls=[tool_call], response_metadata=metadata)}
+
+        if prediction.intent == "out_of_scope" and prediction.confidence >= self.out_of_scope_threshold:
+            self._record("canned", elapsed)
+            logger.info(f"Intent router: out of scope ({prediction.confidence:.2f}), answering with the canned reply")
+            return {"messages": AIMessage(content=OUT_OF_SCOPE_REPLY, response_metadata=metadata)}
+
+        self._record("llm", elapsed)
+        logger.debug(f"Intent router: unsure ({prediction.intent} {prediction.confidence:.2f}), using the primary LLM")
+        return {}
+
+    def route(self, state: State) -> str:
+        """Continue to the entry node of the handoff, END after a canned reply, or the primary assistant."""
+        last_message = state["messages"][-1]
+        if isinstance(last_message, AIMessage):
+            if last_message.tool_calls:
+                return ENTRY_HANDOFFS[last_message.tool_calls[0]["name"]]
+            return END
+        return "primary_assistant"
+
+    def stats(self) -> RouteStats:
+        """Return the route source counters."""
+        with self._lock:
+            return RouteStats(**self._counts, classify_time_s=self._classify_time_s)
+
+
+def create_intent_router() -> IntentRouter | None:
+    """Return the intent router, or None when it is disabled or its model is not accurate enough.
+
+    The router is off unless ``ENABLE_INTENT_ROUTER=true``, and even then it is only used
+    with a model evaluated on at least ``MIN_HOLDOUT_EXAMPLES`` held-out examples with an
+    accuracy of ``INTENT_MIN_HOLDOUT_ACCURACY`` or more (so never with the seed model).
+    """
+    if os.getenv("ENABLE_INTENT_ROUTER", "false").lower() != "true":
+        return None
+    router = IntentRouter.from_env()
+    min_accuracy = float(os.getenv("INTENT_MIN_HOLDOUT_ACCURACY", "0.95"))
+    accuracy, examples = router.classifier.holdout_accuracy, router.classifier.holdout_examples
+    if accuracy is None or examples < MIN_HOLDOUT_EXAMPLES:
+        logger.warning(
+            f"Intent router disabled: its model was not evaluated on at least {MIN_HOLDOUT_EXAMPLES} held-out "
+            "examples (train one with python -m src.core.intent_classifier)"
+        )
+        return None
+    if accuracy < min_accuracy:
+        logger.warning(
+            f"Intent router disabled: held-out accuracy {accuracy:.1%} on {examples} examples is below {min_accuracy:.1%}"
+        )
+        return None
+    logger.info(f"Intent router enabled: held-out accuracy {accuracy:.1%} on {examples} examples")
+    return router
@@ -19,6 +19,7 @@ class State(TypedDict, total=False):
     messages: Annotated[list[AnyMessage], add_messages]
     user_info: str
     customer_id: int | None
+    summary: str  # rolling summary of the turns folded out of ``messages``
     dialog_state: Annotated[
         list[Literal["primary", "spending", "recommendation"]],
         update_dialog_stack,
@@ -0,0 +1,178 @@
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterator
+from dataclasses import dataclass
+from typing import Any
+
+from langchain_core.messages import AIMessage, BaseMessage, RemoveMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph.state import CompiledStateGraph
+
+logger = logging.getLogger(__name__)
+
+# Graph nodes whose AI messages are shown to the user (tool and entry nodes are internal)
+USER_FACING_NODES = frozenset({"primary_assistant", "spending_assistant", "recommendation_assistant", "intent_router"})
+STREAM_MODES = ["messages", "updates"]
+
+
+@dataclass(frozen=True)
+class TurnMetrics:
+    """Perceived latency of one streamed turn."""
+
+    time_to_first_token_s: float | None
+    total_s: float
+    chunks: int
+    characters: int
+
+
+def message_text(message: BaseMessage) -> str:
+    """Return the text of a message or chunk, whether its content is a string or a list of blocks."""
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block.get("text", "") if isinstance(block, dict) else str(block)
+        for block in content
+        if not isinstance(block, dict) or block.get("type", "text") == "text"
+    )
+
+
+class LatencyTracker:
+    """Keeps the metrics of the most recent turns to report time-to-first-token percentiles."""
+
+    def __init__(self, max_turns: int = 1000) -> None:
+        self._turns: deque[TurnMetrics] = deque(maxlen=max_turns)
+        self._lock = threading.Lock()
+
+    def record(self, metrics: TurnMetrics) -> None:
+        with self._lock:
+            self._turns.append(metrics)
+
+    def summary(self) -> dict[str, float]:
+        """Return the p50/p95 time-to-first-token and total turn time, in seconds."""
+        with self._lock:
+            turns = list(self._turns)
+        ttft = sorted(t.time_to_first_token_s for t in turns if t.time_to_first_token_s is not None)
+        total = sorted(t.total_s for t in turns)
+
+        def percentile(values: list[float], q: float) -> float:
+            return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+        return {
+            "turns": len(turns),
+            "ttft_p50_s": percentile(ttft, 0.50),
+            "ttft_p95_s": percentile(ttft, 0.95),
+            "total_p50_s": percentile(total, 0.50),
+            "total_p95_s": percentile(total, 0.95),
+        }
+
+
+_tracker = LatencyTracker()
+
+
+def get_latency_tracker() -> LatencyTracker:
+    """Return the process-wide tracker of streamed turn latencies."""
+    return _tracker
+
+
+class ReplyStream:
+    """Iterate over the text the user should see while the graph runs a turn.
+
+    The graph is run with ``stream_mode=["messages", "updates"]``. LangGraph streams the
+    tokens of every chat model called inside a node, including plain ``invoke`` calls, so
+    the assistants need no changes. Only text from ``USER_FACING_NODES`` is yielded; tool
+    calls and tool results are not. Separate assistant messages within one turn are
+    separated by a blank line. ``on_update`` receives every node update. The stream can
+    also be consumed with ``async for``, which runs the graph with ``astream``. Once it
+    is exhausted, ``metrics`` is set, ``messages`` holds the messages the graph added in
+    this turn and ``values`` the last value written to each other state channel.
+    """
+
+    def __init__(
+        self,
+        graph: CompiledStateGraph,
+        inputs: dict,
+        config: RunnableConfig,
+        on_update: Callable[[dict], Any] | None = None,
+    ) -> None:
+        self.graph = graph
+        self.inputs = inputs
+        self.config = config
+        self.on_update = on_update
+        self.metrics: TurnMetrics | None = None
+        self.messages: list[BaseMessage] = []
+        self.values: dict[str, Any] = {}
+
+    def _collect(self, data: dict) -> None:
+        for update in data.values():
+            if not isinstance(update, dict):
+                continue
+            for channel, value in update.items():
+                if channel != "messages":
+                    self.values[channel] = value
+                    continue
+                for message in value if isinstance(value, list) else [value]:
+                    if isinstance(message, BaseMessage) and not isinstance(message, RemoveMessage):
+                        self.messages.append(message)
+
+    def _start(self) -> None:
+        self._started_at = time.perf_counter()
+        self._first_token_at: float | None = None
+        self._chunks = self._characters = 0
+        self._current_message_id: str | None = None
+
+    def _text(self, mode: str, data: object) -> str:
+        """Return the text to show for one streamed item (empty for anything else)."""
+        if mode == "updates":
+            self._collect(data)
+            if self.on_update is not None:
+                self.on_update(data)
+            return ""
+
+        message, metadata = data
+        if not isinstance(message, AIMessage) or metadata.get("langgraph_node") not in USER_FACING_NODES:
+            return ""
+        text = message_text(message)
+        if not text:
+            return ""
+
+        separator = ""
+        if self._first_token_at is None:
+            self._first_token_at = time.perf_counter()
+        elif message.id != self._current_message_id:
+            separator = "\n\n"
+        self._current_message_id = message.id
+        self._chunks += 1
+        self._characters += len(text)
+        return separator + text
+
+    def _finish(self) -> None:
+        self.metrics = TurnMetrics(
+            time_to_first_token_s=self._first_token_at - self._started_at if self._first_token_at is not None else None,
+            total_s=time.perf_counter() - self._started_at,
+            chunks=self._chunks,
+            characters=self._characters,
+        )
+        get_latency_tracker().record(self.metrics)
+        if self.metrics.time_to_first_token_s is not None:
+            logger.info(
+                f"Turn streamed: first token after {self.metrics.time_to_first_token_s * 1000:.0f} ms, "
+                f"total {self.metrics.total_s * 1000:.0f} ms"
+            )
+
+    def __iter__(self) -> Iterator[str]:
+        self._start()
+        for mode, data in self.graph.stream(self.inputs, config=self.config, stream_mode=STREAM_MODES):
+            if text := self._text(mode, data):
+                yield text
+        self._finish()
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        """Same as iterating, with ``graph.astream``: for many turns running on one event loop."""
+        self._start()
+        async for mode, data in self.graph.astream(self.inputs, config=self.config, stream_mode=STREAM_MODES):
+            if text := self._text(mode, data):
+                yield text
+        self._finish()
@@ -0,0 +1,247 @@
+"""Append-only conversation transcripts.
+
+Each turn appends only its new messages to ``<TRANSCRIPT_DIR>/<thread_id>.jsonl``. The
+lines are written by a background thread, which fsyncs each file once per batch, so
+saving a transcript costs the request path nothing but a queue put. The readable JSON
+of a conversation is built on demand:
+
+    python -m src.core.transcripts <thread_id> --output conversation.json
+"""
+
+import argparse
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRANSCRIPT_DIR = "transcripts"
+# Threads whose last written customer id and summary are remembered
+_STATE_CACHE_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class TranscriptStats:
+    """Counters of the transcript writer."""
+
+    records: int
+    batches: int
+    fsyncs: int
+    queued: int
+    errors: int
+
+
+def message_record(message: BaseMessage) -> dict:
+    """Return the transcript line of a message."""
+    if isinstance(message, HumanMessage):
+        role = "user"
+    elif isinstance(message, AIMessage):
+        role = "assistant"
+    elif isinstance(message, ToolMessage):
+        role = "tool"
+    else:
+        role = message.type
+    record = {"role": role, "content": message.content}
+    if isinstance(message, AIMessage) and message.tool_calls:
+        record["tool_calls"] = [{"name": tc["name"], "args": tc["args"]} for tc in message.tool_calls]
+    if isinstance(message, ToolMessage) and message.name:
+        record["name"] = message.name
+    return record
+
+
+class TranscriptWriter:
+    """Appends transcript lines per thread from a background thread.
+
+    Lines queued within ``flush_interval`` seconds are written together, with one fsync
+    per file and batch. ``flush`` waits until everything queued so far is on disk.
+    """
+
+    def __init__(self, directory: str = DEFAULT_TRANSCRIPT_DIR, flush_interval: float = 1.0) -> None:
+        self.directory = directory
+        self.flush_interval = flush_interval
+        os.makedirs(directory, exist_ok=True)
+        self._queue: queue.Queue[tuple[str, list[dict]] | None] = queue.Queue()
+        self._lock = threading.Lock()
+        self._records = 0
+        self._batches = 0
+        self._fsyncs = 0
+        self._errors = 0
+        self._closed = False
+        # Last customer id and summary written per thread, so unchanged ones are not repeated
+        self._states: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._wakeup = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="transcript-writer", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_env(cls) -> "TranscriptWriter":
+        """Build the writer from the ``TRANSCRIPT_*`` environment variables."""
+        return cls(
+            directory=os.getenv("TRANSCRIPT_DIR", DEFAULT_TRANSCRIPT_DIR),
+            flush_interval=float(os.getenv("TRANSCRIPT_FLUSH_INTERVAL", "1.0")),
+        )
+
+    def path(self, thread_id: str) -> str:
+        """Return the transcript file of a thread; raise ValueError if it is not in ``directory``."""
+        path = os.path.join(self.directory, f"{thread_id}.jsonl")
+        if os.path.dirname(os.path.realpath(path)) != os.path.realpath(self.directory):
+            raise ValueError(f"Thread id {thread_id!r} does not name a file in {self.directory}")
+        return path
+
+    def append(
+        self,
+        thread_id: str,
+        messages: list[BaseMessage],
+        customer_id: int | None = None,
+        summary: str | None = None,
+    ) -> None:
+        """Queue the new messages of a turn, and the customer id and summary if they changed."""
+        # Checked here, since an error in the background thread would not reach the caller
+        self.path(thread_id)
+        ts = datetime.now().isoformat(timespec="seconds")
+        records = [{"ts": ts, **message_record(message)} for message in messages]
+        with self._lock:
+            written = self._states.pop(thread_id, {})
+            state = {
+                key: value
+                for key, value in (("customer_id", customer_id), ("summary", summary))
+                if value is not None and written.get(key) != value
+            }
+            self._states[thread_id] = {**written, **state}
+            if len(self._states) > _STATE_CACHE_SIZE:
+                self._states.popitem(last=False)
+        if state:
+            records.append({"ts": ts, "role": "state", **state})
+        if records:
+            self._queue.put((thread_id, records))
+
+    def _write(self, batch: list[tuple[str, list[dict]]]) -> None:
+        lines: dict[str, list[str]] = defaultdict(list)
+        for thread_id, records in batch:
+            lines[thread_id].extend(json.dumps(record, ensure_ascii=False, default=str) for record in records)
+        for thread_id, thread_lines in lines.items():
+            try:
+                with open(self.path(thread_id), "a", encoding="utf-8") as f:
+                    f.write("\n".join(thread_lines) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                with self._lock:
+                    self._records += len(thread_lines)
+                    self._fsyncs += 1
+            except OSError as e:
+                logger.error(f"Failed to write the transcript of thread {thread_id}: {e}")
+                with self._lock:
+                    self._errors += 1
+        with self._lock:
+            self._batches += 1
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            batch, taken = [], 1
+            stop = item is None
+            if not stop:
+                batch.append(item)
+                # Gather what arrives within the flush interval into the same batch
+                self._wakeup.wait(self.flush_interval)
+                self._wakeup.clear()
+                while not stop:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    taken += 1
+                    stop = item is None
+                    if not stop:
+                        batch.append(item)
+            if batch:
+                self._write(batch)
+            for _ in range(taken):
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        """Write the queued lines now and wait until they are on disk."""
+        self._wakeup.set()
+        self._queue.join()
+
+    def export(self, thread_id: str) -> dict[str, Any]:
+        """Build the readable transcript of a thread from its JSONL file."""
+        self.flush()
+        transcript: dict[str, Any] = {"thread_id": thread_id, "timestamp": None, "conversation": []}
+        if not os.path.exists(self.path(thread_id)):
+            return transcript
+        with open(self.path(thread_id), encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                transcript["timestamp"] = record.pop("ts", transcript["timestamp"])
+                if record.get("role") == "state":
+                    record.pop("role")
+                    transcript.update(record)
+                else:
+                    transcript["conversation"].append(record)
+        return transcript
+
+    def stats(self) -> TranscriptStats:
+        with self._lock:
+            return TranscriptStats(
+                records=self._records,
+                batches=self._batches,
+                fsyncs=self._fsyncs,
+                queued=self._queue.qsize(),
+                errors=self._errors,
+            )
+
+    def close(self) -> None:
+        """Write the queued lines and stop the background thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._wakeup.set()
+        self._thread.join()
+
+
+_writer: TranscriptWriter | None = None
+_writer_lock = threading.Lock()
+
+
+def get_transcript_writer() -> TranscriptWriter:
+    """Return the process-wide transcript writer (closed, and so flushed, at exit)."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = TranscriptWriter.from_env()
+                atexit.register(_writer.close)
+    return _writer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export the readable JSON transcript of a conversation.")
+    parser.add_argument("thread_id")
+    parser.add_argument("--output", default=None, help="File to write (default: standard output)")
+    args = parser.parse_args()
+
+    transcript = get_transcript_writer().export(args.thread_id)
+    text = json.dumps(transcript, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,32 @@
 """Database package for chatbot POC.
 
-This package provides modules for database schema creation and data management.
+This package provides modules for database schema creation, data management and
+connection pooling.
 """
 
+from src.db.connection import ConnectionPool, PoolConfig, PoolStats, configure_pool, get_db_path, get_pool
 from src.db.data_generators import populate_all_tables
 from src.db.db_schema import create_all_tables, init_database
+from src.db.identity_cache import IdentityCache, get_identity_cache
+from src.db.migrations import MIGRATIONS, apply_migrations, check_query_plans
+from src.db.plan_catalog import PlanCatalog, PlanCatalogSnapshot, get_plan_catalog
 
-__all__ = ["create_all_tables", "init_database", "populate_all_tables"]
+__all__ = [
+    "MIGRATIONS",
+    "ConnectionPool",
+    "IdentityCache",
+    "PlanCatalog",
+    "PlanCatalogSnapshot",
+    "PoolConfig",
+    "PoolStats",
+    "apply_migrations",
+    "check_query_plans",
+    "configure_pool",
+    "create_all_tables",
+    "get_db_path",
+    "get_identity_cache",
+    "get_plan_catalog",
+    "get_pool",
+    "init_database",
+    "populate_all_tables",
+]
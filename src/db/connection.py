@@ -0,0 +1,261 @@
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from urllib.request import pathname2url
+
+logger = logging.getLogger(__name__)
+
+# Database configurations
+DEFAULT_DB_PATH = "data.db"
+
+
+def get_db_path() -> str:
+    """Return the configured database path (``DB_PATH`` environment variable)."""
+    return os.getenv("DB_PATH", DEFAULT_DB_PATH)
+
+
+class PoolTimeoutError(sqlite3.OperationalError):
+    """Raised when no pooled connection becomes available in time."""
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    return os.getenv(name, str(default)).lower() in ("1", "true", "yes")
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    """Settings for a pool of long-lived SQLite connections.
+
+    With ``read_only`` the connections are opened with a ``mode=ro`` URI and the
+    journal settings are left untouched; ``immutable`` additionally tells SQLite the
+    file cannot change, which skips all locking and change detection (only safe while
+    nothing writes to the database). ``mmap_size`` lets readers share the OS page cache
+    through memory-mapped I/O instead of copying pages into each connection's cache.
+    """
+
+    path: str = DEFAULT_DB_PATH
+    max_size: int = 8
+    timeout: float = 5.0
+    cached_statements: int = 256
+    busy_timeout_ms: int = 5000
+    cache_size_kib: int = 16384
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    read_only: bool = False
+    immutable: bool = False
+    query_only: bool = False
+    mmap_size: int = 0
+
+    @classmethod
+    def from_env(cls) -> "PoolConfig":
+        """Build the configuration from the ``DB_*`` environment variables."""
+        return cls(
+            path=get_db_path(),
+            max_size=int(os.getenv("DB_POOL_SIZE", str(cls.max_size))),
+            timeout=float(os.getenv("DB_POOL_TIMEOUT", str(cls.timeout))),
+            cache_size_kib=int(os.getenv("DB_CACHE_SIZE_KIB", str(cls.cache_size_kib))),
+            read_only=_env_flag("DB_READ_ONLY"),
+            immutable=_env_flag("DB_IMMUTABLE"),
+            query_only=_env_flag("DB_QUERY_ONLY"),
+            mmap_size=int(os.getenv("DB_MMAP_SIZE", str(cls.mmap_size))),
+        )
+
+
+def open_connection(config: PoolConfig) -> sqlite3.Connection:
+    """Open a connection to ``config.path`` and apply the serving PRAGMAs."""
+    if config.read_only or config.immutable:
+        uri = f"file:{pathname2url(os.path.abspath(config.path))}?mode=ro"
+        if config.immutable:
+            uri += "&immutable=1"
+        conn = sqlite3.connect(
+            uri,
+            uri=True,
+            timeout=config.busy_timeout_ms / 1000,
+            check_same_thread=False,
+            cached_statements=config.cached_statements,
+        )
+    else:
+        conn = sqlite3.connect(
+            config.path,
+            timeout=config.busy_timeout_ms / 1000,
+            check_same_thread=False,
+            cached_statements=config.cached_statements,
+        )
+        conn.execute(f"PRAGMA journal_mode={config.journal_mode}")
+        conn.execute(f"PRAGMA synchronous={config.synchronous}")
+
+    conn.execute(f"PRAGMA cache_size=-{config.cache_size_kib:d}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    if config.mmap_size:
+        conn.execute(f"PRAGMA mmap_size={config.mmap_size:d}")
+    if config.query_only:
+        conn.execute("PRAGMA query_only=ON")
+    return conn
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    """Point-in-time snapshot of the pool metrics."""
+
+    hits: int
+    misses: int
+    waits: int
+    timeouts: int
+    wait_time_s: float
+    size: int
+    in_use: int
+    idle: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses + self.waits
+        return self.hits / total if total else 0.0
+
+
+class ConnectionPool:
+    """Bounded pool of SQLite connections shared by the tool layer.
+
+    Connections are opened lazily up to ``max_size`` and reused afterwards, so the
+    connect/teardown cost, the PRAGMA setup and the per-connection statement cache
+    are paid once per connection instead of once per tool call.
+    """
+
+    def __init__(self, config: PoolConfig | None = None) -> None:
+        self.config = config or PoolConfig()
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._size = 0
+        self._in_use = 0
+        self._hits = 0
+        self._misses = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_time = 0.0
+        self._closed = False
+
+    def acquire(self) -> sqlite3.Connection:
+        """Take a connection from the pool, opening or waiting for one if needed."""
+        if self._closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed")
+
+        try:
+            conn = self._idle.get_nowait()
+            with self._lock:
+                self._hits += 1
+                self._in_use += 1
+            return conn
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._size < self.config.max_size
+            if can_create:
+                self._size += 1
+                self._misses += 1
+                self._in_use += 1
+
+        if can_create:
+            try:
+                return open_connection(self.config)
+            except sqlite3.Error:
+                with self._lock:
+                    self._size -= 1
+                    self._in_use -= 1
+                raise
+
+        start = time.perf_counter()
+        try:
+            conn = self._idle.get(timeout=self.config.timeout)
+        except queue.Empty:
+            with self._lock:
+                self._timeouts += 1
+                self._wait_time += time.perf_counter() - start
+            raise PoolTimeoutError(f"No database connection available after {self.config.timeout}s")
+
+        with self._lock:
+            self._waits += 1
+            self._wait_time += time.perf_counter() - start
+            self._in_use += 1
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """Return a connection to the pool."""
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            self._in_use -= 1
+            if self._closed:
+                self._size -= 1
+                conn.close()
+                return
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Context manager that borrows a connection for the duration of the block."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self) -> PoolStats:
+        """Return the current pool metrics."""
+        with self._lock:
+            return PoolStats(
+                hits=self._hits,
+                misses=self._misses,
+                waits=self._waits,
+                timeouts=self._timeouts,
+                wait_time_s=self._wait_time,
+                size=self._size,
+                in_use=self._in_use,
+                idle=self._idle.qsize(),
+            )
+
+    def close(self) -> None:
+        """Close every idle connection; borrowed ones are closed on release."""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._size -= 1
+
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Return the process-wide connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(PoolConfig.from_env())
+    return _pool
+
+
+def configure_pool(config: PoolConfig) -> ConnectionPool:
+    """Replace the process-wide connection pool, e.g. to point it at another database file."""
+    global _pool
+    with _pool_lock:
+        old_pool, _pool = _pool, ConnectionPool(config)
+    if old_pool is not None:
+        old_pool.close()
+    logger.info(
+        f"Configured connection pool for {config.path} (max_size={config.max_size}, read_only={config.read_only},"
+        f" immutable={config.immutable}, mmap_size={config.mmap_size})"
+    )
+    return _pool
@@ -1,5 +1,19 @@
 import logging
+import random
 import sqlite3
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from itertools import chain, islice
+
+FIRST_NAMES = ["Alice", "Bob", "Carla", "David", "Elena", "Farid", "Grace", "Hugo", "Irene", "Jon", "Kira", "Luis"]
+LAST_NAMES = ["Johnson", "Smith", "Garcia", "Muller", "Rossi", "Dubois", "Novak", "Silva", "Kim", "Lopez", "Brown"]
+DEFAULT_PLAN_MIX = {"Standard Plan": 0.5, "Eco Plan": 0.3, "Night Plan": 0.2}
+CUSTOMER_COLUMNS = ("customer_id", "name", "email", "email_normalized")
+SPENDING_EVENT_COLUMNS = ("customer_id", "plan_name", "billing_start", "billing_end", "amount_due")
+# Keeps rows * columns below SQLite's historical limit of 999 bound variables
+ROWS_PER_STATEMENT = 150
 
 
 def get_customers_data() -> list[tuple]:
@@ -48,25 +62,37 @@ def get_spending_events_data() -> list[tuple]:
 
 
 def get_electricity_plans_data() -> list[tuple]:
-    """Generate sample electricity plans data."""
+    """Generate sample electricity plans data.
+
+    Tariffs are the day and night unit rates (per kWh) and the daily standing charge.
+    """
     return [
         (
             1,
             "Standard Plan",
             "A well-rounded electricity plan designed for typical households, offering stable pricing and reliable service without any peak-hour surcharges.",
             "Affordable rates, predictable billing, ideal for families",
+            0.20,
+            0.20,
+            0.40,
         ),
         (
             2,
             "Eco Plan",
             "A renewable energy plan that prioritizes sustainability by sourcing electricity from solar, wind, and hydroelectric power. Perfect for environmentally conscious consumers.",
             "100% green energy, reduces carbon footprint, government incentives may apply",
+            0.23,
+            0.23,
+            0.35,
         ),
         (
             3,
             "Night Plan",
             "An electricity plan that provides significant cost savings for customers who consume most of their energy during off-peak nighttime hours. Ideal for night-shift workers and EV owners.",
             "Lower rates at night, great for electric vehicle charging, smart meter integration",
+            0.26,
+            0.12,
+            0.45,
         ),
     ]
 
@@ -136,8 +162,11 @@ def populate_electricity_plans(conn: sqlite3.Connection) -> None:
             plan_id,
             plan_name,
             plan_description,
-            selling_points)
-        VALUES (?, ?, ?, ?)
+            selling_points,
+            day_rate,
+            night_rate,
+            standing_charge)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
         """,
             electricity_plans,
         )
@@ -154,3 +183,140 @@ def populate_all_tables(connection: sqlite3.Connection) -> None:
     populate_customers(conn=connection)
     populate_spending_events(conn=connection)
     populate_electricity_plans(conn=connection)
+
+
+@dataclass(frozen=True)
+class SyntheticDataConfig:
+    """Parameters for generating a load-sized synthetic dataset."""
+
+    customers: int = 1000
+    months: int = 12
+    plan_mix: dict[str, float] = field(default_factory=lambda: dict(DEFAULT_PLAN_MIX))
+    seed: int = 42
+    start: date = date(2024, 1, 1)
+    chunk_size: int = 50_000
+    plan_switch_probability: float = 0.05
+
+    def __post_init__(self) -> None:
+        # random.choices would only fail on these once the load is under way
+        if not self.plan_mix:
+            raise ValueError("plan_mix must name at least one plan")
+        negative = {name: weight for name, weight in self.plan_mix.items() if not weight >= 0}
+        if negative:
+            raise ValueError(f"plan_mix weights must be non-negative numbers, got {negative}")
+        if not 0 < sum(self.plan_mix.values()) < float("inf"):
+            raise ValueError(f"plan_mix weights must have a positive, finite sum, got {self.plan_mix}")
+
+
+def _billing_periods(start: date, months: int) -> list[tuple[str, str]]:
+    """Return ``months`` consecutive monthly (billing_start, billing_end) pairs as ISO strings."""
+    periods = []
+    year, month = start.year, start.month
+    for _ in range(months):
+        next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+        period_start = date(year, month, 1)
+        period_end = date(next_year, next_month, 1) - timedelta(days=1)
+        periods.append((period_start.isoformat(), period_end.isoformat()))
+        year, month = next_year, next_month
+    return periods
+
+
+def iter_synthetic_customers(config: SyntheticDataConfig) -> Iterator[tuple]:
+    """Yield ``config.customers`` customer rows with deterministic names and unique emails."""
+    rng = random.Random(config.seed)
+    for customer_id in range(1, config.customers + 1):
+        first_name = rng.choice(FIRST_NAMES)
+        last_name = rng.choice(LAST_NAMES)
+        email = f"{first_name}.{last_name}.{customer_id}@example.com".lower()
+        # Already normalized, which spares the per-row trigger that maintains email_normalized
+        yield (customer_id, f"{first_name} {last_name}", email, email)
+
+
+def iter_synthetic_spending_events(config: SyntheticDataConfig) -> Iterator[tuple]:
+    """Yield ``config.months`` monthly spending events for every synthetic customer.
+
+    Each customer gets a plan drawn from ``config.plan_mix``, a base monthly amount and a
+    seasonal profile, and switches plan with ``config.plan_switch_probability`` per month.
+    """
+    rng = random.Random(config.seed + 1)
+    periods = _billing_periods(config.start, config.months)
+    # Winter months cost more than summer months
+    seasonal = [1.0 + 0.25 * (abs(6.5 - int(start[5:7])) / 5.5 - 0.5) for start, _ in periods]
+    plan_names = list(config.plan_mix)
+    weights = list(config.plan_mix.values())
+
+    for customer_id in range(1, config.customers + 1):
+        plan_name = rng.choices(plan_names, weights)[0]
+        base_amount = rng.uniform(25.0, 90.0)
+        for (billing_start, billing_end), factor in zip(periods, seasonal, strict=True):
+            if rng.random() < config.plan_switch_probability:
+                plan_name = rng.choices(plan_names, weights)[0]
+            amount_due = round(base_amount * factor * (0.9 + 0.2 * rng.random()), 2)
+            yield (customer_id, plan_name, billing_start, billing_end, amount_due)
+
+
+def _chunks(rows: Iterable[tuple], size: int) -> Iterator[list[tuple]]:
+    """Split an iterable of rows into lists of at most ``size`` rows."""
+    iterator = iter(rows)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _bulk_insert(conn: sqlite3.Connection, table: str, columns: tuple[str, ...], rows: list[tuple]) -> None:
+    """Insert rows using multi-row VALUES statements.
+
+    Binding ``ROWS_PER_STATEMENT`` rows per statement amortises the per-statement
+    overhead of ``executemany``; the remainder is inserted one row per statement.
+    """
+    placeholders = "(" + ", ".join("?" * len(columns)) + ")"
+    insert = f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+    full = len(rows) - len(rows) % ROWS_PER_STATEMENT
+    if full:
+        conn.executemany(
+            insert + ", ".join([placeholders] * ROWS_PER_STATEMENT),
+            (tuple(chain.from_iterable(rows[i : i + ROWS_PER_STATEMENT])) for i in range(0, full, ROWS_PER_STATEMENT)),
+        )
+    if full < len(rows):
+        conn.executemany(insert + placeholders, rows[full:])
+
+
+def populate_synthetic_data(conn: sqlite3.Connection, config: SyntheticDataConfig) -> int:
+    """Bulk-load a synthetic dataset into an empty database.
+
+    Rows are streamed in chunks of ``config.chunk_size`` into ``executemany`` (see
+    ``_bulk_insert``) inside a single transaction, with ``synchronous=OFF`` and an
+    in-memory journal for the duration of the load. Returns the number of spending
+    events written.
+    """
+    journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]
+    conn.execute("PRAGMA journal_mode=MEMORY")
+    conn.execute("PRAGMA synchronous=OFF")
+
+    start_time = time.perf_counter()
+    events_written = 0
+    try:
+        with conn:
+            conn.executemany(
+                "INSERT INTO electricity_plans (plan_id, plan_name, plan_description, selling_points, day_rate,"
+                " night_rate, standing_charge) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                get_electricity_plans_data(),
+            )
+            for chunk in _chunks(iter_synthetic_customers(config), config.chunk_size):
+                _bulk_insert(conn, "customers", CUSTOMER_COLUMNS, chunk)
+            for chunk in _chunks(iter_synthetic_spending_events(config), config.chunk_size):
+                _bulk_insert(conn, "spending_events", SPENDING_EVENT_COLUMNS, chunk)
+                events_written += len(chunk)
+    except sqlite3.Error as e:
+        logging.error(f"Error populating synthetic data: {e}")
+        raise
+    finally:
+        conn.execute(f"PRAGMA synchronous={synchronous}")
+        conn.execute(f"PRAGMA journal_mode={journal_mode}")
+
+    elapsed = time.perf_counter() - start_time
+    logging.info(
+        f"Added {config.customers} customers and {events_written} spending events in {elapsed:.2f}s"
+        f" ({events_written / elapsed if elapsed else 0:,.0f} rows/s)"
+    )
+    return events_written
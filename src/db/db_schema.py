@@ -1,6 +1,8 @@
 import logging
 import sqlite3
 
+from src.db.migrations import apply_migrations
+
 
 def create_spending_events_table(connection: sqlite3.Connection) -> None:
     """Create the spending_events table if it doesn't exist."""
@@ -60,10 +62,11 @@ def create_all_tables(conn: sqlite3.Connection) -> None:
 
 
 def init_database(db_path: str) -> sqlite3.Connection:
-    """Initialize the database with all required tables."""
+    """Initialize the database with all required tables and apply pending migrations."""
     try:
         conn = sqlite3.connect(db_path)
         create_all_tables(conn=conn)
+        apply_migrations(conn)
         return conn
     except sqlite3.Error as e:
         logging.error(f"Database initialization error: {e}")
@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import dataclass
+
+from src.db.connection import get_pool
+
+
+@dataclass(frozen=True)
+class IdentityCacheStats:
+    """Point-in-time snapshot of the identity cache metrics."""
+
+    hits: int
+    negative_hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    size: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class IdentityCache:
+    """LRU + TTL cache of customer identity lookups.
+
+    Entries are keyed by ``("id", customer_id)`` and by ``("email", normalized_email)``. A
+    positive lookup is stored under both keys so that validating by email and later by
+    id (or the other way round) only hits the database once. Negative lookups are cached
+    too, under the requested key only and with a shorter TTL, so repeated attempts with an
+    unknown identity do not reach the database either.
+    """
+
+    def __init__(self, max_entries: int = 10_000, positive_ttl: float = 300.0, negative_ttl: float = 30.0) -> None:
+        self.max_entries = max_entries
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self._entries: OrderedDict[Hashable, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._negative_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    @classmethod
+    def from_env(cls) -> "IdentityCache":
+        """Build the cache from the ``IDENTITY_CACHE_*`` environment variables."""
+        return cls(
+            max_entries=int(os.getenv("IDENTITY_CACHE_MAX_ENTRIES", "10000")),
+            positive_ttl=float(os.getenv("IDENTITY_CACHE_TTL", "300")),
+            negative_ttl=float(os.getenv("IDENTITY_CACHE_NEGATIVE_TTL", "30")),
+        )
+
+    def get(self, key: Hashable) -> dict | None:
+        """Return a copy of the cached lookup result for ``key``, or ``None`` on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                self._expirations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            result = entry[1]
+            self._hits += 1
+            if not result["valid"]:
+                self._negative_hits += 1
+        return _copy_result(result)
+
+    def put(self, key: Hashable, result: dict, email_key: Hashable | None = None) -> None:
+        """Cache a lookup result under ``key`` and, for a found customer, under its id and ``email_key``."""
+        result = _copy_result(result)
+        with self._lock:
+            if result["valid"]:
+                expires_at = time.monotonic() + self.positive_ttl
+                keys = {key, ("id", result["customer_id"])}
+                if email_key is not None:
+                    keys.add(email_key)
+            else:
+                expires_at = time.monotonic() + self.negative_ttl
+                keys = {key}
+            for cache_key in keys:
+                self._entries[cache_key] = (expires_at, result)
+                self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> IdentityCacheStats:
+        """Return the current cache metrics."""
+        with self._lock:
+            return IdentityCacheStats(
+                hits=self._hits,
+                negative_hits=self._negative_hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                size=len(self._entries),
+            )
+
+
+def _copy_result(result: dict) -> dict:
+    """Copy a lookup result so callers cannot mutate the cached entry."""
+    customer_info = result.get("customer_info")
+    return {**result, "customer_info": dict(customer_info) if customer_info is not None else None}
+
+
+_cache: IdentityCache | None = None
+_cache_path: str | None = None
+_cache_lock = threading.Lock()
+
+
+def get_identity_cache() -> IdentityCache:
+    """Return the process-wide identity cache for the database served by the connection pool."""
+    global _cache, _cache_path
+    path = get_pool().config.path
+    if _cache is None or _cache_path != path:
+        with _cache_lock:
+            if _cache is None or _cache_path != path:
+                _cache, _cache_path = IdentityCache.from_env(), path
+    return _cache
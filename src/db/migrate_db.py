@@ -0,0 +1,36 @@
+"""Apply the pending schema migrations to an existing database.
+
+Kept apart from ``src.db.migrations``, which the ``src.db`` package imports, so that
+running it with ``-m`` does not import the module twice:
+
+    python -m src.db.migrate_db [--db PATH] [--check]
+"""
+
+import argparse
+import logging
+import sqlite3
+
+from src.db.connection import get_db_path
+from src.db.migrations import apply_migrations, check_query_plans
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations.")
+    parser.add_argument("--db", default=get_db_path(), help="Path to the SQLite database file")
+    parser.add_argument("--check", action="store_true", help="Verify the tool query plans after migrating")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    conn = sqlite3.connect(args.db)
+    try:
+        version = apply_migrations(conn)
+        logging.info(f"Database {args.db} is at schema version {version}")
+        if args.check:
+            for label, plan in check_query_plans(conn).items():
+                logging.info(f"{label}: {' | '.join(plan)}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
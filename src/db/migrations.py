@@ -0,0 +1,169 @@
+"""Versioned schema migrations for the application database.
+
+The schema version is tracked with ``PRAGMA user_version``. Each migration runs in its
+own transaction and bumps the version, so running the migrations against an existing
+``data.db`` only applies the steps it is missing. To migrate a database from the
+command line, run ``python -m src.db.migrate_db``.
+"""
+
+import logging
+import sqlite3
+from dataclasses import dataclass
+
+from src.db.queries import NORMALIZED_EMAIL_SQL, tool_query_shapes
+
+
+@dataclass(frozen=True)
+class Migration:
+    """A single schema change, applied once when the database is below ``version``."""
+
+    version: int
+    description: str
+    statements: tuple[str, ...]
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(
+        version=1,
+        description="Covering index for the spending events lookups",
+        statements=(
+            """
+            CREATE INDEX IF NOT EXISTS idx_spending_events_customer_billing_end
+            ON spending_events (customer_id, billing_end DESC, plan_name, billing_start, amount_due)
+            """,
+        ),
+    ),
+    Migration(
+        version=2,
+        description="Unique index on the electricity plan names",
+        statements=(
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_electricity_plans_plan_name
+            ON electricity_plans (plan_name)
+            """,
+        ),
+    ),
+    Migration(
+        version=3,
+        description="Tariff columns on the electricity plans",
+        statements=(
+            "ALTER TABLE electricity_plans ADD COLUMN day_rate REAL",
+            "ALTER TABLE electricity_plans ADD COLUMN night_rate REAL",
+            "ALTER TABLE electricity_plans ADD COLUMN standing_charge REAL",
+            "UPDATE electricity_plans SET day_rate = 0.20, night_rate = 0.20, standing_charge = 0.40 WHERE plan_name = 'Standard Plan'",
+            "UPDATE electricity_plans SET day_rate = 0.23, night_rate = 0.23, standing_charge = 0.35 WHERE plan_name = 'Eco Plan'",
+            "UPDATE electricity_plans SET day_rate = 0.26, night_rate = 0.12, standing_charge = 0.45 WHERE plan_name = 'Night Plan'",
+        ),
+    ),
+    Migration(
+        version=4,
+        description="Add event_id to the spending events index for keyset pagination",
+        statements=(
+            "DROP INDEX IF EXISTS idx_spending_events_customer_billing_end",
+            """
+            CREATE INDEX IF NOT EXISTS idx_spending_events_customer_billing_end_event
+            ON spending_events (customer_id, billing_end DESC, event_id DESC, plan_name, billing_start, amount_due)
+            """,
+        ),
+    ),
+    Migration(
+        version=5,
+        description="Normalized customer email column with a unique index",
+        statements=(
+            "ALTER TABLE customers ADD COLUMN email_normalized TEXT",
+            f"UPDATE customers SET email_normalized = {NORMALIZED_EMAIL_SQL.format(column='email')}",
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_customers_email_normalized
+            ON customers (email_normalized)
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS customers_email_normalized_insert AFTER INSERT ON customers
+            WHEN NEW.email_normalized IS NOT {NORMALIZED_EMAIL_SQL.format(column="NEW.email")}
+            BEGIN
+                UPDATE customers SET email_normalized = {NORMALIZED_EMAIL_SQL.format(column="NEW.email")}
+                WHERE customer_id = NEW.customer_id;
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS customers_email_normalized_update AFTER UPDATE OF email ON customers
+            BEGIN
+                UPDATE customers SET email_normalized = {NORMALIZED_EMAIL_SQL.format(column="NEW.email")}
+                WHERE customer_id = NEW.customer_id;
+            END
+            """,
+        ),
+    ),
+)
+
+
+class QueryPlanError(Exception):
+    """Raised when a tool query would scan a whole table or sort in a temporary b-tree."""
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Return the schema version stored in the database."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def apply_migrations(conn: sqlite3.Connection, migrations: tuple[Migration, ...] = MIGRATIONS) -> int:
+    """Apply every pending migration and return the resulting schema version.
+
+    A migration that fails is rolled back entirely, its schema changes included, and the
+    database stays at the previous version.
+    """
+    current_version = get_schema_version(conn)
+    # The implicit transactions of the sqlite3 module only cover DML, so DDL statements
+    # would be committed one by one: each migration gets an explicit transaction instead.
+    # Setting isolation_level to None commits any transaction the caller left open.
+    isolation_level = conn.isolation_level
+    conn.isolation_level = None
+
+    try:
+        for migration in sorted(migrations, key=lambda m: m.version):
+            if migration.version <= current_version:
+                continue
+            conn.execute("BEGIN")
+            try:
+                for statement in migration.statements:
+                    conn.execute(statement)
+                # PRAGMA does not accept bound parameters
+                conn.execute(f"PRAGMA user_version = {migration.version:d}")
+                conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                logging.error(f"Migration {migration.version} ({migration.description}) failed: {e}")
+                raise
+            current_version = migration.version
+            logging.info(f"Applied migration {migration.version}: {migration.description}")
+    finally:
+        conn.isolation_level = isolation_level
+
+    return current_version
+
+
+def explain_query_plan(conn: sqlite3.Connection, query: str, params: tuple = ()) -> list[str]:
+    """Return the EXPLAIN QUERY PLAN detail lines for a query."""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+
+
+def check_query_plans(conn: sqlite3.Connection) -> dict[str, list[str]]:
+    """Check that no tool query does a full table scan or a temporary sort.
+
+    Returns the plan of every tool query and raises ``QueryPlanError`` listing the
+    offending queries otherwise.
+    """
+    plans = {}
+    violations = []
+
+    for label, (query, params, allow_scan) in tool_query_shapes().items():
+        plan = explain_query_plan(conn, query, params)
+        plans[label] = plan
+        for detail in plan:
+            if (detail.startswith("SCAN") and not allow_scan) or "TEMP B-TREE" in detail:
+                violations.append(f"{label}: {detail}")
+
+    if violations:
+        raise QueryPlanError("Inefficient tool query plans:\n" + "\n".join(violations))
+
+    return plans
@@ -0,0 +1,157 @@
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from src.db.connection import PoolConfig, get_pool, open_connection
+from src.db.queries import PLAN_CATALOG_QUERY
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PlanCatalogSnapshot:
+    """Immutable view of the electricity_plans table at a given point in time."""
+
+    plan_names: tuple[str, ...]
+    plans: MappingProxyType  # plan_name -> read-only mapping of column -> value
+    data_version: int
+    generation: int
+    loaded_at: float
+
+    def get(self, plan_name: str) -> MappingProxyType | None:
+        return self.plans.get(plan_name)
+
+
+@dataclass(frozen=True)
+class PlanCatalogStats:
+    """Point-in-time snapshot of the catalog cache metrics."""
+
+    hits: int
+    misses: int
+    reloads: int
+    errors: int
+    generation: int
+
+
+class PlanCatalog:
+    """Process-wide, in-memory cache of the electricity plans.
+
+    Lookups are served from an immutable snapshot. At most once per
+    ``revalidate_interval`` seconds the catalog runs ``PRAGMA data_version`` on its own
+    connection, which changes whenever another connection commits to the database, and
+    reloads the table only when it did. ``invalidate()`` bumps the generation counter to
+    force a reload after in-process writes. When a reload fails the last known-good
+    snapshot keeps being served. On an ``immutable`` database ``data_version`` never
+    changes, so only ``invalidate()`` triggers a reload.
+    """
+
+    def __init__(self, config: PoolConfig, revalidate_interval: float = 1.0) -> None:
+        self.config = config
+        self.revalidate_interval = revalidate_interval
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._snapshot: PlanCatalogSnapshot | None = None
+        self._generation = 0
+        self._checked_at = 0.0
+        self._hits = 0
+        self._misses = 0
+        self._reloads = 0
+        self._errors = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = open_connection(self.config)
+        return self._conn
+
+    def _load(self, conn: sqlite3.Connection, data_version: int) -> PlanCatalogSnapshot:
+        cursor = conn.execute(PLAN_CATALOG_QUERY)
+        column_names = [description[0] for description in cursor.description]
+        plans = {}
+        for row in cursor.fetchall():
+            plan = MappingProxyType(dict(zip(column_names, row, strict=True)))
+            plans[plan["plan_name"]] = plan
+        return PlanCatalogSnapshot(
+            plan_names=tuple(plans),
+            plans=MappingProxyType(plans),
+            data_version=data_version,
+            generation=self._generation,
+            loaded_at=time.time(),
+        )
+
+    def snapshot(self) -> PlanCatalogSnapshot:
+        """Return the current catalog, revalidating it if the check interval elapsed."""
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if (
+            snapshot is not None
+            and snapshot.generation == self._generation
+            and now - self._checked_at < self.revalidate_interval
+        ):
+            self._hits += 1
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            try:
+                conn = self._connection()
+                data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+                self._checked_at = now
+                if (
+                    snapshot is not None
+                    and snapshot.generation == self._generation
+                    and snapshot.data_version == data_version
+                ):
+                    self._hits += 1
+                    return snapshot
+
+                self._misses += 1
+                self._snapshot = self._load(conn, data_version)
+                self._reloads += 1
+                return self._snapshot
+            except sqlite3.Error as e:
+                self._errors += 1
+                if snapshot is None:
+                    raise
+                logger.warning(f"Plan catalog reload failed, serving last known-good snapshot: {e}")
+                return snapshot
+
+    def invalidate(self) -> None:
+        """Force a reload on the next lookup (e.g. after this process changed the plans)."""
+        with self._lock:
+            self._generation += 1
+
+    def stats(self) -> PlanCatalogStats:
+        """Return the current cache metrics."""
+        return PlanCatalogStats(
+            hits=self._hits,
+            misses=self._misses,
+            reloads=self._reloads,
+            errors=self._errors,
+            generation=self._generation,
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_catalog: PlanCatalog | None = None
+_catalog_lock = threading.Lock()
+
+
+def get_plan_catalog() -> PlanCatalog:
+    """Return the process-wide plan catalog for the database served by the connection pool."""
+    global _catalog
+    config = get_pool().config
+    if _catalog is None or _catalog.config != config:
+        with _catalog_lock:
+            if _catalog is None or _catalog.config != config:
+                if _catalog is not None:
+                    _catalog.close()
+                _catalog = PlanCatalog(config)
+    return _catalog
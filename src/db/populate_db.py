@@ -1,24 +1,41 @@
+"""Create and populate the application database.
+
+Without arguments the demo dataset is loaded. Pass ``--customers`` to generate a
+load-sized synthetic dataset instead, e.g.:
+
+    python -m src.db.populate_db --db load.db --customers 100000 --months 24 --seed 7
+"""
+
+import argparse
 import logging
 import sqlite3
 
-from src.db.data_generators import populate_all_tables
+from src.db.connection import get_db_path
+from src.db.data_generators import (
+    DEFAULT_PLAN_MIX,
+    SyntheticDataConfig,
+    populate_all_tables,
+    populate_synthetic_data,
+)
 from src.db.db_schema import init_database
 
-# Database configurations
-DB_NAME = "data.db"
-
 
-def populate_database() -> None:
+def populate_database(db_path: str | None = None, synthetic: SyntheticDataConfig | None = None) -> None:
     """Main function to populate the demo database."""
+    conn = None
     try:
         # Initialize database with schema
-        conn = init_database(db_path=DB_NAME)
+        conn = init_database(db_path=db_path or get_db_path())
         if not conn:
             logging.error("Failed to initialize database")
             return
 
-        # Populate with sample data
-        populate_all_tables(connection=conn)
+        if synthetic is not None:
+            # Populate with a generated, load-sized dataset
+            populate_synthetic_data(conn=conn, config=synthetic)
+        else:
+            # Populate with sample data
+            populate_all_tables(connection=conn)
 
         logging.info("Database successfully populated!")
     except sqlite3.Error as e:
@@ -30,5 +47,44 @@ def populate_database() -> None:
             conn.close()
 
 
+def parse_plan_mix(value: str) -> dict[str, float]:
+    """Parse a plan mix such as ``"Standard Plan=0.5,Eco Plan=0.3,Night Plan=0.2"``."""
+    plan_mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        try:
+            plan_mix[name.strip()] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Invalid plan mix entry: {item!r}") from None
+    return plan_mix
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Create and populate the chatbot database.")
+    parser.add_argument("--db", default=None, help="Path to the SQLite database file (defaults to DB_PATH)")
+    parser.add_argument("--customers", type=int, default=None, help="Generate this many synthetic customers")
+    parser.add_argument("--months", type=int, default=12, help="Billing months generated per synthetic customer")
+    parser.add_argument(
+        "--plan-mix",
+        type=parse_plan_mix,
+        default=DEFAULT_PLAN_MIX,
+        help='Plan weights, e.g. "Standard Plan=0.5,Eco Plan=0.3,Night Plan=0.2"',
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the synthetic data")
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="Rows per executemany batch")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    populate_database()
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args()
+    synthetic = None
+    if args.customers is not None:
+        synthetic = SyntheticDataConfig(
+            customers=args.customers,
+            months=args.months,
+            plan_mix=args.plan_mix,
+            seed=args.seed,
+            chunk_size=args.chunk_size,
+        )
+    populate_database(db_path=args.db, synthetic=synthetic)
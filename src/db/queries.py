@@ -0,0 +1,112 @@
+"""SQL statements issued by the tool layer.
+
+Keeping them in one place lets the query-plan check in ``src.db.migrations`` verify
+exactly the statements the tools run.
+"""
+
+import string
+
+SPENDING_EVENTS_QUERY = (
+    "SELECT event_id, billing_start, billing_end, plan_name, amount_due FROM spending_events WHERE customer_id = ?"
+)
+PLAN_CATALOG_QUERY = "SELECT * FROM electricity_plans ORDER BY plan_id"
+CUSTOMER_BY_ID_QUERY = "SELECT customer_id, name, email FROM customers WHERE customer_id = ?"
+CUSTOMER_BY_EMAIL_QUERY = "SELECT customer_id, name, email FROM customers WHERE email_normalized = ?"
+# SQL counterpart of normalize_email(), used to maintain customers.email_normalized
+NORMALIZED_EMAIL_SQL = "lower(trim({column}, ' ' || char(9, 10, 13)))"
+# SQLite's lower() only folds ASCII letters
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+# Billing history for the plan cost simulator: (customer_id, plan_id, days, amount_due) rows
+SIMULATION_HISTORY_QUERY = """
+SELECT s.customer_id, p.plan_id, julianday(s.billing_end) - julianday(s.billing_start) + 1, s.amount_due
+FROM spending_events s JOIN electricity_plans p ON p.plan_name = s.plan_name
+WHERE s.customer_id = ?
+ORDER BY s.billing_end DESC
+LIMIT ?
+"""
+SIMULATION_BATCH_HISTORY_QUERY = """
+SELECT customer_id, plan_id, days, amount_due FROM (
+    SELECT s.customer_id, p.plan_id, julianday(s.billing_end) - julianday(s.billing_start) + 1 AS days,
+        s.amount_due, ROW_NUMBER() OVER (PARTITION BY s.customer_id ORDER BY s.billing_end DESC) AS period
+    FROM spending_events s JOIN electricity_plans p ON p.plan_name = s.plan_name
+    {where}
+)
+WHERE period <= ?
+"""
+
+
+def normalize_email(email: str) -> str:
+    """Normalize an email address the same way as the ``customers.email_normalized`` column."""
+    return email.strip(" \t\n\r").translate(_ASCII_LOWER)
+
+
+def build_spending_events_query(
+    plan_name: str | None = None,
+    billing_start: str | None = None,
+    billing_end: str | None = None,
+    after: tuple[str, int] | None = None,
+    limit: int | None = None,
+) -> tuple[str, list]:
+    """Build the spending events query for the given filters, newest billing period first.
+
+    ``after`` is the ``(billing_end, event_id)`` key of the last row of the previous page
+    (keyset pagination). Returns the SQL string and the list of extra parameters that
+    follow ``customer_id``.
+    """
+    query = SPENDING_EVENTS_QUERY
+    params = []
+
+    if plan_name:
+        query += " AND plan_name = ?"
+        params.append(plan_name)
+
+    if billing_start:
+        query += " AND billing_start >= ?"
+        params.append(billing_start)
+
+    if billing_end:
+        query += " AND billing_end <= ?"
+        params.append(billing_end)
+
+    if after:
+        query += " AND (billing_end, event_id) < (?, ?)"
+        params.extend(after)
+
+    query += " ORDER BY billing_end DESC, event_id DESC"
+
+    if limit:
+        query += " LIMIT ?"
+        params.append(limit)
+
+    return query, params
+
+
+def tool_query_shapes() -> dict[str, tuple[str, tuple, bool]]:
+    """Return every query shape issued by the tools.
+
+    Maps a label to ``(sql, sample_params, allow_scan)``. ``allow_scan`` marks queries
+    that legitimately read the whole table (e.g. loading the plan catalog).
+    """
+    shapes = {
+        "plan_catalog": (PLAN_CATALOG_QUERY, (), True),
+        "validate_customer[id]": (CUSTOMER_BY_ID_QUERY, (1,), False),
+        "validate_customer[email]": (CUSTOMER_BY_EMAIL_QUERY, ("alice.johnson@example.com",), False),
+    }
+    shapes["simulate_plan_costs"] = (SIMULATION_HISTORY_QUERY, (1, 12), False)
+    for plan_name in (None, "Standard Plan"):
+        for date_range in (None, ("2024-01-01", "2024-06-30")):
+            for after in (None, ("2024-06-30", 6)):
+                query, params = build_spending_events_query(
+                    plan_name=plan_name,
+                    billing_start=date_range and date_range[0],
+                    billing_end=date_range and date_range[1],
+                    after=after,
+                    limit=25,
+                )
+                label = (
+                    f"fetch_spending_events[plan_name={plan_name is not None},"
+                    f"date_range={date_range is not None},cursor={after is not None}]"
+                )
+                shapes[label] = (query, (1, *params), False)
+    return shapes
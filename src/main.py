@@ -1,12 +1,13 @@
-import json
 import logging
 import os
 import sys
 
 from colorama import Fore, init
-from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.messages import HumanMessage
 
-from src.core.chatbot import ChatBot
+from src.core.chatbot import ChatSession
+from src.core.streaming import ReplyStream
+from src.core.transcripts import get_transcript_writer
 
 if __name__ == "__main__":
     init(autoreset=True)
@@ -17,78 +18,54 @@ if __name__ == "__main__":
         logging.info("If the browser doesn't open automatically, go to http://localhost:8501")
         # Use the simple streamlit command
         os.system("streamlit run src/cli/streamlit_app.py")
+    elif "--serve" in sys.argv:
+        # HTTP server for many concurrent conversations (see src/server.py)
+        from src.server import main as serve
+
+        serve()
     else:
         # Terminal-based chat interface
-        chatbot = ChatBot()
-        chatbot.build_graph()
+        chatbot = ChatSession()
+        transcripts = get_transcript_writer()
 
         logging.info("\n=== Welcome to the Electricity Chatbot ===\n")
         logging.info("You can ask about your electricity bills or get plan recommendations.")
         logging.info("For billing inquiries, you'll need to identify yourself with your customer ID or email.")
         logging.info("\nChatbot initialized. Type 'exit' to end the chat.")
 
+        def log_update(s: dict) -> None:
+            logging.info("-" * 50)
+            logging.info(Fore.LIGHTMAGENTA_EX + f"Internal graph message: {s}")
+
         while True:
             user_input = input("User: ")
             if user_input.lower() == "exit":
-                logging.info("Chatbot session ended.")
+                logging.info(f"Chatbot session ended. Transcript: {transcripts.path(chatbot.thread_id)}")
                 break
 
-            for s in chatbot.graph.stream(
+            # Print the reply as it is generated
+            reply_stream = ReplyStream(
+                chatbot.graph,
                 {"messages": [HumanMessage(content=user_input, name="user")]},
                 config=chatbot.config,
-            ):
-                if "__end__" not in s:
-                    logging.info("-" * 50)
-                    logging.info(Fore.LIGHTMAGENTA_EX + f"Internal graph message: {s}")
-
-            # Get the checkpoint data
-            checkpoint = chatbot.checkpoint_saver.get(chatbot.config)
-            timestamp = checkpoint["ts"].split(".")[0]
-            timestamp = timestamp.replace(":", "-")  # windows does not allow colons in file names
-
-            # Create a simple, human-readable checkpoint format
-            readable_checkpoint = {"thread_id": chatbot.thread_id, "timestamp": timestamp, "conversation": []}
-
-            # Get customer_id if available in state
-            state = chatbot.graph.get_state(config=chatbot.config)
-            if "customer_id" in state.values:
-                readable_checkpoint["customer_id"] = state.values["customer_id"]
-
-            # Extract just the messages in a clean format
-            if "messages" in checkpoint["channel_values"]:
-                messages = checkpoint["channel_values"]["messages"]
-                for msg in messages:
-                    # Check the type of message object and handle accordingly
-                    if isinstance(msg, HumanMessage):
-                        role = "user"
-                        content = msg.content
-                    elif isinstance(msg, AIMessage):
-                        role = "assistant"
-                        content = msg.content
-                    elif isinstance(msg, dict):
-                        # Fallback for dictionary-style messages
-                        msg_type = msg.get("type", "")
-                        role = "user" if msg_type == "HumanMessage" else "assistant"
-                        content = msg.get("content", "")
-                    else:
-                        # Last resort fallback
-                        role = "unknown"
-                        content = str(msg)
-
-                    readable_checkpoint["conversation"].append({"role": role, "content": content})
-
-            # Save to file with nice formatting
-            chatbot.checkpoint_file = os.path.join("checkpoints", f"{timestamp}.json")
-            with open(chatbot.checkpoint_file, "w", encoding="utf-8") as f:
-                json.dump(readable_checkpoint, f, ensure_ascii=False, indent=2)
-
+                on_update=log_update,
+            )
             try:
-                bot_reply = chatbot.graph.get_state(config=chatbot.config).values["messages"][-1].content
-                logging.info("\n")
-                logging.info("-" * 50)
-                logging.info(Fore.CYAN + f"Chatbot: {bot_reply}")
-                logging.info("-" * 50)
-                logging.info("\n")
+                print(Fore.CYAN + "Chatbot: ", end="", flush=True)
+                for text in reply_stream:
+                    print(Fore.CYAN + text, end="", flush=True)
+                print("\n")
             except Exception as e:
+                print()
                 logging.error(f"Error getting bot reply: {e}")
                 logging.info("Continuing conversation...")
+                continue
+
+            # Append only this turn's messages; the readable JSON is built on demand
+            # (python -m src.core.transcripts <thread_id>)
+            transcripts.append(
+                chatbot.thread_id,
+                [HumanMessage(content=user_input, name="user"), *reply_stream.messages],
+                customer_id=reply_stream.values.get("customer_id"),
+                summary=reply_stream.values.get("summary"),
+            )
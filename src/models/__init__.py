@@ -1,8 +1,26 @@
+from src.models.fake_model import FakeChatModel
+from src.models.hedging import HedgeConfig, HedgedChatModel, ModelTimeoutError, get_hedge_tracker
+from src.models.model_config import ModelSelection, load_model_selections
 from src.models.model_factory import ModelFactory
-from src.models.model_names import ModelName, ModelProvider
+from src.models.model_names import ModelName, ModelProvider, parse_model_chain, parse_model_spec
+from src.models.registry import ModelRegistry, get_model_registry
+from src.models.response_cache import SqliteResponseCache, get_response_cache
 
 __all__ = [
+    "FakeChatModel",
+    "HedgeConfig",
+    "HedgedChatModel",
     "ModelFactory",
     "ModelName",
     "ModelProvider",
+    "ModelRegistry",
+    "ModelSelection",
+    "ModelTimeoutError",
+    "SqliteResponseCache",
+    "get_hedge_tracker",
+    "get_model_registry",
+    "get_response_cache",
+    "load_model_selections",
+    "parse_model_chain",
+    "parse_model_spec",
 ]
@@ -0,0 +1,292 @@
+"""Offline chat model for benchmarks, load tests and CI.
+
+``FakeChatModel`` needs no network access. It answers either from a script (a list of
+replies played in order) or with a few rules that drive the assistants of the graph
+through their usual flows: the primary assistant hands billing and plan questions over,
+the specialized assistants validate the customer, call their tools, summarize the result
+and escalate requests outside their scope. The rules only look at the bound tool names,
+so they work with any prompt.
+
+The time to first token is drawn from a log-normal distribution and each output token
+takes ``time_per_token``; the reported output token count is drawn from a normal
+distribution. Both are configured with the ``FAKE_MODEL_*`` environment variables or
+the model parameters (e.g. ``params = { ttft = 0.05 }`` in ``models.toml``).
+"""
+
+import asyncio
+import itertools
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from collections.abc import AsyncIterator, Iterator
+from typing import Any
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.language_models.chat_models import agenerate_from_stream, generate_from_stream
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import PrivateAttr
+
+HANDOFFS = ("ToSpendingAssistant", "ToRecommendationAssistant")
+SPENDING_WORDS = (
+    "bill",
+    "spend",
+    "spent",
+    "spending",
+    "invoice",
+    "charge",
+    "cost me",
+    "paid",
+    "pay",
+    "usage",
+    "consum",
+)
+PLAN_WORDS = ("plan", "tariff", "recommend", "cheaper", "switch", "save", "saving", "best deal")
+CUSTOMER_ID = re.compile(r"\b(?:customer(?:\s*id)?|id|account|number)\b\D{0,10}(\d+)|^\s*(\d+)\s*$", re.IGNORECASE)
+EMAIL = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+")
+PLAN_NAME = re.compile(r"\b([A-Z][a-z]+ Plan)\b")
+VALIDATED_ID = re.compile(r"customer_id=(\d+)")
+
+
+def _text(message: BaseMessage) -> str:
+    if isinstance(message.content, str):
+        return message.content
+    return " ".join(block.get("text", "") for block in message.content if isinstance(block, dict))
+
+
+def _has_any(text: str, words: tuple[str, ...]) -> bool:
+    return any(word in text for word in words)
+
+
+def _tool_call(name: str, **args: object) -> dict:
+    return {"name": name, "args": args, "id": f"call_{uuid.uuid4().hex[:24]}", "type": "tool_call"}
+
+
+def _validated_id(messages: list[BaseMessage]) -> int | None:
+    """Customer id from the context system message or the last successful ``validate_customer`` result."""
+    for message in reversed(messages):
+        if isinstance(message, SystemMessage):
+            match = VALIDATED_ID.search(_text(message))
+            if match:
+                return int(match.group(1))
+        if isinstance(message, ToolMessage) and message.name == "validate_customer":
+            try:
+                result = json.loads(message.content)
+            except (TypeError, ValueError):
+                continue
+            if isinstance(result, dict) and result.get("valid"):
+                return result.get("customer_id")
+    return None
+
+
+def rule_based_reply(messages: list[BaseMessage], tool_names: frozenset[str]) -> tuple[str, list[dict]]:
+    """Return the content and tool calls an assistant with ``tool_names`` bound would plausibly produce."""
+    human = next((m for m in reversed(messages) if isinstance(m, HumanMessage)), None)
+    request = _text(human) if human else ""
+    lowered = request.lower()
+    last = messages[-1] if messages else None
+
+    if not tool_names:
+        # Summarizer and other plain prompts
+        return f"The customer asked about: {request[:300].strip() or 'nothing yet'}.", []
+
+    called = {tc["id"]: tc["name"] for m in messages if isinstance(m, AIMessage) for tc in m.tool_calls}
+    last_tool = called.get(last.tool_call_id) if isinstance(last, ToolMessage) else None
+
+    if "ToSpendingAssistant" in tool_names:
+        # Back from an escalation, the request is routed again like a new one
+        if last_tool is not None and last_tool != "CompleteOrEscalate":
+            return "Is there anything else I can help you with regarding your bills or electricity plans?", []
+        if _has_any(lowered, PLAN_WORDS):
+            return "", [_tool_call("ToRecommendationAssistant", request=request)]
+        if _has_any(lowered, SPENDING_WORDS):
+            return "", [_tool_call("ToSpendingAssistant", request=request)]
+        return (
+            "Hello! I can help you review your electricity spending or find a better plan. What would you like to do?",
+            [],
+        )
+
+    if last_tool == "validate_customer":
+        customer_id = _validated_id([last])
+        if customer_id is None:
+            return "I could not find a customer with these details. Could you check your customer ID or email?", []
+        if "fetch_spending_events" in tool_names:
+            return "", [_tool_call("fetch_spending_events", customer_id=customer_id, months=3)]
+        if "simulate_plan_costs" in tool_names:
+            return "", [_tool_call("simulate_plan_costs", customer_id=customer_id)]
+    if last_tool is not None and last_tool not in HANDOFFS:
+        return f"Here is what I found:\n{_text(last)[:500]}", []
+
+    # A new request for a specialized assistant
+    spending = "fetch_spending_events" in tool_names
+    out_of_scope = (
+        _has_any(lowered, PLAN_WORDS) and not _has_any(lowered, SPENDING_WORDS)
+        if spending
+        else (_has_any(lowered, SPENDING_WORDS) and not _has_any(lowered, PLAN_WORDS))
+    )
+    if out_of_scope and "CompleteOrEscalate" in tool_names:
+        return "", [_tool_call("CompleteOrEscalate", cancel=True, reason="The user asked for something else.")]
+
+    plan_name = PLAN_NAME.search(request)
+    if plan_name and "fetch_plan_information" in tool_names:
+        return "", [_tool_call("fetch_plan_information", plan_name=plan_name.group(1))]
+    if "list_supported_plans" in tool_names and _has_any(lowered, ("list", "which plans", "what plans", "available")):
+        return "", [_tool_call("list_supported_plans")]
+
+    customer_id = _validated_id(messages)
+    if customer_id is not None:
+        if spending:
+            return "", [_tool_call("fetch_spending_events", customer_id=customer_id, months=3)]
+        if "simulate_plan_costs" in tool_names:
+            return "", [_tool_call("simulate_plan_costs", customer_id=customer_id)]
+
+    if "validate_customer" in tool_names:
+        match = CUSTOMER_ID.search(request)
+        if match:
+            return "", [_tool_call("validate_customer", customer_id=int(match.group(1) or match.group(2)))]
+        email = EMAIL.search(request)
+        if email:
+            return "", [_tool_call("validate_customer", email=email.group(0))]
+        return "Sure. To look into this, could you give me your customer ID or the email of your account?", []
+    return "How can I help you further?", []
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model answering from ``responses`` or with ``rule_based_reply``, with simulated latency.
+
+    ``responses`` items are strings or ``{"content": ..., "tool_calls": [{"name": ..., "args": ...}]}``
+    dicts, played in order and repeated once exhausted.
+    """
+
+    responses: list[str | dict] | None = None
+    ttft: float = 0.3  # median time to first token, in seconds
+    ttft_sigma: float = 0.3  # log-normal spread of the time to first token
+    time_per_token: float = 0.01
+    output_tokens: int = 60  # mean output token count reported in usage_metadata
+    output_tokens_std: float = 20.0
+    seed: int | None = None
+    tool_names: frozenset[str] = frozenset()
+
+    _random: random.Random = PrivateAttr()
+    _random_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _turn: Iterator[int] = PrivateAttr(default_factory=itertools.count)
+
+    def model_post_init(self, __context: object) -> None:
+        self._random = random.Random(self.seed)
+
+    @classmethod
+    def from_env(cls, **params: object) -> "FakeChatModel":
+        """Create a model configured by the ``FAKE_MODEL_*`` environment variables; ``params`` take precedence."""
+        seed = os.getenv("FAKE_MODEL_SEED")
+        defaults = {
+            "ttft": float(os.getenv("FAKE_MODEL_TTFT", "0.3")),
+            "ttft_sigma": float(os.getenv("FAKE_MODEL_TTFT_SIGMA", "0.3")),
+            "time_per_token": float(os.getenv("FAKE_MODEL_TIME_PER_TOKEN", "0.01")),
+            "output_tokens": int(os.getenv("FAKE_MODEL_OUTPUT_TOKENS", "60")),
+            "output_tokens_std": float(os.getenv("FAKE_MODEL_OUTPUT_TOKENS_STD", "20")),
+            "seed": int(seed) if seed else None,
+        }
+        return cls(**{**defaults, **params})
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    @property
+    def _identifying_params(self) -> dict[str, Any]:
+        return {"responses": self.responses, "tools": sorted(self.tool_names)}
+
+    def bind_tools(self, tools: list, **kwargs: object) -> "FakeChatModel":
+        names = frozenset(convert_to_openai_tool(tool)["function"]["name"] for tool in tools)
+        return self.model_copy(update={"tool_names": names})
+
+    def _reply(self, messages: list[BaseMessage]) -> tuple[str, list[dict]]:
+        if not self.responses:
+            return rule_based_reply(messages, self.tool_names)
+        item = self.responses[next(self._turn) % len(self.responses)]
+        if isinstance(item, str):
+            return item, []
+        tool_calls = [_tool_call(tc["name"], **tc.get("args", {})) for tc in item.get("tool_calls", [])]
+        return item.get("content", ""), tool_calls
+
+    def _plan(self, messages: list[BaseMessage]) -> tuple[list[ChatGenerationChunk], list[float]]:
+        """Return the chunks of the reply and the delay before each of them."""
+        content, tool_calls = self._reply(messages)
+        with self._random_lock:
+            ttft = self.ttft * math.exp(self._random.gauss(0.0, self.ttft_sigma)) if self.ttft > 0 else 0.0
+            output_tokens = max(1, round(self._random.gauss(self.output_tokens, self.output_tokens_std)))
+        input_tokens = count_tokens_approximately(messages)
+
+        pieces = re.findall(r"\s*\S+", content) or [""]
+        chunks = [ChatGenerationChunk(message=AIMessageChunk(content=piece)) for piece in pieces]
+        chunks[-1] = ChatGenerationChunk(
+            message=AIMessageChunk(
+                content=pieces[-1],
+                tool_call_chunks=[
+                    {"name": tc["name"], "args": json.dumps(tc["args"]), "id": tc["id"], "index": i}
+                    for i, tc in enumerate(tool_calls)
+                ],
+                usage_metadata={
+                    "input_tokens": input_tokens,
+                    "output_tokens": output_tokens,
+                    "total_tokens": input_tokens + output_tokens,
+                },
+                response_metadata={"model_name": "fake-rules" if not self.responses else "fake-scripted"},
+            )
+        )
+        # The simulated generation time is spread evenly over the chunks after the first one
+        per_chunk = self.time_per_token * output_tokens / max(len(chunks) - 1, 1)
+        delays = [ttft] + [per_chunk] * (len(chunks) - 1)
+        return chunks, delays
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: object,
+    ) -> Iterator[ChatGenerationChunk]:
+        chunks, delays = self._plan(messages)
+        for chunk, delay in zip(chunks, delays):
+            if delay > 0:
+                time.sleep(delay)
+            yield chunk
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: object,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        chunks, delays = self._plan(messages)
+        for chunk, delay in zip(chunks, delays):
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield chunk
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: object,
+    ) -> ChatResult:
+        return generate_from_stream(self._stream(messages, stop, **kwargs))
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: object,
+    ) -> ChatResult:
+        return await agenerate_from_stream(self._astream(messages, stop, **kwargs))
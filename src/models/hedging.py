@@ -0,0 +1,377 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Iterator
+from dataclasses import dataclass
+from typing import Any
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.language_models.chat_models import agenerate_from_stream, generate_from_stream
+from langchain_core.messages import AIMessageChunk, BaseMessage, BaseMessageChunk
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from pydantic import Field
+
+logger = logging.getLogger(__name__)
+
+# Inner models are called without the caller's callbacks, so only the winning attempt is streamed to the graph
+_NO_CALLBACKS = {"callbacks": []}
+
+
+@dataclass(frozen=True)
+class HedgeConfig:
+    """Deadline and hedging settings of a fallback chain."""
+
+    attempt_timeout: float = 30.0
+    hedge: bool = True
+    hedge_min_delay: float = 2.0
+
+    @classmethod
+    def from_env(cls) -> "HedgeConfig":
+        """Build the config from the ``MODEL_ATTEMPT_TIMEOUT`` and ``MODEL_HEDG*`` environment variables."""
+        return cls(
+            attempt_timeout=float(os.getenv("MODEL_ATTEMPT_TIMEOUT", "30")),
+            hedge=os.getenv("MODEL_HEDGING", "true").lower() == "true",
+            hedge_min_delay=float(os.getenv("MODEL_HEDGE_MIN_DELAY", "2.0")),
+        )
+
+
+class ModelTimeoutError(TimeoutError):
+    """Raised when no model of the chain produced a response before its deadline."""
+
+
+@dataclass(frozen=True)
+class ProviderStats:
+    """Point-in-time latency and outcome counters of one model of a fallback chain."""
+
+    name: str
+    calls: int
+    wins: int
+    errors: int
+    timeouts: int
+    hedges: int  # calls started as a hedge while an earlier model was still pending
+    cancelled: int  # calls abandoned because another model answered first
+    first_chunk_p50_s: float
+    first_chunk_p95_s: float
+
+
+class HedgeTracker:
+    """Per-provider latency samples and counters, shared by every hedged model of the process."""
+
+    def __init__(self, max_samples: int = 200) -> None:
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._samples: dict[str, deque[float]] = {}
+        self._counters: dict[str, dict[str, int]] = {}
+
+    def _counter(self, name: str) -> dict[str, int]:
+        counter = self._counters.get(name)
+        if counter is None:
+            counter = self._counters[name] = dict.fromkeys(
+                ("calls", "wins", "errors", "timeouts", "hedges", "cancelled"), 0
+            )
+            self._samples[name] = deque(maxlen=self.max_samples)
+        return counter
+
+    def increment(self, name: str, counter: str) -> None:
+        with self._lock:
+            self._counter(name)[counter] += 1
+
+    def record_first_chunk(self, name: str, seconds: float) -> None:
+        """Record a time to first chunk, or a lower bound of it for attempts that never got one."""
+        with self._lock:
+            self._counter(name)
+            self._samples[name].append(seconds)
+
+    def percentile(self, name: str, q: float, min_samples: int = 1) -> float | None:
+        """Return the ``q`` quantile of the time to first chunk, or ``None`` with too few samples."""
+        with self._lock:
+            samples = sorted(self._samples.get(name, ()))
+        if len(samples) < max(min_samples, 1):
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def stats(self) -> dict[str, ProviderStats]:
+        """Return the counters and latency percentiles of every provider seen so far."""
+        with self._lock:
+            names = list(self._counters)
+            counters = {name: dict(self._counters[name]) for name in names}
+        return {
+            name: ProviderStats(
+                name=name,
+                **counters[name],
+                first_chunk_p50_s=self.percentile(name, 0.50) or 0.0,
+                first_chunk_p95_s=self.percentile(name, 0.95) or 0.0,
+            )
+            for name in names
+        }
+
+
+_tracker = HedgeTracker()
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+
+
+def get_hedge_tracker() -> HedgeTracker:
+    """Return the process-wide provider latency tracker."""
+    return _tracker
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Return the background event loop that runs the attempts of sync calls."""
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="model-hedge", daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+async def _next_chunk(chunks: AsyncIterator[ChatGenerationChunk]) -> ChatGenerationChunk | None:
+    return await anext(chunks, None)
+
+
+@dataclass
+class _Attempt:
+    index: int
+    started_at: float
+    deadline: float
+    hedge_at: float | None
+    task: asyncio.Task | None = None
+
+    def abandon(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+
+
+class HedgedChatModel(BaseChatModel):
+    """Chat model that calls a chain of models with deadlines, fallbacks and optional hedging.
+
+    The first model is called first. If it has not produced its first chunk after the
+    ``hedge_percentile`` of its recent time-to-first-chunk (``hedge_min_delay`` until
+    ``min_samples`` were seen), the next model of the chain is started as a hedge. The
+    first model to produce a chunk wins and is streamed to the caller; the others are
+    cancelled. A model that fails or does not produce a chunk within ``attempt_timeout``
+    is abandoned and the next one is started. Errors after the first chunk propagate, and
+    so does a ``ModelTimeoutError`` when the winner stalls for ``attempt_timeout`` between
+    two chunks.
+
+    Attempts are asyncio tasks, so cancelling one aborts its request. Sync calls run the
+    same race on a background event loop.
+
+    ``bind_tools`` binds the tools to every model of the chain.
+    """
+
+    models: list[Any]
+    names: list[str]
+    attempt_timeout: float = 30.0
+    hedge: bool = True
+    hedge_percentile: float = 0.95
+    hedge_min_delay: float = 2.0
+    min_samples: int = 20
+    tracker: Any = Field(default_factory=get_hedge_tracker, exclude=True)
+
+    @property
+    def _llm_type(self) -> str:
+        return "hedged-chain"
+
+    @property
+    def _identifying_params(self) -> dict[str, Any]:
+        return {"names": self.names, "attempt_timeout": self.attempt_timeout, "hedge": self.hedge}
+
+    def bind_tools(self, tools: list, **kwargs: object) -> "HedgedChatModel":
+        return self.model_copy(update={"models": [model.bind_tools(tools, **kwargs) for model in self.models]})
+
+    def _hedge_delay(self, index: int) -> float | None:
+        if not self.hedge or index + 1 >= len(self.models):
+            return None
+        p = self.tracker.percentile(self.names[index], self.hedge_percentile, self.min_samples)
+        return p if p is not None else self.hedge_min_delay
+
+    def _new_attempt(self, index: int, hedged: bool) -> _Attempt:
+        now = time.monotonic()
+        delay = self._hedge_delay(index)
+        name = self.names[index]
+        self.tracker.increment(name, "calls")
+        if hedged:
+            self.tracker.increment(name, "hedges")
+            logger.info(f"Hedging with {name}: earlier model has not answered yet")
+        return _Attempt(
+            index=index,
+            started_at=now,
+            deadline=now + self.attempt_timeout,
+            hedge_at=now + delay if delay is not None else None,
+        )
+
+    def _next_wakeup(self, live: dict[int, _Attempt], next_index: int) -> float:
+        times = [attempt.deadline for attempt in live.values()]
+        if next_index < len(self.models):
+            times.extend(attempt.hedge_at for attempt in live.values() if attempt.hedge_at is not None)
+        return min(times)
+
+    def _expire(self, live: dict[int, _Attempt], next_index: int, now: float) -> tuple[list[int], bool]:
+        """Abandon timed-out attempts; return them and whether a hedge is due."""
+        expired = [index for index, attempt in live.items() if attempt.deadline <= now]
+        for index in expired:
+            attempt = live.pop(index)
+            attempt.abandon()
+            self.tracker.record_first_chunk(self.names[index], now - attempt.started_at)
+            self.tracker.increment(self.names[index], "timeouts")
+            logger.warning(f"{self.names[index]} did not answer within {self.attempt_timeout}s")
+        hedge_due = False
+        for attempt in live.values():
+            if attempt.hedge_at is not None and attempt.hedge_at <= now:
+                attempt.hedge_at = None
+                hedge_due = next_index < len(self.models)
+        return expired, hedge_due
+
+    def _finish_race(self, live: dict[int, _Attempt], winner: _Attempt) -> None:
+        now = time.monotonic()
+        self.tracker.increment(self.names[winner.index], "wins")
+        # The losers are sampled too, with the time they had waited: the percentile of the
+        # winners alone would be biased low, and so would the hedge delay
+        for index, attempt in live.items():
+            self.tracker.record_first_chunk(self.names[index], now - attempt.started_at)
+            if index != winner.index:
+                attempt.abandon()
+                self.tracker.increment(self.names[index], "cancelled")
+
+    def _no_winner(self, last_error: BaseException | None) -> Exception:
+        if last_error is not None and not isinstance(last_error, ModelTimeoutError):
+            return last_error if isinstance(last_error, Exception) else RuntimeError(str(last_error))
+        return ModelTimeoutError(f"No model of {self.names} answered within {self.attempt_timeout}s")
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: object,
+    ) -> Iterator[ChatGenerationChunk]:
+        # A worker thread per attempt could only stop a losing attempt at its next chunk
+        loop = _get_loop()
+        chunks = self._astream(messages, stop=stop, **kwargs)
+        try:
+            while (chunk := asyncio.run_coroutine_threadsafe(_next_chunk(chunks), loop).result()) is not None:
+                yield chunk
+        finally:
+            asyncio.run_coroutine_threadsafe(chunks.aclose(), loop).result()
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: object,
+    ) -> ChatResult:
+        return generate_from_stream(self._stream(messages, stop=stop, run_manager=run_manager, **kwargs))
+
+    async def _apump(
+        self,
+        attempt: _Attempt,
+        messages: list[BaseMessage],
+        stop: list[str] | None,
+        events: asyncio.Queue,
+        kwargs: dict,
+    ) -> None:
+        try:
+            async for chunk in self.models[attempt.index].astream(messages, config=_NO_CALLBACKS, stop=stop, **kwargs):
+                await events.put((attempt.index, "chunk", chunk))
+            await events.put((attempt.index, "done", None))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await events.put((attempt.index, "error", e))
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: object,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        events: asyncio.Queue = asyncio.Queue()
+        live: dict[int, _Attempt] = {}
+        next_index = 0
+        last_error: BaseException | None = None
+
+        def launch(hedged: bool) -> None:
+            nonlocal next_index
+            attempt = self._new_attempt(next_index, hedged)
+            attempt.task = asyncio.ensure_future(self._apump(attempt, messages, stop, events, kwargs))
+            live[attempt.index] = attempt
+            next_index += 1
+
+        launch(hedged=False)
+        winner: _Attempt | None = None
+        first_chunk = None
+        try:
+            while winner is None:
+                if not live:
+                    if next_index >= len(self.models):
+                        raise self._no_winner(last_error)
+                    launch(hedged=False)
+                    continue
+                timeout = self._next_wakeup(live, next_index) - time.monotonic()
+                try:
+                    index, kind, payload = await asyncio.wait_for(events.get(), timeout=max(timeout, 0.0))
+                except TimeoutError:
+                    expired, hedge_due = self._expire(live, next_index, time.monotonic())
+                    if expired:
+                        last_error = ModelTimeoutError()
+                    if hedge_due:
+                        launch(hedged=True)
+                    continue
+                if index not in live:
+                    continue
+                if kind == "chunk":
+                    winner, first_chunk = live[index], payload
+                else:
+                    live.pop(index)
+                    self.tracker.increment(self.names[index], "errors")
+                    last_error = payload if kind == "error" else ValueError("Empty response")
+                    logger.warning(f"{self.names[index]} failed, falling back: {last_error!r}")
+
+            self._finish_race(live, winner)
+            yield self._generation_chunk(first_chunk)
+            while True:
+                try:
+                    index, kind, payload = await asyncio.wait_for(events.get(), timeout=self.attempt_timeout)
+                except TimeoutError:
+                    name = self.names[winner.index]
+                    self.tracker.increment(name, "timeouts")
+                    raise ModelTimeoutError(f"{name} stalled for {self.attempt_timeout}s during its reply") from None
+                if index != winner.index:
+                    continue
+                if kind == "chunk":
+                    yield self._generation_chunk(payload)
+                elif kind == "error":
+                    raise payload
+                else:
+                    break
+        finally:
+            for attempt in live.values():
+                attempt.abandon()
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: object,
+    ) -> ChatResult:
+        return await agenerate_from_stream(self._astream(messages, stop=stop, run_manager=run_manager, **kwargs))
+
+    @staticmethod
+    def _generation_chunk(chunk: BaseMessage) -> ChatGenerationChunk:
+        # Models without native streaming yield their whole AIMessage as the only chunk
+        if not isinstance(chunk, BaseMessageChunk):
+            chunk = AIMessageChunk(**chunk.model_dump(exclude={"type"}))
+        # Let the outer run assign the message id, so all chunks of the reply share it
+        chunk.id = None
+        return ChatGenerationChunk(message=chunk)
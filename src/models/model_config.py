@@ -0,0 +1,85 @@
+"""Per-assistant model selection.
+
+Each assistant of the graph gets its own model (or fallback chain), read from a TOML
+file and overridable per assistant from the environment:
+
+    [default]
+    chain = ["openai:gpt-4o-mini"]
+
+    [assistants.primary_assistant]
+    chain = ["openai:gpt-4o-mini"]
+    params = { temperature = 0 }
+
+    [assistants.spending_assistant]
+    chain = ["openai:gpt-4o", "anthropic:claude-3-5-sonnet"]
+
+``MODEL_CONFIG`` points to the file (``models.toml`` by default, optional).
+``MODEL_<ASSISTANT>`` (e.g. ``MODEL_SPENDING_ASSISTANT=openai:gpt-4o``) overrides the
+chain of one assistant and ``MODEL_CHAIN`` the default one.
+"""
+
+import logging
+import os
+import tomllib
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.models.model_names import ModelName, ModelProvider, parse_model_chain, parse_model_spec
+
+logger = logging.getLogger(__name__)
+
+ASSISTANTS = ("primary_assistant", "spending_assistant", "recommendation_assistant", "summarizer")
+DEFAULT_CHAIN = "openai:gpt-4o-mini"
+
+
+@dataclass(frozen=True)
+class ModelSelection:
+    """Model chain and extra model parameters chosen for one assistant."""
+
+    chain: tuple[tuple[ModelProvider, ModelName | None], ...]
+    params: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def label(self) -> str:
+        """Readable description, e.g. ``openai:gpt-4o-mini,anthropic:claude-3-5-sonnet``."""
+        return ",".join(f"{provider.value}:{name.value if name else 'default'}" for provider, name in self.chain)
+
+
+def _selection(section: dict, fallback: ModelSelection) -> ModelSelection:
+    chain = section.get("chain")
+    if isinstance(chain, str):
+        chain = [chain]
+    return ModelSelection(
+        chain=tuple(parse_model_spec(spec) for spec in chain) if chain else fallback.chain,
+        params=dict(section.get("params", fallback.params)),
+    )
+
+
+def load_model_selections(path: str | None = None) -> dict[str, ModelSelection]:
+    """Return the model selection of every assistant in ``ASSISTANTS``."""
+    path = path or os.getenv("MODEL_CONFIG", "models.toml")
+    config: dict = {}
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            config = tomllib.load(f)
+    elif os.getenv("MODEL_CONFIG"):
+        raise FileNotFoundError(f"Model configuration file not found: {path}")
+
+    default = _selection(config.get("default", {}), ModelSelection(chain=tuple(parse_model_chain(DEFAULT_CHAIN))))
+    if os.getenv("MODEL_CHAIN"):
+        default = ModelSelection(chain=tuple(parse_model_chain(os.environ["MODEL_CHAIN"])), params=default.params)
+
+    sections = config.get("assistants", {})
+    unknown = set(sections) - set(ASSISTANTS)
+    if unknown:
+        raise ValueError(f"Unknown assistants in {path}: {sorted(unknown)} (expected one of {ASSISTANTS})")
+
+    selections = {}
+    for assistant in ASSISTANTS:
+        selection = _selection(sections.get(assistant, {}), default)
+        override = os.getenv(f"MODEL_{assistant.upper()}")
+        if override:
+            selection = ModelSelection(chain=tuple(parse_model_chain(override)), params=selection.params)
+        selections[assistant] = selection
+        logger.info(f"Model for {assistant}: {selection.label}")
+    return selections
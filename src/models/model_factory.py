@@ -1,63 +1,148 @@
 import os
+from collections.abc import Callable
 
-from langchain.callbacks.manager import CallbackManager
-from langchain.callbacks.tracers.langchain import LangChainTracer
-from langchain_anthropic import ChatAnthropic
+from langchain_core.caches import BaseCache
+from langchain_core.callbacks import CallbackManager
 from langchain_core.language_models import BaseChatModel
-from langchain_deepseek import ChatDeepSeek
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_ollama import ChatOllama
-from langchain_openai import ChatOpenAI
+from langchain_core.tracers.langchain import LangChainTracer
 
+from src.models.fake_model import FakeChatModel
+from src.models.hedging import HedgeConfig, HedgedChatModel
+from src.models.model_config import ModelSelection
 from src.models.model_names import ModelName, ModelProvider
+from src.models.registry import get_model_registry
+from src.models.response_cache import get_response_cache
+
+# Provider packages are imported on the first model created for that provider, so a
+# process only pays for the providers it uses (see ``python -m src.benchmarks.startup``).
 
 
 class ModelFactory:
     """Factory for creating and managing language model instances."""
 
-    def __init__(self) -> None:
-        """Initialize the model factory."""
+    def __init__(self, cache: BaseCache | None = None) -> None:
+        """Initialize the model factory.
+
+        Models are created with ``cache`` as their response cache. Without one, the shared
+        SQLite response cache is used when ``ENABLE_MODEL_CACHE`` is true.
+        """
+        if cache is None and os.getenv("ENABLE_MODEL_CACHE", "false").lower() == "true":
+            cache = get_response_cache()
+        self.cache = cache
         self.callbacks: CallbackManager = CallbackManager([])
-        self.tracer: LangChainTracer = None
+        self.tracer: LangChainTracer | None = None
         if os.getenv("ENABLE_LANGSMITH_TRACKING", "false").lower() == "true":
             self.tracer = LangChainTracer(project_name=os.getenv("LANGCHAIN_PROJECT"))
             self.callbacks = CallbackManager([self.tracer])
-        self._providers: dict[ModelProvider, callable[[ModelName], BaseChatModel]] = {
+        self._providers: dict[ModelProvider, Callable[..., BaseChatModel]] = {
             ModelProvider.OPENAI: self._create_openai_model,
             ModelProvider.ANTHROPIC: self._create_anthropic_model,
             ModelProvider.DEEPSEEK: self._create_deepseek_model,
             ModelProvider.OLLAMA: self._create_ollama_model,
             ModelProvider.GEMINI: self._create_gemini_model,
+            ModelProvider.FAKE: self._create_fake_model,
         }
 
-    def get_model(self, model: ModelProvider, model_name: ModelName | None) -> BaseChatModel:
-        """Get a model instance based on provider."""
+    def get_model(self, model: ModelProvider, model_name: ModelName | None, **params: object) -> BaseChatModel:
+        """Get a model instance based on provider.
+
+        Instances are shared process-wide through the model registry: every factory asking
+        for the same provider, model and parameters gets the same client.
+        """
         create_fn = self._providers.get(model)
         if create_fn is None:
             raise ValueError(f"Unsupported model provider: {model}")
-        return create_fn(model_name)
+        key = (
+            model.value,
+            model_name.value if model_name else None,
+            repr(sorted(params.items())),
+            self.cache,
+            self.tracer.project_name if self.tracer else None,
+        )
+        return get_model_registry().get_or_create(key, lambda: create_fn(model_name, **params))
+
+    def get_model_chain(
+        self,
+        chain: list[tuple[ModelProvider, ModelName | None]],
+        config: HedgeConfig | None = None,
+        **params: object,
+    ) -> BaseChatModel:
+        """Get a model that calls ``chain`` in order, with deadlines, fallbacks and hedging."""
+        if not chain:
+            raise ValueError("The model chain is empty")
+        config = config or HedgeConfig.from_env()
+        return HedgedChatModel(
+            models=[self.get_model(provider, model_name, **params) for provider, model_name in chain],
+            names=[
+                f"{provider.value}:{model_name.value if model_name else 'default'}" for provider, model_name in chain
+            ],
+            attempt_timeout=config.attempt_timeout,
+            hedge=config.hedge,
+            hedge_min_delay=config.hedge_min_delay,
+        )
+
+    def get_selected_model(self, selection: ModelSelection) -> BaseChatModel:
+        """Get the model of an assistant's selection: a single model, or a fallback chain."""
+        if len(selection.chain) == 1:
+            provider, model_name = selection.chain[0]
+            return self.get_model(provider, model_name, **selection.params)
+        return self.get_model_chain(list(selection.chain), **selection.params)
 
-    def _create_openai_model(self, model_name: ModelName) -> BaseChatModel:
+    def _create_openai_model(self, model_name: ModelName, **params: object) -> BaseChatModel:
+        from langchain_openai import ChatOpenAI
+
+        http_client, http_async_client = get_model_registry().http_clients(ModelProvider.OPENAI.value)
         return ChatOpenAI(
-            model=model_name.value if model_name else ModelName.GPT_4O_MINI.value, callbacks=self.callbacks
+            model=model_name.value if model_name else ModelName.GPT_4O_MINI.value,
+            http_client=http_client,
+            http_async_client=http_async_client,
+            callbacks=self.callbacks,
+            cache=self.cache,
+            **params,
         )
 
-    def _create_anthropic_model(self, model_name: ModelName) -> BaseChatModel:
+    def _create_anthropic_model(self, model_name: ModelName, **params: object) -> BaseChatModel:
+        from langchain_anthropic import ChatAnthropic
+
         return ChatAnthropic(
-            model=model_name.value if model_name else ModelName.CLAUDE_3_5_SONNET.value, callbacks=self.callbacks
+            model=model_name.value if model_name else ModelName.CLAUDE_3_5_SONNET.value,
+            callbacks=self.callbacks,
+            cache=self.cache,
+            **params,
         )
 
-    def _create_deepseek_model(self, model_name: ModelName) -> BaseChatModel:
+    def _create_deepseek_model(self, model_name: ModelName, **params: object) -> BaseChatModel:
+        from langchain_deepseek import ChatDeepSeek
+
+        http_client, http_async_client = get_model_registry().http_clients(ModelProvider.DEEPSEEK.value)
         return ChatDeepSeek(
-            model=model_name.value if model_name else ModelName.DEEPSEEK_V3.value, callbacks=self.callbacks
+            model=model_name.value if model_name else ModelName.DEEPSEEK_V3.value,
+            http_client=http_client,
+            http_async_client=http_async_client,
+            callbacks=self.callbacks,
+            cache=self.cache,
+            **params,
         )
 
-    def _create_ollama_model(self, model_name: ModelName) -> BaseChatModel:
+    def _create_ollama_model(self, model_name: ModelName, **params: object) -> BaseChatModel:
+        from langchain_ollama import ChatOllama
+
         return ChatOllama(
-            model=model_name.value if model_name else ModelName.QWEN2_5_14B.value, callbacks=self.callbacks
+            model=model_name.value if model_name else ModelName.QWEN2_5_14B.value,
+            callbacks=self.callbacks,
+            cache=self.cache,
+            **params,
         )
 
-    def _create_gemini_model(self, model_name: ModelName) -> BaseChatModel:
+    def _create_gemini_model(self, model_name: ModelName, **params: object) -> BaseChatModel:
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
         return ChatGoogleGenerativeAI(
-            model=model_name.value if model_name else ModelName.GEMINI_1_5_PRO.value, callbacks=self.callbacks
+            model=model_name.value if model_name else ModelName.GEMINI_1_5_PRO.value,
+            callbacks=self.callbacks,
+            cache=self.cache,
+            **params,
         )
+
+    def _create_fake_model(self, model_name: ModelName, **params: object) -> BaseChatModel:
+        return FakeChatModel.from_env(callbacks=self.callbacks, cache=self.cache, **params)
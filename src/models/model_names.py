@@ -9,6 +9,7 @@ class ModelProvider(Enum):
     ANTHROPIC = "anthropic"
     OLLAMA = "ollama"
     GEMINI = "google-genai"
+    FAKE = "fake"  # offline, for benchmarks and tests
 
 
 class ModelName(Enum):
@@ -27,3 +28,16 @@ class ModelName(Enum):
     DEEPSEEK_R1_14B = "deepseek-r1:14b"
     # Gemini
     GEMINI_1_5_PRO = "gemini-1.5-pro"
+    # Fake (offline)
+    FAKE_RULES = "rules"
+
+
+def parse_model_spec(spec: str) -> tuple[ModelProvider, ModelName | None]:
+    """Parse ``provider[:model]`` (e.g. ``openai:gpt-4o-mini``) into a provider and model name."""
+    provider, _, model = spec.strip().partition(":")
+    return ModelProvider(provider.strip()), ModelName(model.strip()) if model.strip() else None
+
+
+def parse_model_chain(chain: str) -> list[tuple[ModelProvider, ModelName | None]]:
+    """Parse a comma-separated list of model specs, in fallback order."""
+    return [parse_model_spec(spec) for spec in chain.split(",") if spec.strip()]
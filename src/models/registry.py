@@ -0,0 +1,216 @@
+import asyncio
+import logging
+import os
+import threading
+from collections.abc import AsyncGenerator, Callable, Hashable
+from dataclasses import dataclass
+
+import httpx
+from langchain_core.language_models import BaseChatModel
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class HttpPoolConfig:
+    """Keep-alive connection pool settings of the shared provider HTTP clients."""
+
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 60.0
+    timeout: float = 60.0
+
+    @classmethod
+    def from_env(cls) -> "HttpPoolConfig":
+        """Build the config from the ``MODEL_HTTP_*`` environment variables."""
+        return cls(
+            max_connections=int(os.getenv("MODEL_HTTP_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.getenv("MODEL_HTTP_MAX_KEEPALIVE", "10")),
+            keepalive_expiry=float(os.getenv("MODEL_HTTP_KEEPALIVE_EXPIRY", "60")),
+            timeout=float(os.getenv("MODEL_HTTP_TIMEOUT", "60")),
+        )
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+
+@dataclass(frozen=True)
+class RegistryStats:
+    """Point-in-time snapshot of the shared model clients."""
+
+    models: int
+    http_clients: int
+    connections: int
+    idle_connections: int
+    hits: int
+    misses: int
+
+
+class LoopLocalTransport(httpx.AsyncBaseTransport):
+    """Async transport with one connection pool per event loop.
+
+    The connections of an ``httpx`` async pool belong to the event loop that opened them,
+    but the shared async client is used from several loops (each ``asyncio.run`` of the
+    benchmarks, the server's loop). Every loop gets its own ``AsyncHTTPTransport``, created
+    on its first request and closed by ``loop.shutdown_asyncgens()``, which ``asyncio.run``
+    calls before it closes the loop. The pools of loops closed without it can no longer be
+    closed cleanly: they are dropped on the next use of the transport.
+    """
+
+    def __init__(self, limits: httpx.Limits) -> None:
+        self.limits = limits
+        self._lock = threading.Lock()
+        self._transports: dict[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport] = {}
+        # Suspended generators that close the pool of their loop when the loop shuts them down
+        self._closers: dict[asyncio.AbstractEventLoop, AsyncGenerator[None, None]] = {}
+
+    def _drop_closed_loops(self) -> None:
+        for loop in [loop for loop in self._transports if loop.is_closed()]:
+            del self._transports[loop]
+            self._closers.pop(loop, None)
+            logger.debug("Dropped the HTTP connection pool of a closed event loop")
+
+    async def _close_with_loop(
+        self, loop: asyncio.AbstractEventLoop, transport: httpx.AsyncHTTPTransport
+    ) -> AsyncGenerator[None, None]:
+        try:
+            yield
+        finally:
+            with self._lock:
+                if self._transports.get(loop) is transport:
+                    del self._transports[loop]
+                    self._closers.pop(loop, None)
+            await transport.aclose()
+
+    async def _transport(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._transports.get(loop)
+            if transport is not None:
+                return transport
+            self._drop_closed_loops()
+            transport = httpx.AsyncHTTPTransport(limits=self.limits)
+            self._transports[loop] = transport
+            closer = self._closers[loop] = self._close_with_loop(loop, transport)
+        # The first step registers the generator with the loop's shutdown_asyncgens()
+        await anext(closer)
+        return transport
+
+    def transports(self) -> list[httpx.AsyncHTTPTransport]:
+        """Return the transports of the event loops still open."""
+        with self._lock:
+            self._drop_closed_loops()
+            return list(self._transports.values())
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        transport = await self._transport()
+        return await transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        """Close the pool of the running loop; the pools of other loops are closed with their loop."""
+        with self._lock:
+            closer = self._closers.get(asyncio.get_running_loop())
+        if closer is not None:
+            await closer.aclose()
+
+
+def _pool_connections(client: httpx.Client | httpx.AsyncClient) -> list:
+    """Return the connections currently held by an httpx client's pools (empty if unknown)."""
+    transport = getattr(client, "_transport", None)
+    transports = transport.transports() if isinstance(transport, LoopLocalTransport) else [transport]
+    return [
+        connection
+        for transport in transports
+        for connection in getattr(getattr(transport, "_pool", None), "connections", [])
+    ]
+
+
+class ModelRegistry:
+    """Process-wide registry of chat model clients.
+
+    Models are created once per ``(provider, model, params)`` key and shared by every
+    caller, which is safe because chat models keep no per-conversation state. Providers
+    with an OpenAI-compatible API share one sync and one async ``httpx`` client per
+    provider, so connections and TLS sessions are reused across models and sessions.
+    The async client keeps one connection pool per event loop (``LoopLocalTransport``).
+    """
+
+    def __init__(self, http_config: HttpPoolConfig | None = None) -> None:
+        self.http_config = http_config or HttpPoolConfig.from_env()
+        # Re-entrant: model constructors ask for the shared HTTP clients while the model is created
+        self._lock = threading.RLock()
+        self._models: dict[Hashable, BaseChatModel] = {}
+        self._http_clients: dict[str, tuple[httpx.Client, httpx.AsyncClient]] = {}
+        self._hits = 0
+        self._misses = 0
+
+    def get_or_create(self, key: Hashable, create_fn: Callable[[], BaseChatModel]) -> BaseChatModel:
+        """Return the model registered under ``key``, creating it with ``create_fn`` on first use."""
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._hits += 1
+                return model
+            self._misses += 1
+            model = create_fn()
+            self._models[key] = model
+            logger.info(f"Created shared model client for {key[:2] if isinstance(key, tuple) else key}")
+            return model
+
+    def http_clients(self, name: str) -> tuple[httpx.Client, httpx.AsyncClient]:
+        """Return the shared sync and async HTTP clients for provider ``name``."""
+        with self._lock:
+            clients = self._http_clients.get(name)
+            if clients is None:
+                limits = self.http_config.limits()
+                timeout = httpx.Timeout(self.http_config.timeout)
+                clients = (
+                    httpx.Client(limits=limits, timeout=timeout),
+                    httpx.AsyncClient(transport=LoopLocalTransport(limits), timeout=timeout),
+                )
+                self._http_clients[name] = clients
+            return clients
+
+    def stats(self) -> RegistryStats:
+        """Return the number of live clients and pooled connections."""
+        with self._lock:
+            connections = [
+                connection
+                for clients in self._http_clients.values()
+                for client in clients
+                for connection in _pool_connections(client)
+            ]
+            return RegistryStats(
+                models=len(self._models),
+                http_clients=sum(len(clients) for clients in self._http_clients.values()),
+                connections=len(connections),
+                idle_connections=sum(1 for connection in connections if connection.is_idle()),
+                hits=self._hits,
+                misses=self._misses,
+            )
+
+    def close(self) -> None:
+        """Drop every model and close the sync HTTP clients (async clients are closed by their event loop)."""
+        with self._lock:
+            for client, _ in self._http_clients.values():
+                client.close()
+            self._http_clients.clear()
+            self._models.clear()
+
+
+_registry: ModelRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Return the process-wide model registry."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry()
+    return _registry
@@ -0,0 +1,279 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.messages import AIMessage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = "model_cache.db"
+
+# Message fields that reach the provider; ids, metadata and token usage do not change the answer
+_MESSAGE_FIELDS = ("type", "content", "name", "tool_calls", "tool_call_id")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS response_cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+)
+"""
+
+
+@dataclass(frozen=True)
+class ResponseCacheStats:
+    """Point-in-time snapshot of the response cache metrics."""
+
+    hits: int
+    misses: int
+    writes: int
+    evictions: int
+    expirations: int
+    errors: int
+    size: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def _canonical_prompt(prompt: str) -> str:
+    """Reduce a serialized message list to what the provider actually sees.
+
+    Message ids are random per run (the graph assigns one to every message) and tool call
+    ids are generated by the provider, so they are dropped or renumbered in order of
+    appearance; the pairing between a tool call and its ToolMessage is preserved.
+    """
+    try:
+        messages = json.loads(prompt)
+    except ValueError:
+        return prompt
+    if not isinstance(messages, list):
+        return prompt
+
+    call_ids: dict[str, str] = {}
+
+    def call_id(value: str) -> str:
+        return call_ids.setdefault(value, f"call_{len(call_ids)}")
+
+    canonical = []
+    for message in messages:
+        fields = message.get("kwargs", message) if isinstance(message, dict) else message
+        if not isinstance(fields, dict):
+            canonical.append(fields)
+            continue
+        item = {key: fields[key] for key in _MESSAGE_FIELDS if fields.get(key) not in (None, [])}
+        if "tool_calls" in item:
+            item["tool_calls"] = [
+                {"name": tc.get("name"), "args": tc.get("args"), "id": call_id(tc.get("id") or "")}
+                for tc in item["tool_calls"]
+            ]
+        if "tool_call_id" in item:
+            item["tool_call_id"] = call_id(item["tool_call_id"])
+        canonical.append(item)
+    return json.dumps(canonical, sort_keys=True, ensure_ascii=False)
+
+
+def _with_fresh_ids(generations: RETURN_VAL_TYPE) -> RETURN_VAL_TYPE:
+    """Give the replayed messages and their tool calls new ids, as a new answer would have.
+
+    ``add_messages`` replaces a message with the same id and ToolMessages are paired with
+    their call by id, so the stored ids would overwrite earlier messages of the conversation
+    and answer stale calls. The call ids are also renamed in the provider-specific copies
+    (OpenAI ``additional_kwargs["tool_calls"]``, Anthropic ``tool_use`` content blocks).
+    """
+    for generation in generations:
+        message = getattr(generation, "message", None)
+        if not isinstance(message, AIMessage):
+            continue
+        message.id = f"run-{uuid.uuid4()}"
+        call_ids = {
+            tc["id"]: f"call_{uuid.uuid4().hex[:24]}"
+            for tc in [*message.tool_calls, *message.invalid_tool_calls]
+            if tc.get("id")
+        }
+        if not call_ids:
+            continue
+
+        def renamed(item: dict) -> dict:
+            return {**item, "id": call_ids[item["id"]]} if item.get("id") in call_ids else item
+
+        message.tool_calls = [renamed(tc) for tc in message.tool_calls]
+        message.invalid_tool_calls = [renamed(tc) for tc in message.invalid_tool_calls]
+        if message.additional_kwargs.get("tool_calls"):
+            message.additional_kwargs["tool_calls"] = [renamed(tc) for tc in message.additional_kwargs["tool_calls"]]
+        if isinstance(message.content, list):
+            message.content = [
+                renamed(block) if isinstance(block, dict) and block.get("type") == "tool_use" else block
+                for block in message.content
+            ]
+    return generations
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    """Stable hash of the rendered messages and the model configuration.
+
+    ``llm_string`` is built by the chat model from its serialized parameters and the call
+    kwargs, which include the tool schemas bound with ``bind_tools``.
+    """
+    digest = hashlib.sha256()
+    digest.update(llm_string.encode())
+    digest.update(b"\0")
+    digest.update(_canonical_prompt(prompt).encode())
+    return digest.hexdigest()
+
+
+class SqliteResponseCache(BaseCache):
+    """LangChain cache of chat model responses stored in a local SQLite file.
+
+    Entries expire ``ttl`` seconds after being written, and once more than ``max_entries``
+    are stored the least recently used ones are evicted. Generations are stored with
+    ``langchain_core.load.dumps`` so the cached AIMessage, including its ``tool_calls``,
+    is rebuilt on a hit, with new message and tool call ids. Only deterministic settings
+    (e.g. temperature 0) make replaying an answer equivalent to asking again.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = 5000, ttl: float = 86400.0) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_response_cache_accessed_at ON response_cache (accessed_at)")
+        self._size = self._conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._errors = 0
+
+    @classmethod
+    def from_env(cls) -> "SqliteResponseCache":
+        """Build the cache from the ``MODEL_CACHE_*`` environment variables."""
+        return cls(
+            path=os.getenv("MODEL_CACHE_PATH", DEFAULT_CACHE_PATH),
+            max_entries=int(os.getenv("MODEL_CACHE_MAX_ENTRIES", "5000")),
+            ttl=float(os.getenv("MODEL_CACHE_TTL", "86400")),
+        )
+
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        key = cache_key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT value, created_at FROM response_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[1] + self.ttl <= now:
+                    self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                    self._size -= 1
+                    self._expirations += 1
+                    row = None
+                if row is None:
+                    self._misses += 1
+                    return None
+                self._conn.execute("UPDATE response_cache SET accessed_at = ? WHERE key = ?", (now, key))
+                generations = loads(row[0], allowed_objects="core", secrets_from_env=False)
+            except (sqlite3.Error, ValueError, TypeError) as e:
+                # A broken entry must never break the conversation: treat it as a miss
+                self._errors += 1
+                self._misses += 1
+                logger.warning(f"Model response cache lookup failed: {e}")
+                return None
+            self._hits += 1
+        return _with_fresh_ids(generations)
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = cache_key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            try:
+                value = dumps(return_val)
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    cursor = self._conn.execute(
+                        "INSERT OR IGNORE INTO response_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                        (key, value, now, now),
+                    )
+                    if cursor.rowcount:
+                        self._size += 1
+                    else:
+                        self._conn.execute(
+                            "UPDATE response_cache SET value = ?, created_at = ?, accessed_at = ? WHERE key = ?",
+                            (value, now, now, key),
+                        )
+                    if self._size > self.max_entries:
+                        self._evict(self._size - self.max_entries)
+                    self._conn.execute("COMMIT")
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            except (sqlite3.Error, TypeError, ValueError) as e:
+                self._errors += 1
+                logger.warning(f"Model response cache update failed: {e}")
+                return
+            self._writes += 1
+
+    def _evict(self, count: int) -> None:
+        """Remove expired entries, then the ``count`` least recently used ones if still needed."""
+        cursor = self._conn.execute("DELETE FROM response_cache WHERE created_at <= ?", (time.time() - self.ttl,))
+        self._expirations += cursor.rowcount
+        self._size -= cursor.rowcount
+        count -= cursor.rowcount
+        if count > 0:
+            cursor = self._conn.execute(
+                "DELETE FROM response_cache WHERE key IN (SELECT key FROM response_cache ORDER BY accessed_at LIMIT ?)",
+                (count,),
+            )
+            self._evictions += cursor.rowcount
+            self._size -= cursor.rowcount
+
+    def clear(self, **kwargs: object) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM response_cache")
+            self._size = 0
+
+    def stats(self) -> ResponseCacheStats:
+        """Return the current cache metrics."""
+        with self._lock:
+            return ResponseCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                writes=self._writes,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                errors=self._errors,
+                size=self._size,
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_cache: SqliteResponseCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> SqliteResponseCache:
+    """Return the process-wide model response cache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SqliteResponseCache.from_env()
+    return _cache
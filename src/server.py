@@ -0,0 +1,341 @@
+"""Asyncio HTTP server that serves many conversations from one process.
+
+Every conversation is a thread of the shared compiled graph (``get_chatbot``), run with
+``graph.astream``, and replies are streamed as server-sent events:
+
+    python -m src.main --serve          # or: python -m src.server --port 8080
+
+    POST   /chat                 {"message": "...", "thread_id": "..."} -> text/event-stream
+    DELETE /threads/<thread_id>  end a conversation
+    GET    /health               load, limits and latency
+
+``/chat`` streams a ``thread`` event with the thread id, one ``token`` event per chunk
+of text, then ``done`` (or ``error``). Omit ``thread_id`` to start a conversation. At most
+``SERVER_MAX_CONCURRENT_TURNS`` turns run at once; up to ``SERVER_MAX_QUEUED_TURNS`` more
+wait for ``SERVER_QUEUE_TIMEOUT`` seconds, and the server answers 503 beyond that.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing, asynccontextmanager
+from dataclasses import dataclass, replace
+from typing import Any
+
+from langchain_core.messages import HumanMessage
+
+from src.core.chatbot import ChatSession, get_chatbot
+from src.core.streaming import ReplyStream, get_latency_tracker
+from src.core.transcripts import get_transcript_writer
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 64 * 1024
+# Thread ids name checkpoint rows and transcript files, so clients may only send plain ids
+# (the UUIDs the server creates match too)
+THREAD_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    408: "Request Timeout",
+    409: "Conflict",
+    413: "Payload Too Large",
+    503: "Service Unavailable",
+}
+
+
+@dataclass(frozen=True)
+class ServerConfig:
+    """Address and admission limits of the chat server."""
+
+    host: str = "127.0.0.1"
+    port: int = 8080
+    max_concurrent_turns: int = 16
+    max_queued_turns: int = 64
+    queue_timeout: float = 30.0  # seconds a turn may wait for a slot before a 503
+    read_timeout: float = 10.0  # seconds a client has to send its request before a 408
+
+    @classmethod
+    def from_env(cls) -> "ServerConfig":
+        """Build the config from the ``SERVER_*`` environment variables."""
+        return cls(
+            host=os.getenv("SERVER_HOST", "127.0.0.1"),
+            port=int(os.getenv("SERVER_PORT", "8080")),
+            max_concurrent_turns=int(os.getenv("SERVER_MAX_CONCURRENT_TURNS", "16")),
+            max_queued_turns=int(os.getenv("SERVER_MAX_QUEUED_TURNS", "64")),
+            queue_timeout=float(os.getenv("SERVER_QUEUE_TIMEOUT", "30")),
+            read_timeout=float(os.getenv("SERVER_READ_TIMEOUT", "10")),
+        )
+
+
+class Overloaded(Exception):
+    """Raised when a turn cannot get a slot: the queue is full or the wait timed out."""
+
+
+class TurnLimiter:
+    """Global limit on the turns running at once, with a bounded queue of waiting turns."""
+
+    def __init__(self, max_active: int, max_queued: int, queue_timeout: float) -> None:
+        self.max_active = max_active
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_active)
+        self.active = 0
+        self.queued = 0
+        self.completed = 0
+        self.rejected = 0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        # Counted before any await: turns arriving together all see the semaphore unlocked,
+        # since wait_for only acquires it on a later step of the loop
+        if self.active + self.queued >= self.max_active + self.max_queued:
+            self.rejected += 1
+            raise Overloaded(f"{self.queued} turns already waiting")
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except TimeoutError as e:
+            self.rejected += 1
+            raise Overloaded(f"No slot within {self.queue_timeout:g}s") from e
+        finally:
+            self.queued -= 1
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "max_active": self.max_active,
+            "max_queued": self.max_queued,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    headers: dict[str, str]
+    body: bytes
+
+    def json(self) -> dict[str, Any]:
+        try:
+            data = json.loads(self.body or b"{}")
+        except ValueError as e:
+            raise HttpError(400, f"Invalid JSON body: {e}") from e
+        if not isinstance(data, dict):
+            raise HttpError(400, "The body must be a JSON object")
+        return data
+
+
+async def read_request(reader: asyncio.StreamReader) -> Request | None:
+    """Parse one HTTP/1.1 request; return None if the client closed the connection."""
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    try:
+        method, target, _ = request_line.decode("latin-1").split(" ", 2)
+    except ValueError as e:
+        raise HttpError(400, "Malformed request line") from e
+    headers = {}
+    while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    content_length = headers.get("content-length") or "0"
+    if not (content_length.isascii() and content_length.isdigit()):
+        raise HttpError(400, f"Invalid Content-Length: {content_length!r}")
+    length = int(content_length)
+    if length > MAX_BODY_BYTES:
+        raise HttpError(413, f"Bodies are limited to {MAX_BODY_BYTES} bytes")
+    body = await reader.readexactly(length) if length else b""
+    return Request(method=method.upper(), path=target.split("?", 1)[0], headers=headers, body=body)
+
+
+def parse_thread_id(value: object) -> str:
+    """Return a thread id sent by a client, or raise a 400 if it is not a plain id."""
+    if not isinstance(value, str) or not THREAD_ID_PATTERN.fullmatch(value):
+        raise HttpError(400, "'thread_id' must be 1 to 64 letters, digits, '-' or '_'")
+    return value
+
+
+async def write_head(writer: asyncio.StreamWriter, status: int, content_type: str, extra: dict | None = None) -> None:
+    headers = {"Content-Type": content_type, "Cache-Control": "no-cache", "Connection": "close", **(extra or {})}
+    lines = [f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}", *(f"{k}: {v}" for k, v in headers.items())]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+    await writer.drain()
+
+
+async def write_json(writer: asyncio.StreamWriter, status: int, data: dict, extra: dict | None = None) -> None:
+    body = json.dumps(data).encode()
+    await write_head(writer, status, "application/json", {"Content-Length": str(len(body)), **(extra or {})})
+    writer.write(body)
+    await writer.drain()
+
+
+async def write_event(writer: asyncio.StreamWriter, event: str, data: dict) -> None:
+    writer.write(f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode())
+    # Waits while the client is slow to read, so a slow client holds back its own turn only
+    await writer.drain()
+
+
+class ChatServer:
+    """Serves the chat over HTTP, with all the conversations on one event loop."""
+
+    def __init__(self, config: ServerConfig | None = None) -> None:
+        self.config = config or ServerConfig.from_env()
+        self.limiter = TurnLimiter(
+            self.config.max_concurrent_turns, self.config.max_queued_turns, self.config.queue_timeout
+        )
+        self.chatbot = get_chatbot()
+        self.transcripts = get_transcript_writer()
+        self._running_threads: set[str] = set()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            # A client that never finishes its request would hold the connection forever
+            request = await asyncio.wait_for(read_request(reader), self.config.read_timeout)
+            if request is not None:
+                await self.dispatch(request, writer)
+        except HttpError as e:
+            await write_json(writer, e.status, {"error": str(e)})
+        except TimeoutError:
+            await write_json(writer, 408, {"error": f"No complete request within {self.config.read_timeout:g}s"})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            logger.exception(f"Unhandled error while serving a request: {e}")
+        finally:
+            writer.close()
+
+    async def dispatch(self, request: Request, writer: asyncio.StreamWriter) -> None:
+        if request.path == "/health":
+            if request.method != "GET":
+                raise HttpError(405, "Use GET /health")
+            await write_json(writer, 200, self.health())
+        elif request.path == "/chat":
+            if request.method != "POST":
+                raise HttpError(405, "Use POST /chat")
+            await self.chat(request.json(), writer)
+        elif request.path.startswith("/threads/"):
+            if request.method != "DELETE":
+                raise HttpError(405, "Use DELETE /threads/<thread_id>")
+            thread_id = parse_thread_id(request.path.removeprefix("/threads/"))
+            if thread_id in self._running_threads:
+                raise HttpError(409, f"A turn is running in thread {thread_id}")
+            ChatSession(thread_id, chatbot=self.chatbot).end()
+            await write_json(writer, 200, {"thread_id": thread_id, "ended": True})
+        else:
+            raise HttpError(404, f"No route for {request.path}")
+
+    def health(self) -> dict[str, Any]:
+        return {"status": "ok", "turns": self.limiter.stats(), "latency": get_latency_tracker().summary()}
+
+    async def chat(self, data: dict[str, Any], writer: asyncio.StreamWriter) -> None:
+        text = data.get("message")
+        if not isinstance(text, str) or not text.strip():
+            raise HttpError(400, "'message' must be a non-empty string")
+        thread_id = data.get("thread_id")
+        session = ChatSession(parse_thread_id(thread_id) if thread_id else None, chatbot=self.chatbot)
+        # Turns of one conversation must not interleave: they would fork its checkpoints
+        if session.thread_id in self._running_threads:
+            raise HttpError(409, f"A turn is already running in thread {session.thread_id}")
+
+        self._running_threads.add(session.thread_id)
+        try:
+            async with self.limiter.slot():
+                await self._stream_turn(session, text, writer)
+        except Overloaded as e:
+            logger.warning(f"Turn rejected: {e}")
+            await write_json(writer, 503, {"error": f"Server busy: {e}"}, {"Retry-After": "1"})
+        finally:
+            self._running_threads.discard(session.thread_id)
+
+    async def _stream_turn(self, session: ChatSession, text: str, writer: asyncio.StreamWriter) -> None:
+        user_message = HumanMessage(content=text, name="user")
+        reply_stream = ReplyStream(session.graph, {"messages": [user_message]}, config=session.config)
+        await write_head(writer, 200, "text/event-stream")
+        await write_event(writer, "thread", {"thread_id": session.thread_id})
+        try:
+            # Closing the stream early (the client left) cancels the rest of the turn
+            async with aclosing(aiter(reply_stream)) as chunks:
+                async for chunk in chunks:
+                    await write_event(writer, "token", {"text": chunk})
+        except ConnectionError:
+            logger.info(f"Client of thread {session.thread_id} disconnected during the turn")
+            return
+        except Exception as e:
+            logger.error(f"Error in thread {session.thread_id}: {e}")
+            await write_event(writer, "error", {"error": str(e)})
+            return
+
+        self.transcripts.append(
+            session.thread_id,
+            [user_message, *reply_stream.messages],
+            customer_id=reply_stream.values.get("customer_id"),
+            summary=reply_stream.values.get("summary"),
+        )
+        metrics = reply_stream.metrics
+        await write_event(
+            writer,
+            "done",
+            {
+                "thread_id": session.thread_id,
+                "time_to_first_token_s": metrics.time_to_first_token_s,
+                "total_s": metrics.total_s,
+            },
+        )
+
+
+async def serve(config: ServerConfig | None = None) -> None:
+    """Run the chat server until cancelled."""
+    server = ChatServer(config)
+    # The assistants are synchronous nodes, which astream runs on the default executor: give
+    # every turn that may run at once a thread, and as many again for the checkpointer calls
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=2 * server.config.max_concurrent_turns))
+    tcp_server = await asyncio.start_server(server.handle_connection, server.config.host, server.config.port)
+    logger.info(
+        f"Chat server listening on http://{server.config.host}:{server.config.port} "
+        f"({server.config.max_concurrent_turns} concurrent turns, {server.config.max_queued_turns} queued)"
+    )
+    async with tcp_server:
+        await tcp_server.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=None)
+    parser.add_argument("--port", type=int, default=None)
+    args, _ = parser.parse_known_args()
+
+    logging.basicConfig(level=logging.INFO)
+    overrides = {key: value for key, value in (("host", args.host), ("port", args.port)) if value is not None}
+    try:
+        asyncio.run(serve(replace(ServerConfig.from_env(), **overrides)))
+    except KeyboardInterrupt:
+        logger.info("Chat server stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,13 @@ databases and control conversation flow.
 """
 
 from src.tools.common_tool import CompleteOrEscalate, ToRecommendationAssistant, ToSpendingAssistant
-from src.tools.tools import fetch_plan_information, fetch_spending_events, list_supported_plans, validate_customer
+from src.tools.tools import (
+    fetch_plan_information,
+    fetch_spending_events,
+    list_supported_plans,
+    simulate_plan_costs,
+    validate_customer,
+)
 
 __all__ = [
     # Common tools
@@ -17,5 +23,6 @@ __all__ = [
     "fetch_spending_events",
     "list_supported_plans",
     "fetch_plan_information",
+    "simulate_plan_costs",
     "validate_customer",
 ]
@@ -0,0 +1,53 @@
+import asyncio
+import functools
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import ParamSpec, TypeVar
+
+from langchain_core.tools import StructuredTool
+
+from src.db.connection import get_pool
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_tool_executor() -> ThreadPoolExecutor:
+    """Return the bounded thread pool that runs the database tools in async graphs.
+
+    It is sized like the connection pool (``TOOL_EXECUTOR_WORKERS`` overrides it), so
+    concurrently running tools never queue on a connection.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                max_workers = int(os.getenv("TOOL_EXECUTOR_WORKERS", str(get_pool().config.max_size)))
+                _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-tool")
+    return _executor
+
+
+async def run_in_tool_executor(func: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+    """Run a blocking function on the tool executor without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_tool_executor(), functools.partial(func, *args, **kwargs))
+
+
+def db_tool(func: Callable[P, T]) -> StructuredTool:
+    """Turn a blocking database function into a tool with a sync and an async implementation.
+
+    The sync path calls ``func`` directly. The async path (``ainvoke``, used by ``ToolNode``
+    under ``graph.astream``) runs it on the bounded tool executor, so the tool calls of one
+    model message execute concurrently.
+    """
+
+    @functools.wraps(func)
+    async def coroutine(*args: P.args, **kwargs: P.kwargs) -> T:
+        return await run_in_tool_executor(func, *args, **kwargs)
+
+    return StructuredTool.from_function(func=func, coroutine=coroutine)
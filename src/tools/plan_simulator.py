@@ -0,0 +1,156 @@
+"""Vectorized "what-if" repricing of customers' billing history under every plan.
+
+For each billing period the consumption is inferred from the amount billed under the
+plan the customer was on, and then repriced under every plan in a single NumPy pass.
+The same code path serves one customer (the ``simulate_plan_costs`` tool) or the whole
+customer base for offline precomputation (``python -m src.tools.precompute_recommendations``).
+"""
+
+import csv
+import json
+import sqlite3
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.db.queries import SIMULATION_BATCH_HISTORY_QUERY, SIMULATION_HISTORY_QUERY
+
+DEFAULT_NIGHT_SHARE = 0.3
+DAYS_PER_YEAR = 365.0
+
+
+@dataclass(frozen=True)
+class PlanTariffs:
+    """Tariffs of every plan that can be simulated, as parallel arrays."""
+
+    plan_ids: np.ndarray
+    plan_names: tuple[str, ...]
+    day_rate: np.ndarray
+    night_rate: np.ndarray
+    standing_charge: np.ndarray
+
+    @classmethod
+    def from_plans(cls, plans: Iterable[Mapping]) -> "PlanTariffs":
+        """Build the tariffs from plan rows, skipping plans without tariff data."""
+        priced = [
+            plan
+            for plan in plans
+            if all(plan.get(column) is not None for column in ("day_rate", "night_rate", "standing_charge"))
+        ]
+        return cls(
+            plan_ids=np.array([plan["plan_id"] for plan in priced], dtype=np.int64),
+            plan_names=tuple(plan["plan_name"] for plan in priced),
+            day_rate=np.array([plan["day_rate"] for plan in priced], dtype=np.float64),
+            night_rate=np.array([plan["night_rate"] for plan in priced], dtype=np.float64),
+            standing_charge=np.array([plan["standing_charge"] for plan in priced], dtype=np.float64),
+        )
+
+    def unit_rates(self, night_share: float) -> np.ndarray:
+        """Return the blended price per kWh of every plan for the given night consumption share."""
+        return self.day_rate * (1.0 - night_share) + self.night_rate * night_share
+
+
+@dataclass(frozen=True)
+class SimulationResult:
+    """Projected annual cost of every simulated customer under every plan."""
+
+    customer_ids: np.ndarray  # (customers,)
+    plan_names: tuple[str, ...]
+    annual_costs: np.ndarray  # (customers, plans)
+    current_annual_cost: np.ndarray  # (customers,)
+    periods: np.ndarray  # (customers,) billing periods used
+
+    def ranking(self, index: int = 0) -> list[tuple[str, float]]:
+        """Return ``(plan_name, annual_cost)`` pairs for one customer, cheapest first."""
+        costs = self.annual_costs[index]
+        return [(self.plan_names[i], float(costs[i])) for i in np.argsort(costs, kind="stable")]
+
+    def best_plan_indices(self) -> np.ndarray:
+        return np.argmin(self.annual_costs, axis=1)
+
+
+def load_history(conn: sqlite3.Connection, customer_ids: Iterable[int] | None = None, months: int = 12) -> np.ndarray:
+    """Load the last ``months`` billing periods of the given customers (all when ``None``).
+
+    Returns a float array with ``(customer_id, plan_id, days, amount_due)`` rows.
+    """
+    if customer_ids is not None:
+        customer_ids = list(customer_ids)
+        if len(customer_ids) == 1:
+            rows = conn.execute(SIMULATION_HISTORY_QUERY, (customer_ids[0], months)).fetchall()
+        else:
+            query = SIMULATION_BATCH_HISTORY_QUERY.format(
+                where="WHERE s.customer_id IN (SELECT value FROM json_each(?))"
+            )
+            rows = conn.execute(query, (json.dumps(customer_ids), months)).fetchall()
+    else:
+        rows = conn.execute(SIMULATION_BATCH_HISTORY_QUERY.format(where=""), (months,)).fetchall()
+
+    return np.array(rows, dtype=np.float64).reshape(-1, 4)
+
+
+def simulate(history: np.ndarray, tariffs: PlanTariffs, night_share: float = DEFAULT_NIGHT_SHARE) -> SimulationResult:
+    """Reprice every billing period in ``history`` under every plan in ``tariffs``."""
+    # Map plan ids to tariff columns; periods billed under a plan without tariffs are dropped
+    lookup = np.full(int(max(tariffs.plan_ids.max(initial=0), history[:, 1].max(initial=0))) + 1, -1)
+    lookup[tariffs.plan_ids] = np.arange(len(tariffs.plan_ids))
+    billed_plan = lookup[history[:, 1].astype(np.int64)]
+    history = history[billed_plan >= 0]
+    billed_plan = billed_plan[billed_plan >= 0]
+
+    customers, customer_index = np.unique(history[:, 0].astype(np.int64), return_inverse=True)
+    days = history[:, 2]
+    amount_due = history[:, 3]
+    unit_rates = tariffs.unit_rates(night_share)
+
+    # Consumption implied by each bill under the plan it was billed on
+    kwh = np.clip((amount_due - tariffs.standing_charge[billed_plan] * days) / unit_rates[billed_plan], 0.0, None)
+    # (periods, plans) cost matrix
+    costs = days[:, None] * tariffs.standing_charge[None, :] + kwh[:, None] * unit_rates[None, :]
+
+    total_days = np.bincount(customer_index, weights=days, minlength=len(customers))
+    annual_costs = np.zeros((len(customers), len(tariffs.plan_names)))
+    for j in range(len(tariffs.plan_names)):
+        annual_costs[:, j] = np.bincount(customer_index, weights=costs[:, j], minlength=len(customers))
+    scale = DAYS_PER_YEAR / np.where(total_days > 0, total_days, 1.0)
+
+    return SimulationResult(
+        customer_ids=customers,
+        plan_names=tariffs.plan_names,
+        annual_costs=annual_costs * scale[:, None],
+        current_annual_cost=np.bincount(customer_index, weights=amount_due, minlength=len(customers)) * scale,
+        periods=np.bincount(customer_index, minlength=len(customers)),
+    )
+
+
+def format_ranking(result: SimulationResult, index: int = 0) -> str:
+    """Format the ranked plans of one customer as a compact table."""
+    current = result.current_annual_cost[index]
+    lines = [
+        f"Projected annual cost per plan for customer {result.customer_ids[index]}"
+        f" (based on {result.periods[index]} billing periods, current spend {current:.2f}/year):",
+        "rank | plan | annual_cost | difference",
+    ]
+    for rank, (plan_name, cost) in enumerate(result.ranking(index), start=1):
+        lines.append(f"{rank} | {plan_name} | {cost:.2f} | {cost - current:+.2f}")
+    return "\n".join(lines)
+
+
+def write_recommendations(result: SimulationResult, path: str) -> None:
+    """Write the cheapest plan of every customer to a CSV file."""
+    best = result.best_plan_indices()
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["customer_id", "current_annual_cost", "best_plan", "best_annual_cost", "annual_savings"])
+        for i, customer_id in enumerate(result.customer_ids):
+            best_cost = result.annual_costs[i, best[i]]
+            writer.writerow(
+                [
+                    int(customer_id),
+                    f"{result.current_annual_cost[i]:.2f}",
+                    result.plan_names[best[i]],
+                    f"{best_cost:.2f}",
+                    f"{result.current_annual_cost[i] - best_cost:.2f}",
+                ]
+            )
@@ -0,0 +1,47 @@
+"""Precompute the cheapest plan of every customer with the vectorized plan simulator.
+
+Kept apart from ``src.tools.plan_simulator``, which the ``src.tools`` package imports, so
+that running it with ``-m`` does not import the module twice:
+
+    python -m src.tools.precompute_recommendations --db data.db --output recommendations.csv
+"""
+
+import argparse
+import logging
+import sqlite3
+import time
+
+from src.db.connection import get_db_path
+from src.tools.plan_simulator import DEFAULT_NIGHT_SHARE, PlanTariffs, load_history, simulate, write_recommendations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Precompute plan recommendations for every customer.")
+    parser.add_argument("--db", default=get_db_path(), help="Path to the SQLite database file")
+    parser.add_argument("--months", type=int, default=12, help="Billing periods per customer to simulate")
+    parser.add_argument("--night-share", type=float, default=DEFAULT_NIGHT_SHARE, help="Share of night consumption")
+    parser.add_argument("--output", default="recommendations.csv", help="CSV file to write")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    conn = sqlite3.connect(args.db)
+    try:
+        start = time.perf_counter()
+        conn.row_factory = sqlite3.Row
+        tariffs = PlanTariffs.from_plans(dict(row) for row in conn.execute("SELECT * FROM electricity_plans"))
+        conn.row_factory = None
+        history = load_history(conn, months=args.months)
+        loaded = time.perf_counter()
+        result = simulate(history, tariffs, night_share=args.night_share)
+        simulated = time.perf_counter()
+        write_recommendations(result, args.output)
+        logging.info(
+            f"Simulated {len(result.customer_ids)} customers ({len(history)} billing periods) x"
+            f" {len(tariffs.plan_names)} plans: load {loaded - start:.2f}s, simulate {simulated - loaded:.3f}s"
+        )
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
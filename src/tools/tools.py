@@ -1,79 +1,128 @@
 import sqlite3
-
-from langchain_core.tools import tool
-
-DB_PATH = "data.db"
-
-
-def get_db_connection() -> None:
-    """Creates and returns a database connection."""
-    # TODO: This does not go here. Move it in the future
+from datetime import date
+
+from src.db.connection import get_pool
+from src.db.identity_cache import get_identity_cache
+from src.db.plan_catalog import get_plan_catalog
+from src.db.queries import (
+    CUSTOMER_BY_EMAIL_QUERY,
+    CUSTOMER_BY_ID_QUERY,
+    build_spending_events_query,
+    normalize_email,
+)
+from src.tools.executor import db_tool
+from src.tools.plan_simulator import DEFAULT_NIGHT_SHARE, PlanTariffs, format_ranking, load_history, simulate
+
+SPENDING_PAGE_SIZE = 24
+MAX_SPENDING_PAGE_SIZE = 100
+SPENDING_FETCH_BATCH_SIZE = 16
+# Rough cap on the characters of event rows per page, to bound the tool message size
+SPENDING_OUTPUT_BUDGET = 4000
+SPENDING_EVENTS_HEADER = "billing_start | billing_end | plan_name | amount_due"
+
+
+def _encode_cursor(billing_end: str, event_id: int, returned: int) -> str:
+    """Encode the position after the last returned row as an opaque cursor."""
+    return f"{billing_end}~{event_id}~{returned}"
+
+
+def _decode_cursor(cursor: str) -> tuple[tuple[str, int], int]:
+    """Decode a cursor into the ``(billing_end, event_id)`` keyset position and the rows returned so far."""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        return conn
-    except sqlite3.Error as e:
-        raise Exception(f"Database connection error: {e}")
-
-
-@tool
-def fetch_spending_events(customer_id: int, months: int = None, plan_name: str = None) -> str:
+        billing_end, event_id, returned = cursor.split("~")
+        return (billing_end, int(event_id)), int(returned)
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from None
+
+
+@db_tool
+def fetch_spending_events(
+    customer_id: int,
+    months: int = None,
+    plan_name: str = None,
+    billing_start: str = None,
+    billing_end: str = None,
+    cursor: str = None,
+    max_rows: int = SPENDING_PAGE_SIZE,
+) -> str:
     """
-    Fetches spending events for a customer with optional filtering by months or plan.
+    Fetches spending events for a customer, newest first, with optional filtering by months, plan or dates.
+    Results are paginated: when more events are available the output ends with a cursor to pass back.
     Note: customer_id will be auto-filled if customer has been validated.
     Args:
         customer_id: The ID of the customer (will be auto-filled if validation has occurred)
         months: Optional number of most recent months to retrieve
         plan_name: Optional plan name to filter by
+        billing_start: Optional earliest billing period start date (YYYY-MM-DD)
+        billing_end: Optional latest billing period end date (YYYY-MM-DD)
+        cursor: Optional cursor returned by a previous call, to fetch the next page
+        max_rows: Maximum number of events to return in this page
     Returns:
-        A formatted string with the spending events information
+        A table with one spending event per row
     """
     if not customer_id:
         return "Error: Customer must be validated before accessing spending data."
 
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        query = "SELECT * FROM spending_events WHERE customer_id = ?"
-        params = [customer_id]
-
-        if plan_name:
-            query += " AND plan_name = ?"
-            params.append(plan_name)
+        after, returned = _decode_cursor(cursor) if cursor else (None, 0)
+    except ValueError as e:
+        return f"Error: {e}"
+    for value in (billing_start, billing_end):
+        try:
+            if value:
+                date.fromisoformat(value)
+        except ValueError:
+            return f"Error: Invalid date {value!r}, expected YYYY-MM-DD."
+
+    page_size = max(1, min(max_rows or SPENDING_PAGE_SIZE, MAX_SPENDING_PAGE_SIZE))
+    if months:
+        page_size = min(page_size, months - returned)
+        if page_size <= 0:
+            return "No more spending events found with the given criteria."
 
-        if months:
-            query += " ORDER BY billing_end DESC LIMIT ?"
-            params.append(months)
-        else:
-            query += " ORDER BY billing_end DESC"
-
-        cursor.execute(query, params)
-        results = cursor.fetchall()
-
-        if not results:
+    try:
+        query, params = build_spending_events_query(
+            plan_name=plan_name,
+            billing_start=billing_start,
+            billing_end=billing_end,
+            after=after,
+            limit=page_size + 1,
+        )
+
+        rows = []
+        output_size = 0
+        last_key = None
+        has_more = False
+        with get_pool().connection() as conn:
+            db_cursor = conn.execute(query, [customer_id, *params])
+            while not has_more and (batch := db_cursor.fetchmany(SPENDING_FETCH_BATCH_SIZE)):
+                for event_id, start, end, plan, amount_due in batch:
+                    amount = "" if amount_due is None else f"{amount_due:.2f}"
+                    line = f"{start} | {end} | {plan} | {amount}"
+                    if len(rows) == page_size or output_size + len(line) > SPENDING_OUTPUT_BUDGET:
+                        has_more = True
+                        break
+                    rows.append(line)
+                    output_size += len(line) + 1
+                    last_key = (end, event_id)
+
+        if not rows:
             return "No spending events found with the given criteria."
 
-        # Get column names for better formatting
-        column_names = [description[0] for description in cursor.description]
-
-        # Format the results
-        output = "Spending events:\n"
-        for row in results:
-            output += "\n"
-            for i, value in enumerate(row):
-                output += f"{column_names[i]}: {value}\n"
-            output += "----------"
+        returned += len(rows)
+        if months and returned >= months:
+            has_more = False
 
-        return output
+        output = [f"Spending events (newest first, {len(rows)} rows):", SPENDING_EVENTS_HEADER, *rows]
+        if has_more:
+            output.append(f'More events available: call again with cursor="{_encode_cursor(*last_key, returned)}".')
+        return "\n".join(output)
 
     except sqlite3.Error as e:
         return f"Database error: {e}"
-    finally:
-        if conn:
-            conn.close()
 
 
-@tool
+@db_tool
 def list_supported_plans() -> list[str]:
     """
     Returns a list of electricity plans supported by the system.
@@ -81,26 +130,14 @@ def list_supported_plans() -> list[str]:
         A list of plan names
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT plan_name FROM electricity_plans")
-        results = cursor.fetchall()
-
-        if not results:
-            return ["Standard Plan", "Eco Plan", "Night Plan"]  # Fallback if no DB data
-
-        return [row[0] for row in results]
-
+        # Served from the in-memory catalog, which falls back to its last known-good snapshot
+        return list(get_plan_catalog().snapshot().plan_names)
     except sqlite3.Error:
-        # Fallback if database error
-        return ["Standard Plan", "Eco Plan", "Night Plan"]
-    finally:
-        if conn:
-            conn.close()
+        # No snapshot could ever be loaded
+        return []
 
 
-@tool
+@db_tool
 def fetch_plan_information(plan_name: str) -> str:
     """
     Fetches detailed information about a specific electricity plan.
@@ -110,34 +147,60 @@ def fetch_plan_information(plan_name: str) -> str:
         A formatted string with plan details
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT * FROM electricity_plans WHERE plan_name = ?", (plan_name,))
-        result = cursor.fetchone()
+        plan = get_plan_catalog().snapshot().get(plan_name)
 
-        if not result:
+        if not plan:
             return f"No information found for plan: {plan_name}"
 
-        # Get column names for better formatting
-        column_names = [description[0] for description in cursor.description]
-
         # Format the result
         output = f"Information for {plan_name}:\n\n"
-        for i, value in enumerate(result):
-            if column_names[i] != "plan_id":  # Skip ID for user-facing output
-                output += f"{column_names[i]}: {value}\n"
+        for column_name, value in plan.items():
+            if column_name != "plan_id":  # Skip ID for user-facing output
+                output += f"{column_name}: {value}\n"
 
         return output
 
     except sqlite3.Error as e:
         return f"Database error: {e}"
-    finally:
-        if conn:
-            conn.close()
 
 
-@tool
+@db_tool
+def simulate_plan_costs(customer_id: int, months: int = 12, night_share: float = DEFAULT_NIGHT_SHARE) -> str:
+    """
+    Estimates what a validated customer would have paid per year under every electricity plan,
+    based on their recent billing history, and ranks the plans from cheapest to most expensive.
+    Note: customer_id will be auto-filled if customer has been validated.
+    Args:
+        customer_id: The ID of the validated customer
+        months: Number of most recent billing periods to base the projection on
+        night_share: Estimated share (0 to 1) of the customer's consumption during night hours
+    Returns:
+        A ranked table of projected annual cost per plan
+    """
+    if not customer_id:
+        return "Error: Customer must be validated before simulating plan costs."
+    if not 0.0 <= night_share <= 1.0:
+        return "Error: night_share must be between 0 and 1."
+
+    try:
+        tariffs = PlanTariffs.from_plans(get_plan_catalog().snapshot().plans.values())
+        if not tariffs.plan_names:
+            return "No plan tariffs are available to simulate."
+
+        with get_pool().connection() as conn:
+            history = load_history(conn, customer_ids=[customer_id], months=months)
+
+        result = simulate(history, tariffs, night_share=night_share)
+        if not len(result.customer_ids):
+            return "No billing history found for this customer."
+
+        return format_ranking(result)
+
+    except sqlite3.Error as e:
+        return f"Database error: {e}"
+
+
+@db_tool
 def validate_customer(customer_id: int = None, email: str = None) -> dict:
     """
     Validates if a customer exists by ID or email and returns customer information.
@@ -155,24 +218,34 @@ def validate_customer(customer_id: int = None, email: str = None) -> dict:
             "customer_info": None,
         }
 
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+    if customer_id is not None:
+        cache_key = ("id", customer_id)
+    else:
+        cache_key = ("email", normalize_email(email))
 
-        if customer_id is not None:
-            cursor.execute("SELECT * FROM customers WHERE customer_id = ?", (customer_id,))
-        else:
-            cursor.execute("SELECT * FROM customers WHERE email = ?", (email,))
+    identity_cache = get_identity_cache()
+    cached = identity_cache.get(cache_key)
+    if cached is not None:
+        return cached
 
-        result = cursor.fetchone()
+    try:
+        with get_pool().connection() as conn:
+            if customer_id is not None:
+                cursor = conn.execute(CUSTOMER_BY_ID_QUERY, (customer_id,))
+            else:
+                cursor = conn.execute(CUSTOMER_BY_EMAIL_QUERY, (cache_key[1],))
+
+            result = cursor.fetchone()
 
         if not result:
-            return {
+            not_found = {
                 "valid": False,
                 "message": "No customer found with the provided information",
                 "customer_id": None,
                 "customer_info": None,
             }
+            identity_cache.put(cache_key, not_found)
+            return not_found
 
         # Get column names for better formatting
         column_names = [description[0] for description in cursor.description]
@@ -182,15 +255,14 @@ def validate_customer(customer_id: int = None, email: str = None) -> dict:
         for i, value in enumerate(result):
             customer_info[column_names[i]] = value
 
-        return {
+        found = {
             "valid": True,
             "message": "Customer found",
             "customer_id": customer_info["customer_id"],
             "customer_info": customer_info,
         }
+        identity_cache.put(cache_key, found, email_key=("email", normalize_email(customer_info["email"] or "")))
+        return found
 
     except sqlite3.Error as e:
         return {"valid": False, "message": f"Database error: {e}", "customer_id": None, "customer_info": None}
-    finally:
-        if conn:
-            conn.close()
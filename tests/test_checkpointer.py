@@ -0,0 +1,222 @@
+import sqlite3
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Annotated, TypedDict
+
+import pytest
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage, RemoveMessage
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import START, StateGraph
+from langgraph.graph.message import add_messages
+from langgraph.graph.state import CompiledStateGraph
+
+from src.core.checkpointer import SqliteCheckpointSaver
+
+
+class EchoState(TypedDict):
+    messages: Annotated[list[AnyMessage], add_messages]
+
+
+def echo(state: EchoState) -> dict:
+    return {"messages": AIMessage(content=f"echo: {state['messages'][-1].content}")}
+
+
+def echo_and_trim(state: EchoState) -> dict:
+    # Deterministic ids, and the oldest turn dropped like a summary would, so that the
+    # states of two savers can be compared and the message deltas skip from the start
+    messages = state["messages"]
+    reply = AIMessage(content=f"echo: {messages[-1].content}", id=f"echo-{messages[-1].id}")
+    trimmed = [RemoveMessage(id=m.id) for m in messages[:2]] if len(messages) > 6 else []
+    return {"messages": [*trimmed, reply]}
+
+
+def build_graph(saver: BaseCheckpointSaver, node: Callable[[EchoState], dict] = echo) -> CompiledStateGraph:
+    builder = StateGraph(EchoState)
+    builder.add_node("echo", node)
+    builder.add_edge(START, "echo")
+    return builder.compile(checkpointer=saver)
+
+
+def thread(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def run_turns(graph: CompiledStateGraph, thread_id: str, turns: int, start: int = 0) -> None:
+    for i in range(start, start + turns):
+        graph.invoke({"messages": [HumanMessage(content=f"turn {i}", id=f"{thread_id}-{i}")]}, thread(thread_id))
+
+
+def history_values(graph: CompiledStateGraph, thread_id: str) -> list[dict]:
+    return [snapshot.values for snapshot in graph.get_state_history(thread(thread_id))]
+
+
+@pytest.fixture
+def saver(tmp_path: Path) -> Iterator[SqliteCheckpointSaver]:
+    # No background pruning: the tests call prune() themselves
+    saver = SqliteCheckpointSaver(str(tmp_path / "checkpoints.db"), keep_last=3, thread_ttl=3600, prune_interval=0)
+    yield saver
+    saver.close()
+
+
+def test_put_get_tuple_and_list_round_trip(saver: SqliteCheckpointSaver) -> None:
+    graph = build_graph(saver)
+    run_turns(graph, "a", 2)
+
+    latest = saver.get_tuple(thread("a"))
+    messages = latest.checkpoint["channel_values"]["messages"]
+    assert [m.content for m in messages] == ["turn 0", "echo: turn 0", "turn 1", "echo: turn 1"]
+    assert graph.get_state(thread("a")).values["messages"] == messages
+
+    history = list(saver.list(thread("a")))
+    assert history[0].config == latest.config
+    ids = [item.config["configurable"]["checkpoint_id"] for item in history]
+    assert ids == sorted(ids, reverse=True)
+    # Every checkpoint but the first points at the one before it
+    assert [item.parent_config["configurable"]["checkpoint_id"] for item in history[:-1]] == ids[1:]
+    assert history[-1].parent_config is None
+
+    # A given checkpoint is read back as it was, and list() honours limit and before
+    parent = saver.get_tuple(history[2].config)
+    assert parent.checkpoint["id"] == ids[2]
+    assert len(list(saver.list(thread("a"), limit=2))) == 2
+    inputs = list(saver.list(thread("a"), filter={"source": "input"}, limit=1))
+    assert [item.config for item in inputs] == [history[2].config]
+    assert inputs[0].metadata["source"] == "input"
+    assert [item.config for item in saver.list(thread("a"), before=history[1].config)] == [
+        item.config for item in history[2:]
+    ]
+    assert saver.get_tuple(thread("missing")) is None
+
+
+def test_reads_see_queued_writes(tmp_path: Path) -> None:
+    # With a long flush interval the rows stay queued until a read flushes them
+    saver = SqliteCheckpointSaver(str(tmp_path / "checkpoints.db"), flush_interval=60, prune_interval=0)
+    try:
+        run_turns(build_graph(saver), "a", 1)
+        assert saver.stats().pending_rows > 0
+        assert saver.get_tuple(thread("a")) is not None
+        assert saver.stats().pending_rows == 0
+    finally:
+        saver.close()
+
+
+def test_failed_flush_keeps_the_rows_queued(tmp_path: Path) -> None:
+    path = str(tmp_path / "checkpoints.db")
+    saver = SqliteCheckpointSaver(path, flush_interval=60, prune_interval=0)
+    blocker = sqlite3.connect(path, isolation_level=None)
+    try:
+        run_turns(build_graph(saver), "a", 2)
+        pending = saver.stats().pending_rows
+        assert pending > 0
+        with saver._lock:
+            saver._conn.execute("PRAGMA busy_timeout = 0")
+
+        blocker.execute("BEGIN IMMEDIATE")
+        with pytest.raises(sqlite3.OperationalError):
+            saver.flush()
+        assert saver.stats().pending_rows == pending
+        # The writer thread fails too, and retries once the database is writable again
+        saver._wakeup.set()
+        time.sleep(0.05)
+        blocker.execute("ROLLBACK")
+        deadline = time.monotonic() + 5
+        while saver.stats().pending_rows and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert saver.stats().pending_rows == 0
+
+        messages = saver.get_tuple(thread("a")).checkpoint["channel_values"]["messages"]
+        assert [m.content for m in messages] == ["turn 0", "echo: turn 0", "turn 1", "echo: turn 1"]
+        assert len(list(saver.list(thread("a")))) == 6
+    finally:
+        blocker.close()
+        saver.close()
+
+
+def test_prune_keeps_the_last_checkpoints(saver: SqliteCheckpointSaver) -> None:
+    graph = build_graph(saver)
+    run_turns(graph, "a", 4)
+    run_turns(graph, "b", 1)
+    before = saver.get_tuple(thread("a"))
+    assert len(list(saver.list(thread("a")))) > saver.keep_last
+
+    saver.prune()
+
+    history = list(saver.list(thread("a")))
+    assert len(history) == saver.keep_last
+    assert history[0].config == before.config
+    assert saver.get_tuple(thread("a")).checkpoint["channel_values"] == before.checkpoint["channel_values"]
+    assert len(list(saver.list(thread("b")))) == 3
+    # The conversation goes on from the kept checkpoints
+    run_turns(graph, "a", 1, start=4)
+    assert len(graph.get_state(thread("a")).values["messages"]) == 10
+
+
+def test_prune_expires_idle_threads(saver: SqliteCheckpointSaver) -> None:
+    graph = build_graph(saver)
+    run_turns(graph, "idle", 1)
+    run_turns(graph, "active", 1)
+    saver.flush()
+    with saver._lock:
+        saver._conn.execute("UPDATE checkpoint_threads SET updated_at = updated_at - 7200 WHERE thread_id = 'idle'")
+
+    saver.prune()
+
+    assert saver.get_tuple(thread("idle")) is None
+    assert saver.get_tuple(thread("active")) is not None
+    stats = saver.stats()
+    assert stats.expired_threads == 1
+    assert stats.threads == 1
+
+
+def test_delete_thread(saver: SqliteCheckpointSaver) -> None:
+    graph = build_graph(saver)
+    run_turns(graph, "a", 2)
+    run_turns(graph, "b", 1)
+
+    saver.delete_thread("a")
+
+    assert saver.get_tuple(thread("a")) is None
+    assert list(saver.list(thread("a"))) == []
+    assert saver.get_tuple(thread("b")) is not None
+    # The thread starts over when used again
+    run_turns(graph, "a", 1)
+    assert [m.content for m in graph.get_state(thread("a")).values["messages"]] == ["turn 0", "echo: turn 0"]
+
+
+@pytest.mark.parametrize(("delta_messages", "compression_level"), [(True, 0), (True, 6), (False, 0)])
+def test_state_after_prune_and_restart_matches_memory_saver(
+    tmp_path: Path, delta_messages: bool, compression_level: int
+) -> None:
+    path = str(tmp_path / "checkpoints.db")
+    options = {"keep_last": 3, "prune_interval": 0, "delta_messages": delta_messages}
+    memory = build_graph(MemorySaver(), echo_and_trim)
+    saver = SqliteCheckpointSaver(path, compression_level=compression_level, **options)
+    graph = build_graph(saver, echo_and_trim)
+    try:
+        for graph_ in (memory, graph):
+            run_turns(graph_, "a", 8)
+            run_turns(graph_, "b", 2)
+
+        # The kept checkpoints still decode when the versions their deltas built on are gone
+        saver.prune()
+        assert graph.get_state(thread("a")).values == memory.get_state(thread("a")).values
+        assert history_values(graph, "a") == history_values(memory, "a")[: saver.keep_last]
+        assert graph.get_state(thread("b")).values == memory.get_state(thread("b")).values
+    finally:
+        saver.close()
+
+    saver = SqliteCheckpointSaver(path, compression_level=compression_level, **options)
+    graph = build_graph(saver, echo_and_trim)
+    try:
+        assert graph.get_state(thread("a")).values == memory.get_state(thread("a")).values
+        assert history_values(graph, "a") == history_values(memory, "a")[: saver.keep_last]
+        # New deltas build on the versions read back from disk
+        for graph_ in (memory, graph):
+            run_turns(graph_, "a", 3, start=8)
+        saver.prune()
+        assert graph.get_state(thread("a")).values == memory.get_state(thread("a")).values
+        assert history_values(graph, "a") == history_values(memory, "a")[: saver.keep_last]
+    finally:
+        saver.close()
@@ -0,0 +1,17 @@
+import pytest
+
+from src.db.data_generators import SyntheticDataConfig, iter_synthetic_spending_events
+
+
+@pytest.mark.parametrize(
+    "plan_mix",
+    [{}, {"Standard Plan": 0.0, "Eco Plan": 0.0}, {"Standard Plan": 1.0, "Eco Plan": -0.5}, {"Eco Plan": float("nan")}],
+)
+def test_invalid_plan_mix_is_rejected(plan_mix: dict[str, float]) -> None:
+    with pytest.raises(ValueError, match="plan_mix"):
+        SyntheticDataConfig(plan_mix=plan_mix)
+
+
+def test_zero_weight_plans_are_never_drawn() -> None:
+    config = SyntheticDataConfig(customers=50, months=3, plan_mix={"Standard Plan": 0.0, "Eco Plan": 1.0})
+    assert {row[1] for row in iter_synthetic_spending_events(config)} == {"Eco Plan"}
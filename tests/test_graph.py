@@ -0,0 +1,39 @@
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+
+from src.core.error_manager import create_tool_node_with_fallback
+from src.core.graph import create_entry_node
+
+
+@tool
+def lookup_customer(customer_id: int) -> str:
+    """Look a customer up."""
+    return f"customer_id={customer_id}"
+
+
+def tool_call(name: str, call_id: str, **args: object) -> dict:
+    return {"name": name, "args": args, "id": call_id, "type": "tool_call"}
+
+
+def test_entry_node_runs_the_other_calls_with_the_tools_of_the_assistant_entered() -> None:
+    message = AIMessage(
+        content="",
+        tool_calls=[
+            tool_call("lookup_customer", "call_lookup", customer_id=42),
+            tool_call("ToSpendingAssistant", "call_spending", request="my bill"),
+            tool_call("ToRecommendationAssistant", "call_recommendation", request="a plan"),
+        ],
+    )
+    entry_node = create_entry_node(
+        "spending_assistant", "spending_assistant", create_tool_node_with_fallback([lookup_customer])
+    )
+
+    update = entry_node({"messages": [message]}, {})
+
+    assert update["dialog_state"] == "spending_assistant"
+    answers = {m.tool_call_id: m.content for m in update["messages"]}
+    # Every call is answered, in the order of the calls
+    assert [m.tool_call_id for m in update["messages"]] == ["call_lookup", "call_spending", "call_recommendation"]
+    assert answers["call_lookup"] == "customer_id=42"
+    assert "now the spending_assistant" in answers["call_spending"]
+    assert answers["call_recommendation"].startswith("Not transferred")
@@ -0,0 +1,140 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator, Iterator
+
+import pytest
+from langchain_core.messages import BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGenerationChunk
+from langchain_core.tools import tool
+
+from src.models.fake_model import FakeChatModel
+from src.models.hedging import HedgedChatModel, HedgeTracker, ModelTimeoutError, _get_loop
+
+PROMPT = [HumanMessage(content="hello")]
+
+
+class FailingChatModel(FakeChatModel):
+    """Fake model whose requests fail after ``ttft`` seconds."""
+
+    def _stream(self, messages: list[BaseMessage], *args: object, **kwargs: object) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.ttft)
+        raise ConnectionError("provider unavailable")
+
+    async def _astream(
+        self, messages: list[BaseMessage], *args: object, **kwargs: object
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.ttft)
+        raise ConnectionError("provider unavailable")
+        yield
+
+
+def fake(reply: str, ttft: float, time_per_token: float = 0.0, output_tokens: int = 60) -> FakeChatModel:
+    return FakeChatModel(
+        responses=[reply],
+        ttft=ttft,
+        ttft_sigma=0.0,
+        time_per_token=time_per_token,
+        output_tokens=output_tokens,
+        output_tokens_std=0.0,
+    )
+
+
+def background_tasks() -> int:
+    """Return the number of tasks left on the loop that runs the sync calls."""
+
+    async def count() -> int:
+        return len(asyncio.all_tasks()) - 1
+
+    return asyncio.run_coroutine_threadsafe(count(), _get_loop()).result()
+
+
+def hedged(*models: FakeChatModel, **settings: object) -> HedgedChatModel:
+    names = [f"model-{i}" for i in range(len(models))]
+    return HedgedChatModel(models=list(models), names=names, tracker=HedgeTracker(), **settings)
+
+
+def test_hedge_wins_when_the_first_model_is_slow() -> None:
+    model = hedged(fake("slow", ttft=2.0), fake("fast", ttft=0.01), hedge_min_delay=0.05)
+
+    start = time.monotonic()
+    assert model.invoke(PROMPT).content == "fast"
+    # The slow attempt is cancelled rather than waited for
+    assert time.monotonic() - start < 1.0
+    assert background_tasks() == 0
+
+    stats = model.tracker.stats()
+    assert (stats["model-1"].hedges, stats["model-1"].wins) == (1, 1)
+    assert (stats["model-0"].cancelled, stats["model-0"].wins) == (1, 0)
+    # The loser is sampled with the time it had waited, so the hedge delay is not biased low
+    assert stats["model-0"].first_chunk_p50_s >= 0.05
+
+
+def test_fast_first_model_is_not_hedged() -> None:
+    model = hedged(fake("first", ttft=0.01), fake("second", ttft=0.01), hedge_min_delay=0.5)
+    assert model.invoke(PROMPT).content == "first"
+    assert model.tracker.stats()["model-0"].wins == 1
+    assert "model-1" not in model.tracker.stats()
+
+
+def test_error_falls_back_to_the_next_model() -> None:
+    model = hedged(FailingChatModel(ttft=0.01), fake("fallback", ttft=0.01), hedge=False)
+    assert model.invoke(PROMPT).content == "fallback"
+    stats = model.tracker.stats()
+    assert stats["model-0"].errors == 1
+    assert stats["model-1"].wins == 1
+
+
+def test_last_error_is_raised_when_every_model_fails() -> None:
+    model = hedged(FailingChatModel(ttft=0.01), FailingChatModel(ttft=0.01), hedge=False)
+    with pytest.raises(ConnectionError):
+        model.invoke(PROMPT)
+
+
+def test_timeout_when_no_model_answers_in_time() -> None:
+    model = hedged(fake("late", ttft=2.0), fake("late", ttft=2.0), hedge=False, attempt_timeout=0.1)
+    start = time.monotonic()
+    with pytest.raises(ModelTimeoutError):
+        model.invoke(PROMPT)
+    assert time.monotonic() - start < 1.0
+    stats = model.tracker.stats()
+    assert stats["model-0"].timeouts == stats["model-1"].timeouts == 1
+    assert stats["model-0"].first_chunk_p50_s >= 0.1
+
+
+def test_timeout_when_the_winner_stalls_after_its_first_chunk() -> None:
+    # Three words: the first chunk comes at once, then a 1.5 s gap before each of the others
+    model = hedged(
+        fake("one two three", ttft=0.0, time_per_token=1.0, output_tokens=3), hedge=False, attempt_timeout=0.2
+    )
+    chunks = []
+    with pytest.raises(ModelTimeoutError):
+        for chunk in model.stream(PROMPT):
+            chunks.append(chunk.content)
+    assert chunks == ["one"]
+
+
+def test_bind_tools_binds_every_model() -> None:
+    @tool
+    def validate_customer(customer_id: int) -> str:
+        """Validate a customer id."""
+        return "ok"
+
+    model = hedged(fake("a", ttft=0.0), fake("b", ttft=0.0))
+    bound = model.bind_tools([validate_customer])
+    assert isinstance(bound, HedgedChatModel)
+    assert [m.tool_names for m in bound.models] == [frozenset({"validate_customer"})] * 2
+    assert [m.tool_names for m in model.models] == [frozenset()] * 2
+
+
+def test_async_hedge_and_fallback() -> None:
+    async def run() -> tuple[str, str]:
+        racing = hedged(fake("slow", ttft=2.0), fake("fast", ttft=0.01), hedge_min_delay=0.05)
+        falling_back = hedged(FailingChatModel(ttft=0.01), fake("fallback", ttft=0.01), hedge=False)
+        replies = await asyncio.gather(racing.ainvoke(PROMPT), falling_back.ainvoke(PROMPT))
+        # The cancelled attempt leaves no task behind
+        assert [task for task in asyncio.all_tasks() if task is not asyncio.current_task()] == []
+        return replies[0].content, replies[1].content
+
+    start = time.monotonic()
+    assert asyncio.run(run()) == ("fast", "fallback")
+    assert time.monotonic() - start < 1.0
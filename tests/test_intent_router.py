@@ -0,0 +1,53 @@
+from pathlib import Path
+
+import pytest
+
+from src.core.intent_classifier import SEED_EXAMPLES, IntentClassifier, split_examples
+from src.core.intent_router import MIN_HOLDOUT_EXAMPLES, IntentRouter, create_intent_router
+
+
+def save_model(path: Path, accuracy: float | None, examples: int) -> None:
+    model = IntentClassifier.train(SEED_EXAMPLES, epochs=2)
+    model.holdout_accuracy = accuracy
+    model.holdout_examples = examples
+    model.save(str(path))
+
+
+@pytest.fixture
+def model_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    path = tmp_path / "intent_model.npz"
+    monkeypatch.setenv("INTENT_MODEL_PATH", str(path))
+    monkeypatch.setenv("ENABLE_INTENT_ROUTER", "true")
+    monkeypatch.delenv("INTENT_MIN_HOLDOUT_ACCURACY", raising=False)
+    return path
+
+
+def test_router_is_off_by_default(model_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("ENABLE_INTENT_ROUTER")
+    save_model(model_path, 0.99, 500)
+    assert create_intent_router() is None
+
+
+def test_router_is_not_used_with_the_seed_model(model_path: Path) -> None:
+    assert not model_path.exists()
+    assert create_intent_router() is None
+
+
+@pytest.mark.parametrize(("accuracy", "examples"), [(None, 500), (0.99, MIN_HOLDOUT_EXAMPLES - 1), (0.9, 500)])
+def test_router_is_not_used_with_an_unproven_model(model_path: Path, accuracy: float | None, examples: int) -> None:
+    save_model(model_path, accuracy, examples)
+    assert create_intent_router() is None
+
+
+def test_router_is_used_with_an_accurate_model(model_path: Path) -> None:
+    save_model(model_path, 0.97, 500)
+    router = create_intent_router()
+    assert isinstance(router, IntentRouter)
+    assert router.classifier.holdout_accuracy == pytest.approx(0.97)
+    assert router.classifier.holdout_examples == 500
+
+
+def test_split_keeps_every_intent_in_both_parts() -> None:
+    train, held_out = split_examples(list(SEED_EXAMPLES), 0.2)
+    assert sorted(train + held_out) == sorted(SEED_EXAMPLES)
+    assert {intent for _, intent in held_out} == {intent for _, intent in train}
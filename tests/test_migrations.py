@@ -0,0 +1,54 @@
+import sqlite3
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from src.db.db_schema import create_all_tables
+from src.db.migrations import MIGRATIONS, apply_migrations, get_schema_version
+
+
+@pytest.fixture
+def conn(tmp_path: Path) -> Iterator[sqlite3.Connection]:
+    conn = sqlite3.connect(tmp_path / "data.db")
+    create_all_tables(conn)
+    yield conn
+    conn.close()
+
+
+def customer_columns(conn: sqlite3.Connection) -> set[str]:
+    return {row[1] for row in conn.execute("PRAGMA table_info(customers)")}
+
+
+def test_apply_migrations_is_idempotent(conn: sqlite3.Connection) -> None:
+    latest = max(migration.version for migration in MIGRATIONS)
+    assert apply_migrations(conn) == latest
+    assert apply_migrations(conn) == latest
+    assert get_schema_version(conn) == latest
+    assert "email_normalized" in customer_columns(conn)
+
+
+def test_failed_migration_rolls_back_its_schema_changes(conn: sqlite3.Connection) -> None:
+    conn.executemany(
+        "INSERT INTO customers (name, email) VALUES (?, ?)",
+        [("Alice", "Alice@x.com"), ("Alice again", "alice@x.com")],
+    )
+    conn.commit()
+
+    # The two emails only collide once normalized, so the unique index of migration 5 fails
+    with pytest.raises(sqlite3.IntegrityError):
+        apply_migrations(conn)
+    assert get_schema_version(conn) == 4
+    assert "email_normalized" not in customer_columns(conn)
+    assert not conn.in_transaction
+
+    # Once the duplicate is removed, the migration applies from a clean state
+    conn.execute("DELETE FROM customers WHERE email = 'alice@x.com'")
+    conn.commit()
+    assert apply_migrations(conn) == 5
+    assert conn.execute("SELECT email_normalized FROM customers").fetchall() == [("alice@x.com",)]
+
+
+def test_apply_migrations_restores_the_isolation_level(conn: sqlite3.Connection) -> None:
+    apply_migrations(conn)
+    assert conn.isolation_level == ""
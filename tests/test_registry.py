@@ -0,0 +1,91 @@
+import asyncio
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.models.registry import HttpPoolConfig, ModelRegistry
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def server_url() -> Iterator[str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_shared_async_client_works_across_event_loops(server_url: str) -> None:
+    registry = ModelRegistry(HttpPoolConfig())
+    _, client = registry.http_clients("openai")
+
+    async def get() -> str:
+        response = await client.get(server_url)
+        return response.text
+
+    # Each asyncio.run closes its loop; the kept-alive connection of the first one must not be reused
+    assert [asyncio.run(get()) for _ in range(3)] == ["ok"] * 3
+    assert registry.http_clients("openai")[1] is client
+
+
+def test_event_loops_get_their_own_pool(server_url: str) -> None:
+    registry = ModelRegistry(HttpPoolConfig())
+    _, client = registry.http_clients("openai")
+    transports = []
+
+    async def get() -> None:
+        await client.get(server_url)
+        await client.get(server_url)
+        transports.append(await client._transport._transport())
+
+    loops = [asyncio.new_event_loop() for _ in range(2)]
+    for loop in loops:
+        loop.run_until_complete(get())
+    assert transports[0] is not transports[1]
+    assert registry.stats().connections == 2
+    for loop in loops:
+        loop.run_until_complete(client._transport.aclose())
+        loop.close()
+    assert registry.stats().connections == 0
+
+
+def test_pools_are_closed_with_their_event_loop(server_url: str) -> None:
+    registry = ModelRegistry(HttpPoolConfig())
+    _, client = registry.http_clients("openai")
+
+    async def get() -> int:
+        await client.get(server_url)
+        return registry.stats().connections
+
+    # asyncio.run shuts the loop's async generators down, which closes its pool
+    for _ in range(5):
+        assert asyncio.run(get()) == 1
+        assert client._transport.transports() == []
+        assert registry.stats().connections == 0
+
+
+def test_pools_of_loops_closed_without_shutdown_are_dropped(server_url: str) -> None:
+    registry = ModelRegistry(HttpPoolConfig())
+    _, client = registry.http_clients("openai")
+    for _ in range(3):
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(client.get(server_url))
+        loop.close()
+    assert client._transport.transports() == []
+    assert registry.stats().connections == 0
@@ -0,0 +1,48 @@
+from pathlib import Path
+
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+
+from src.models.response_cache import SqliteResponseCache
+
+
+def test_hits_replay_the_answer_with_fresh_ids(tmp_path: Path) -> None:
+    cache = SqliteResponseCache(str(tmp_path / "cache.db"))
+    message = AIMessage(
+        content="",
+        id="run-original",
+        tool_calls=[{"name": "validate_customer", "args": {"customer_id": 7}, "id": "call_original"}],
+        additional_kwargs={
+            "tool_calls": [
+                {
+                    "id": "call_original",
+                    "type": "function",
+                    "function": {"name": "validate_customer", "arguments": '{"customer_id": 7}'},
+                }
+            ]
+        },
+    )
+    cache.update("prompt", "llm", [ChatGeneration(message=message)])
+
+    first, second = (cache.lookup("prompt", "llm")[0].message for _ in range(2))
+
+    assert cache.stats().hits == 2
+    for replayed in (first, second):
+        assert replayed.content == message.content
+        assert replayed.tool_calls[0]["args"] == {"customer_id": 7}
+        assert replayed.id != message.id
+        assert replayed.tool_calls[0]["id"] != "call_original"
+        # The provider-specific copy of the call keeps pointing at the same call
+        assert replayed.additional_kwargs["tool_calls"][0]["id"] == replayed.tool_calls[0]["id"]
+    assert first.id != second.id
+    assert first.tool_calls[0]["id"] != second.tool_calls[0]["id"]
+    cache.close()
+
+
+def test_lookup_misses_on_another_prompt(tmp_path: Path) -> None:
+    cache = SqliteResponseCache(str(tmp_path / "cache.db"))
+    cache.update("prompt", "llm", [ChatGeneration(message=AIMessage(content="hello"))])
+    assert cache.lookup("other prompt", "llm") is None
+    assert cache.lookup("prompt", "other llm") is None
+    assert cache.stats().misses == 2
+    cache.close()
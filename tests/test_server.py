@@ -0,0 +1,210 @@
+import asyncio
+import json
+import uuid
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import pytest
+
+import src.server
+from src.core.chatbot import ChatBot
+from src.core.transcripts import TranscriptWriter
+from src.server import ChatServer, ServerConfig
+
+GREETING = "Hello! I can help you review your electricity spending or find a better plan. What would you like to do?"
+
+
+@pytest.fixture
+def server(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Iterator[ChatServer]:
+    # The requests under test are rejected before a turn starts, so no chatbot is needed
+    writer = TranscriptWriter(str(tmp_path))
+    monkeypatch.setattr(src.server, "get_chatbot", lambda: None)
+    monkeypatch.setattr(src.server, "get_transcript_writer", lambda: writer)
+    yield ChatServer(ServerConfig(port=0, read_timeout=0.2))
+    writer.close()
+
+
+@pytest.fixture(scope="module")
+def chatbot() -> Iterator[ChatBot]:
+    """A chatbot on the offline fake model, whose replies take 0.3 s to start."""
+    with pytest.MonkeyPatch.context() as mp:
+        for assistant in ("PRIMARY_ASSISTANT", "SPENDING_ASSISTANT", "RECOMMENDATION_ASSISTANT", "SUMMARIZER"):
+            mp.delenv(f"MODEL_{assistant}", raising=False)
+        mp.delenv("MODEL_CONFIG", raising=False)
+        for name, value in {
+            "MODEL_CHAIN": "fake",
+            "FAKE_MODEL_TTFT": "0.3",
+            "FAKE_MODEL_TTFT_SIGMA": "0",
+            "FAKE_MODEL_TIME_PER_TOKEN": "0",
+            "CHECKPOINT_BACKEND": "memory",
+            "ENABLE_INTENT_ROUTER": "false",
+            "ENABLE_MODEL_CACHE": "false",
+        }.items():
+            mp.setenv(name, value)
+        chatbot = ChatBot()
+        chatbot.build_graph()
+    yield chatbot
+
+
+@pytest.fixture
+def make_chat_server(
+    chatbot: ChatBot, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> Iterator[Callable[..., ChatServer]]:
+    writer = TranscriptWriter(str(tmp_path))
+    monkeypatch.setattr(src.server, "get_chatbot", lambda: chatbot)
+    monkeypatch.setattr(src.server, "get_transcript_writer", lambda: writer)
+    yield lambda **settings: ChatServer(ServerConfig(port=0, **settings))
+    writer.close()
+
+
+@asynccontextmanager
+async def listening(server: ChatServer) -> AsyncIterator[int]:
+    """Serve on a free local port; yield the port."""
+    tcp_server = await asyncio.start_server(server.handle_connection, "127.0.0.1", 0)
+    async with tcp_server:
+        yield tcp_server.sockets[0].getsockname()[1]
+
+
+async def send(port: int, raw: bytes) -> tuple[int, dict[str, str], bytes]:
+    """Send raw request bytes; return the status, headers and body of the response."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(raw)
+    await writer.drain()
+    response = await asyncio.wait_for(reader.read(), 10)
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    headers = {name.lower(): value.strip() for name, _, value in (line.partition(":") for line in header_lines)}
+    return int(status_line.split(" ", 2)[1]), headers, body
+
+
+def exchange(server: ChatServer, raw: bytes) -> tuple[int, dict]:
+    """Send raw request bytes to the server and return the status and JSON body of the reply."""
+
+    async def run() -> tuple[int, dict[str, str], bytes]:
+        async with listening(server) as port:
+            return await send(port, raw)
+
+    status, _, body = asyncio.run(run())
+    return status, json.loads(body)
+
+
+def post_chat(body: object) -> bytes:
+    data = json.dumps(body).encode()
+    return b"POST /chat HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s" % (len(data), data)
+
+
+def sse_events(body: bytes) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.decode().split("\n\n"):
+        if block.strip():
+            fields = dict(line.split(": ", 1) for line in block.splitlines())
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+@pytest.mark.parametrize("thread_id", ["../../../tmp/escaped", "/tmp/escaped", "a" * 65, "a.b", {"a": 1}, 7])
+def test_chat_rejects_invalid_thread_ids(server: ChatServer, thread_id: object) -> None:
+    status, body = exchange(server, post_chat({"message": "hi", "thread_id": thread_id}))
+    assert status == 400
+    assert "thread_id" in body["error"]
+
+
+def test_delete_rejects_invalid_thread_ids(server: ChatServer) -> None:
+    status, _ = exchange(server, b"DELETE /threads/../../tmp/escaped HTTP/1.1\r\n\r\n")
+    assert status == 400
+
+
+@pytest.mark.parametrize("content_length", [b"abc", b"-1", b"1.5"])
+def test_invalid_content_length_is_a_bad_request(server: ChatServer, content_length: bytes) -> None:
+    status, body = exchange(server, b"POST /chat HTTP/1.1\r\nContent-Length: " + content_length + b"\r\n\r\n{}")
+    assert status == 400
+    assert "Content-Length" in body["error"]
+
+
+def test_incomplete_request_times_out(server: ChatServer) -> None:
+    status, _ = exchange(server, b"POST /chat HTTP/1.1\r\nContent-Length: 2\r\n")
+    assert status == 408
+
+
+def test_transcript_paths_stay_in_the_directory(tmp_path: Path) -> None:
+    writer = TranscriptWriter(str(tmp_path / "transcripts"))
+    try:
+        thread_id = str(uuid.uuid4())
+        assert writer.path(thread_id) == str(tmp_path / "transcripts" / f"{thread_id}.jsonl")
+        for thread_id in ("../escaped", "../../tmp/escaped", "/tmp/escaped", "a/b"):
+            with pytest.raises(ValueError):
+                writer.path(thread_id)
+        with pytest.raises(ValueError):
+            writer.append("../escaped", [])
+    finally:
+        writer.close()
+
+
+def test_chat_streams_the_reply_as_server_sent_events(make_chat_server: Callable[..., ChatServer]) -> None:
+    server = make_chat_server()
+
+    async def run() -> list[tuple[int, dict[str, str], bytes]]:
+        async with listening(server) as port:
+            first = await send(port, post_chat({"message": "hello"}))
+            thread_id = sse_events(first[2])[0][1]["thread_id"]
+            return [first, await send(port, post_chat({"message": "hello again", "thread_id": thread_id}))]
+
+    responses = asyncio.run(run())
+    for status, headers, body in responses:
+        assert status == 200
+        assert headers["content-type"] == "text/event-stream"
+        events = sse_events(body)
+        kinds = [kind for kind, _ in events]
+        assert kinds[0] == "thread" and kinds[-1] == "done"
+        assert set(kinds[1:-1]) == {"token"} and len(kinds) > 3
+        assert "".join(data["text"] for kind, data in events if kind == "token") == GREETING
+        assert events[-1][1]["thread_id"] == events[0][1]["thread_id"]
+        assert events[-1][1]["time_to_first_token_s"] >= 0.3
+
+    # The second turn went to the thread of the first
+    assert len({sse_events(body)[0][1]["thread_id"] for _, _, body in responses}) == 1
+
+
+def test_turns_beyond_the_queue_get_503_and_health_counts_them(make_chat_server: Callable[..., ChatServer]) -> None:
+    server = make_chat_server(max_concurrent_turns=2, max_queued_turns=1)
+
+    async def run() -> tuple[list[tuple[int, dict[str, str], bytes]], dict]:
+        async with listening(server) as port:
+            responses = await asyncio.gather(*(send(port, post_chat({"message": "hello"})) for _ in range(6)))
+            _, _, health = await send(port, b"GET /health HTTP/1.1\r\n\r\n")
+        return responses, json.loads(health)
+
+    responses, health = asyncio.run(run())
+    assert sorted(status for status, _, _ in responses) == [200] * 3 + [503] * 3
+    for status, headers, body in responses:
+        if status == 503:
+            assert headers["retry-after"] == "1"
+            assert json.loads(body)["error"].startswith("Server busy")
+        else:
+            assert sse_events(body)[-1][0] == "done"
+    assert health["status"] == "ok"
+    assert health["turns"] == {
+        "active": 0,
+        "queued": 0,
+        "max_active": 2,
+        "max_queued": 1,
+        "completed": 3,
+        "rejected": 3,
+    }
+
+
+def test_second_turn_in_a_busy_thread_gets_409(make_chat_server: Callable[..., ChatServer]) -> None:
+    server = make_chat_server()
+
+    async def run() -> tuple[int, int]:
+        async with listening(server) as port:
+            first = asyncio.ensure_future(send(port, post_chat({"message": "hello", "thread_id": "busy"})))
+            while "busy" not in server._running_threads:
+                await asyncio.sleep(0.01)
+            second, _, _ = await send(port, post_chat({"message": "hello", "thread_id": "busy"}))
+            deleted, _, _ = await send(port, b"DELETE /threads/busy HTTP/1.1\r\n\r\n")
+            return (await first)[0], second, deleted
+
+    assert asyncio.run(run()) == (200, 409, 409)
@@ -0,0 +1,39 @@
+import json
+from pathlib import Path
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.core.transcripts import TranscriptWriter
+
+
+def read_lines(path: str) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_state_is_written_only_when_it_changes(tmp_path: Path) -> None:
+    writer = TranscriptWriter(str(tmp_path), flush_interval=0)
+    try:
+        for turn, (customer_id, summary) in enumerate(
+            [(None, None), (3, None), (3, None), (3, "Asked about plans."), (3, "Asked about plans."), (4, None)]
+        ):
+            messages = [HumanMessage(content=f"question {turn}"), AIMessage(content=f"answer {turn}")]
+            writer.append("a", messages, customer_id=customer_id, summary=summary)
+        writer.append("b", [HumanMessage(content="hi")], customer_id=3)
+        writer.flush()
+
+        states = [{k: v for k, v in line.items() if k != "ts"} for line in read_lines(writer.path("a"))]
+        states = [line for line in states if line["role"] == "state"]
+        assert states == [
+            {"role": "state", "customer_id": 3},
+            {"role": "state", "summary": "Asked about plans."},
+            {"role": "state", "customer_id": 4},
+        ]
+        # Other threads keep their own state
+        assert read_lines(writer.path("b"))[-1]["customer_id"] == 3
+
+        transcript = writer.export("a")
+        assert (transcript["customer_id"], transcript["summary"]) == (4, "Asked about plans.")
+        assert len(transcript["conversation"]) == 12
+    finally:
+        writer.close()